@@ -0,0 +1,215 @@
+"""Benchmarks of the field computation and rendering.
+
+Run from the repository root::
+
+    python -m benchmarks.run --output before.json
+    python -m benchmarks.run --output after.json --compare before.json
+
+Every backend runs on synthetic layouts of n charges evenly spaced on the
+head circle (like example.csv) for each grid size. The compute, norm and
+colormap, and draw phases are timed separately (best of ``--repeat``) and
+the peak of Python-tracked allocations of one extra run is recorded with
+tracemalloc (shared memory of the parallel backend is not tracked).
+Combinations whose estimated pair evaluations exceed ``--max-pairs`` are
+recorded as skipped.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import matplotlib
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from electricfield.charges import ChargeSet
+from electricfield.field import BACKENDS, field_magnitude
+from electricfield.parallel import default_workers
+from electricfield.plot import CMAP, FieldFigure, make_norms
+from electricfield.settings import DEFAULT_SETTINGS, grid_coordinates
+
+CHARGES = [1, 10, 100, 1000, 10000, 100000]
+NPOINTS = [100, 500, 1000, 2000, 4000]
+MAX_PAIRS = 2e9
+
+# name -> (backend, options, estimated charge-point pair evaluations)
+CONFIGURATIONS = {
+    "pycharge": ("pycharge", {}, lambda n, p: n * p * p),
+    "numpy": ("numpy", {}, lambda n, p: n * p * p),
+    "numpy-float32": ("numpy", {"dtype": "float32"}, lambda n, p: n * p * p),
+    # The circle layouts have the 8 symmetries of the square when 4 divides n
+    "numpy-symmetry": ("numpy", {"symmetry": True}, lambda n, p: n * p * p / 8),
+    "numpy-parallel": (
+        "numpy",
+        {"workers": default_workers()},
+        lambda n, p: n * p * p / default_workers(),
+    ),
+    "treecode": ("treecode", {}, lambda n, p: p * p * min(n, 2000)),
+    "adaptive": (
+        "adaptive",
+        {"radius": DEFAULT_SETTINGS["radius"]},
+        lambda n, p: n * min(p * p, 60000),
+    ),
+}
+
+
+def circle_layout(n, radius=DEFAULT_SETTINGS["radius"], q=1e-5):
+    """Returns n charges of q evenly spaced on a circle of radius (m)"""
+    angles = 2 * np.pi * np.arange(n) / n
+    X = np.round(radius * 1e2 * np.cos(angles), 6)
+    Y = np.round(radius * 1e2 * np.sin(angles), 6)
+    return ChargeSet(X, Y, np.full(n, q))
+
+
+def colorize(fields, settings):
+    """The norm and colormap work of one result, as imshow does it"""
+    components, magnitude = make_norms(settings)
+    cmap = colormaps[CMAP]
+    E_x, E_y = fields
+    for norm, data in (
+        (components, E_x),
+        (components, E_y),
+        (magnitude, field_magnitude(E_x, E_y)),
+    ):
+        cmap(norm(data), bytes=True)
+
+
+def draw(fields, charges, settings):
+    """A full render of the results figure"""
+    view = FieldFigure(settings["figsize"], interactive=False)
+    canvas = FigureCanvasAgg(view.figure)
+    view.update(fields, charges, settings)
+    canvas.draw()
+
+
+def best(function, repeat):
+    """Returns the fastest of repeat runs in seconds and the last result"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def peak_memory(function):
+    """Returns the peak bytes allocated through Python while function runs"""
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def run_case(name, n, npoints, repeat=1, memory=True, render=True):
+    backend, options, _ = CONFIGURATIONS[name]
+    settings = dict(DEFAULT_SETTINGS, npoints=npoints)
+    charges = circle_layout(n)
+    coordinates = grid_coordinates(settings)
+
+    def compute():
+        return BACKENDS[backend](charges, coordinates, coordinates, **options)
+
+    result = {"backend": name, "charges": n, "npoints": npoints}
+    result["compute_s"], fields = best(compute, repeat)
+    if memory:
+        result["compute_peak_bytes"] = peak_memory(compute)
+    if render:
+        result["colormap_s"], _ = best(lambda: colorize(fields, settings), repeat)
+        result["draw_s"], _ = best(lambda: draw(fields, charges, settings), repeat)
+        if memory:
+            result["draw_peak_bytes"] = peak_memory(
+                lambda: draw(fields, charges, settings)
+            )
+    return result
+
+
+def environment():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def compare(results, baseline):
+    """Prints the compute time ratio of every case found in both runs"""
+    old = {
+        (r["backend"], r["charges"], r["npoints"]): r
+        for r in baseline["results"]
+        if "compute_s" in r
+    }
+    for r in results:
+        key = (r["backend"], r["charges"], r["npoints"])
+        if "compute_s" in r and key in old:
+            ratio = old[key]["compute_s"] / r["compute_s"]
+            print(
+                f"{key[0]:>15} {key[1]:>7} charges {key[2]:>5}^2 points: {ratio:.2f}x"
+            )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run")
+    parser.add_argument("--backends", nargs="+", default=list(CONFIGURATIONS))
+    parser.add_argument("--charges", nargs="+", type=int, default=CHARGES)
+    parser.add_argument("--npoints", nargs="+", type=int, default=NPOINTS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-pairs", type=float, default=MAX_PAIRS)
+    parser.add_argument("--no-memory", action="store_true")
+    parser.add_argument("--no-render", action="store_true")
+    parser.add_argument("-o", "--output", default="benchmark.json")
+    parser.add_argument("--compare", help="earlier JSON output to compare with")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.backends:
+        for n in args.charges:
+            for npoints in args.npoints:
+                case = {"backend": name, "charges": n, "npoints": npoints}
+                if CONFIGURATIONS[name][2](n, npoints) > args.max_pairs:
+                    case["skipped"] = "estimated work above --max-pairs"
+                else:
+                    try:
+                        case = run_case(
+                            name,
+                            n,
+                            npoints,
+                            args.repeat,
+                            not args.no_memory,
+                            not args.no_render,
+                        )
+                    except Exception as error:
+                        case["error"] = f"{type(error).__name__}: {error}"
+                print(json.dumps(case), flush=True)
+                results.append(case)
+
+    with open(args.output, "w") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            compare(results, json.load(file))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
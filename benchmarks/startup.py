@@ -0,0 +1,97 @@
+"""Startup time of the package.
+
+Run from the repository root::
+
+    python -m benchmarks.startup --output startup.json
+
+Every target is imported in a fresh interpreter (best of ``--repeat``).
+The import time and the heavy modules it pulled in are recorded, and the
+exit code is 1 when a target fails to import or imports a module it must
+not, so import regressions fail loudly. The GUI target needs customtkinter.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+
+HEAVY = ("matplotlib", "pandas", "pycharge", "customtkinter", "mpl_toolkits")
+# name -> (modules imported, heavy modules that must stay unimported)
+TARGETS = {
+    "core": (
+        [
+            "electricfield.charges",
+            "electricfield.settings",
+            "electricfield.field",
+            "electricfield.loader",
+        ],
+        HEAVY,
+    ),
+    "cli": (["electricfield.__main__"], HEAVY),
+    "gui": (["electricfield.gui"], ("matplotlib", "pandas", "pycharge")),
+}
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+heavy = [m for m in {heavy!r} if m in sys.modules]
+print(json.dumps({{"import_s": elapsed, "imported": heavy}}))
+"""
+
+
+def run_target(name, repeat=5):
+    modules, heavy = TARGETS[name]
+    result = {"target": name}
+    for _ in range(repeat):
+        process = subprocess.run(
+            [sys.executable, "-c", PROBE.format(modules=modules, heavy=HEAVY)],
+            capture_output=True,
+            text=True,
+        )
+        if process.returncode != 0:
+            result["error"] = process.stderr.strip().splitlines()[-1]
+            return result
+        probe = json.loads(process.stdout)
+        result["import_s"] = min(
+            result.get("import_s", probe["import_s"]), probe["import_s"]
+        )
+        result["imported"] = probe["imported"]
+    result["unexpected"] = [m for m in result["imported"] if m in heavy]
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.startup")
+    parser.add_argument("--targets", nargs="+", default=list(TARGETS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-o", "--output", default="startup.json")
+    parser.add_argument("--compare", help="earlier JSON output to compare with")
+    args = parser.parse_args(argv)
+
+    results = []
+    for name in args.targets:
+        result = run_target(name, args.repeat)
+        print(json.dumps(result), flush=True)
+        results.append(result)
+
+    # Imported late, benchmarks.run loads matplotlib
+    from benchmarks.run import environment
+
+    with open(args.output, "w") as file:
+        json.dump({"environment": environment(), "results": results}, file, indent=1)
+    if args.compare:
+        with open(args.compare) as file:
+            old = {
+                r["target"]: r for r in json.load(file)["results"] if "import_s" in r
+            }
+        for r in results:
+            if "import_s" in r and r["target"] in old:
+                ratio = old[r["target"]]["import_s"] / r["import_s"]
+                print(f"{r['target']:>6}: {ratio:.2f}x")
+    return 1 if any("error" in r or r.get("unexpected") for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
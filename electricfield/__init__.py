@@ -0,0 +1 @@
+"""Electric field computation core used by the Electric Field Simulator GUI"""
@@ -0,0 +1,221 @@
+"""Command line entry point, ``python -m electricfield batch --help``,
+``python -m electricfield probes --help``,
+``python -m electricfield sweep --help`` and
+``python -m electricfield volume --help``. ``python -m electricfield gui``
+starts the interface."""
+
+import argparse
+import copy
+import os
+import sys
+
+from electricfield.settings import DEFAULT_SETTINGS
+
+INTEGER_SETTINGS = {
+    "npoints",
+    "workers",
+    "adaptive_resolution",
+    "memory_mb",
+    "equipotentials",
+    "z_points",
+}
+
+
+def add_setting_arguments(parser):
+    """Adds a --option for every scalar setting, defaulting to its default"""
+    for key, value in DEFAULT_SETTINGS.items():
+        if isinstance(value, list):
+            continue
+        if key in INTEGER_SETTINGS:
+            kind = int
+        elif isinstance(value, str):
+            kind = str
+        else:
+            kind = float
+        parser.add_argument(
+            "--" + key.replace("_", "-"),
+            dest=key,
+            type=kind,
+            default=value,
+            help=f"(default: {value})",
+        )
+
+
+def settings_from(args):
+    settings = copy.deepcopy(DEFAULT_SETTINGS)
+    settings.update((key, getattr(args, key)) for key in settings if hasattr(args, key))
+    return settings
+
+
+def layout_paths(parser, patterns):
+    """Returns the layout files matching patterns, exits with a usage error
+    when there are none or two share an output name"""
+    from electricfield.batch import find_inputs
+
+    try:
+        paths = find_inputs(patterns)
+    except ValueError as error:
+        parser.error(str(error))
+    if not paths:
+        parser.error("no layout files found")
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m electricfield")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser(
+        "batch", help="compute fields for many charge layout files"
+    )
+    batch.add_argument(
+        "inputs", nargs="+", help="layout files, directories or glob patterns"
+    )
+    batch.add_argument("-o", "--out", default="results", help="output directory")
+    batch.add_argument(
+        "-j", "--jobs", type=int, default=os.cpu_count(), help="parallel jobs"
+    )
+    batch.add_argument("--png", action="store_true", help="also save plots")
+    batch.add_argument(
+        "--session",
+        action="store_true",
+        help="also save session files (.efs) that open in the GUI",
+    )
+    add_setting_arguments(batch)
+
+    probes = commands.add_parser(
+        "probes", help="evaluate layouts at sensor positions only"
+    )
+    probes.add_argument(
+        "inputs", nargs="+", help="layout files, directories or glob patterns"
+    )
+    probes.add_argument("-o", "--out", default="results", help="output directory")
+    sensors = probes.add_mutually_exclusive_group()
+    sensors.add_argument("--sensors", help="CSV file of sensor positions x,y (m)")
+    sensors.add_argument(
+        "--circle",
+        type=int,
+        default=64,
+        help="sensors evenly spaced on the head circle (default: 64)",
+    )
+    add_setting_arguments(probes)
+
+    sweeps = commands.add_parser(
+        "sweep", help="evaluate one layout with many sets of charge values"
+    )
+    sweeps.add_argument("input", help="layout file giving the charge positions")
+    sweeps.add_argument("-o", "--out", default="results", help="output directory")
+    values = sweeps.add_mutually_exclusive_group(required=True)
+    values.add_argument(
+        "--q", help="charge values, .npy or CSV of sweeps x charges (C)"
+    )
+    values.add_argument(
+        "--samples", type=int, help="Monte Carlo sweeps around the layout's q"
+    )
+    sweeps.add_argument(
+        "--spread",
+        type=float,
+        default=0.1,
+        help="relative standard deviation of --samples (default: 0.1)",
+    )
+    sweeps.add_argument("--seed", type=int, help="random seed of --samples")
+    points = sweeps.add_mutually_exclusive_group()
+    points.add_argument("--sensors", help="CSV file of points x,y (m) to report")
+    points.add_argument(
+        "--circle", type=int, help="report points evenly spaced on the head circle"
+    )
+    sweeps.add_argument(
+        "--basis-dir", help="keep the unit charge basis memory mapped in this folder"
+    )
+    sweeps.add_argument(
+        "--basis-precision",
+        choices=["float32", "float64"],
+        default="float32",
+        help="(default: float32)",
+    )
+    sweeps.add_argument(
+        "--bins", type=int, default=64, help="log10 |E| histogram bins (default: 64)"
+    )
+    add_setting_arguments(sweeps)
+
+    volume = commands.add_parser(
+        "volume", help="compute layouts in a volume of z-slices on disk"
+    )
+    volume.add_argument(
+        "inputs", nargs="+", help="layout files, directories or glob patterns"
+    )
+    volume.add_argument(
+        "-o", "--out", default="results", help="output directory, one folder per layout"
+    )
+    add_setting_arguments(volume)
+
+    commands.add_parser("gui", help="start the interface")
+
+    args = parser.parse_args(argv)
+    if args.command == "gui":
+        from electricfield.gui import main as gui
+
+        gui()
+        return 0
+    if args.command == "batch":
+        from electricfield.batch import run_batch
+
+        paths = layout_paths(parser, args.inputs)
+        results = run_batch(
+            paths,
+            settings_from(args),
+            args.out,
+            args.jobs,
+            args.png,
+            session=args.session,
+        )
+        return 1 if any("error" in r for r in results) else 0
+    if args.command == "probes":
+        from electricfield.batch import run_probes
+        from electricfield.probes import head_circle_points, load_sensors
+
+        paths = layout_paths(parser, args.inputs)
+        if args.sensors:
+            sx, sy = load_sensors(args.sensors)
+        else:
+            sx, sy = head_circle_points(args.circle, args.radius)
+        results = run_probes(paths, sx, sy, args.out)
+        return 1 if any("error" in r for r in results) else 0
+    if args.command == "volume":
+        from electricfield.batch import run_volume
+
+        paths = layout_paths(parser, args.inputs)
+        results = run_volume(paths, settings_from(args), args.out)
+        return 1 if any("error" in r for r in results) else 0
+    if args.command == "sweep":
+        from electricfield.batch import run_sweep
+        from electricfield.loader import load_charges
+        from electricfield.probes import head_circle_points, load_sensors
+        from electricfield.sweep import load_sweeps, monte_carlo
+
+        if args.q:
+            Q = load_sweeps(args.q)
+        else:
+            Q = monte_carlo(
+                load_charges(args.input).q, args.samples, args.spread, args.seed
+            )
+        sensors = None
+        if args.sensors:
+            sensors = load_sensors(args.sensors)
+        elif args.circle:
+            sensors = head_circle_points(args.circle, args.radius)
+        run_sweep(
+            args.input,
+            Q,
+            settings_from(args),
+            args.out,
+            sensors,
+            args.basis_dir,
+            args.basis_precision,
+            args.bins,
+        )
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,218 @@
+"""Adaptive sampling of the field instead of a uniform grid.
+
+The domain is the extent of the requested grid, so a zoom tile or a band
+of a large grid only refines its own part of the plane. It starts as
+``base`` square cells across its longer side whose corners are
+evaluated. At every level each cell gets its center evaluated; cells whose
+center differs from the bilinear estimate of their corners by more than
+``tolerance`` (relative), cells holding a charge and cells crossed by the
+head circle are split in four. Smooth far field regions therefore stay
+coarse while the finest level reaches ``resolution`` points across the
+longer side.
+Nodes live on the lattice of the finest level, so every evaluated point is
+stored once under an integer key. The leaves are finally resampled onto
+the display raster by bilinear interpolation.
+"""
+
+import numpy as np
+
+from electricfield.field import accumulate_E, charge_arrays
+
+BASE = 64
+TOLERANCE = 0.01
+# Number of raster rows resampled at once
+RESAMPLE_ROWS = 256
+
+
+class AdaptiveGrid:
+    """Quadtree of sampled cells over [x_min, x_max] x [y_min, y_max]"""
+
+    def __init__(
+        self,
+        charges,
+        bounds,
+        resolution=4000,
+        tolerance=TOLERANCE,
+        radius=None,
+        base=BASE,
+    ):
+        self.charges = charge_arrays(charges)
+        self.x_min, x_max, self.y_min, y_max = bounds
+        self.tolerance = tolerance
+        self.radius = radius
+        self.base = base
+        self.depth = max(0, int(np.ceil(np.log2(max(resolution - 1, 1) / base))))
+        top = 2**self.depth
+        side = max(x_max - self.x_min, y_max - self.y_min) or 1.0
+        # Cells per axis at the finest level, the shorter side is rounded up
+        # to whole top level cells
+        self.h = side / (base * top)
+        self.cells_x = top * max(1, int(np.ceil((x_max - self.x_min) / self.h / top)))
+        self.cells_y = top * max(1, int(np.ceil((y_max - self.y_min) / self.h / top)))
+        self.keys = np.empty(0, dtype=np.int64)
+        self.values = np.empty((2, 0))
+        self.leaves = []  # (ix, iy) lower left lattice nodes per level
+
+    @property
+    def evaluations(self):
+        return len(self.keys)
+
+    def _key(self, ix, iy):
+        return iy.astype(np.int64) * (self.cells_x + 1) + ix
+
+    def _evaluate(self, ix, iy):
+        """Evaluates the lattice nodes (ix, iy) that are not known yet"""
+        keys = np.unique(self._key(ix, iy))
+        keys = keys[~np.isin(keys, self.keys, assume_unique=True)]
+        if len(keys) == 0:
+            return
+        px = self.x_min + (keys % (self.cells_x + 1)) * self.h
+        py = self.y_min + (keys // (self.cells_x + 1)) * self.h
+        values = np.zeros((2, len(keys)))
+        accumulate_E(px, py, *self.charges, values[0], values[1])
+        keys = np.concatenate([self.keys, keys])
+        order = np.argsort(keys, kind="stable")
+        self.keys = keys[order]
+        self.values = np.concatenate([self.values, values], axis=1)[:, order]
+
+    def _lookup(self, ix, iy):
+        return self.values[:, np.searchsorted(self.keys, self._key(ix, iy))]
+
+    def _forced(self, ix, iy, size):
+        """Returns which cells hold a charge or are crossed by the head circle"""
+        nx = self.cells_x // size
+        ny = self.cells_y // size
+        cx, cy, _ = self.charges
+        # Charges outside the domain do not force any cell
+        col = np.floor((cx - self.x_min) / self.h / size).astype(np.int64)
+        row = np.floor((cy - self.y_min) / self.h / size).astype(np.int64)
+        # On the upper edges the charge belongs to the last cell
+        col[(col == nx) & (cx <= self.x_min + self.cells_x * self.h)] = nx - 1
+        row[(row == ny) & (cy <= self.y_min + self.cells_y * self.h)] = ny - 1
+        inside = (col >= 0) & (col < nx) & (row >= 0) & (row < ny)
+        charge_cells = np.unique(row[inside] * nx + col[inside])
+        forced = np.isin((iy // size) * nx + ix // size, charge_cells)
+        if self.radius:
+            x0 = self.x_min + ix * self.h
+            y0 = self.y_min + iy * self.h
+            x1 = x0 + size * self.h
+            y1 = y0 + size * self.h
+            near = np.hypot(
+                np.maximum(np.maximum(x0, -x1), 0), np.maximum(np.maximum(y0, -y1), 0)
+            )
+            far = np.hypot(
+                np.maximum(np.abs(x0), np.abs(x1)), np.maximum(np.abs(y0), np.abs(y1))
+            )
+            forced |= (near <= self.radius) & (self.radius <= far)
+        return forced
+
+    def refine(self, progress=None, cancel=None):
+        """Samples the domain, returns False if cancelled"""
+        size = 2**self.depth
+        iy, ix = np.mgrid[0 : self.cells_y : size, 0 : self.cells_x : size]
+        ix = ix.ravel()
+        iy = iy.ravel()
+        self._evaluate(
+            np.concatenate([ix, ix + size, ix, ix + size]),
+            np.concatenate([iy, iy, iy + size, iy + size]),
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for level in range(self.depth + 1):
+                if cancel is not None and cancel.is_set():
+                    return False
+                if level == self.depth:
+                    self.leaves.append((ix, iy))
+                    break
+                half = size // 2
+                self._evaluate(ix + half, iy + half)
+                center = self._lookup(ix + half, iy + half)
+                estimate = (
+                    self._lookup(ix, iy)
+                    + self._lookup(ix + size, iy)
+                    + self._lookup(ix, iy + size)
+                    + self._lookup(ix + size, iy + size)
+                ) / 4
+                error = np.hypot(*(center - estimate)) / np.hypot(*center)
+                split = ~(error <= self.tolerance) | self._forced(ix, iy, size)
+                self.leaves.append((ix[~split], iy[~split]))
+                ix = np.concatenate([ix[split] + dx for dx in (0, half, 0, half)])
+                iy = np.concatenate([iy[split] + dy for dy in (0, 0, half, half)])
+                size = half
+                self._evaluate(
+                    np.concatenate([ix, ix + size, ix, ix + size]),
+                    np.concatenate([iy, iy, iy + size, iy + size]),
+                )
+                if progress is not None:
+                    progress((level + 1) / (self.depth + 1))
+        return True
+
+    def resample(self, xs, ys):
+        """Interpolates the sampled field onto the grid spanned by xs and ys"""
+        E_x = np.empty((len(ys), len(xs)))
+        E_y = np.empty((len(ys), len(xs)))
+        u_row = (xs - self.x_min) / self.h
+        leaf_keys = []
+        for level, (ix, iy) in enumerate(self.leaves):
+            size = 2 ** (self.depth - level)
+            leaf_keys.append(
+                np.sort((iy // size) * (self.cells_x // size) + ix // size)
+            )
+        for r0 in range(0, len(ys), RESAMPLE_ROWS):
+            r1 = min(r0 + RESAMPLE_ROWS, len(ys))
+            u = np.tile(u_row, r1 - r0)
+            v = np.repeat((ys[r0:r1] - self.y_min) / self.h, len(xs))
+            cell_x = np.zeros(len(u), dtype=np.int64)
+            cell_y = np.zeros(len(u), dtype=np.int64)
+            sizes = np.zeros(len(u), dtype=np.int64)
+            todo = np.ones(len(u), dtype=bool)
+            for level in reversed(range(len(self.leaves))):
+                if len(leaf_keys[level]) == 0:
+                    continue
+                size = 2 ** (self.depth - level)
+                nx = self.cells_x // size
+                cx = np.clip((u // size).astype(np.int64), 0, nx - 1)
+                cy = np.clip((v // size).astype(np.int64), 0, self.cells_y // size - 1)
+                keys = cy * nx + cx
+                found = np.searchsorted(leaf_keys[level], keys)
+                found = np.minimum(found, len(leaf_keys[level]) - 1)
+                hit = todo & (leaf_keys[level][found] == keys)
+                cell_x[hit] = cx[hit] * size
+                cell_y[hit] = cy[hit] * size
+                sizes[hit] = size
+                todo &= ~hit
+            fx = np.clip((u - cell_x) / sizes, 0, 1)
+            fy = np.clip((v - cell_y) / sizes, 0, 1)
+            field = (
+                self._lookup(cell_x, cell_y) * (1 - fx) * (1 - fy)
+                + self._lookup(cell_x + sizes, cell_y) * fx * (1 - fy)
+                + self._lookup(cell_x, cell_y + sizes) * (1 - fx) * fy
+                + self._lookup(cell_x + sizes, cell_y + sizes) * fx * fy
+            )
+            E_x[r0:r1] = field[0].reshape(r1 - r0, len(xs))
+            E_y[r0:r1] = field[1].reshape(r1 - r0, len(xs))
+        return E_x, E_y
+
+
+def calculate_E(
+    charges,
+    xs,
+    ys,
+    progress=None,
+    cancel=None,
+    resolution=4000,
+    tolerance=TOLERANCE,
+    radius=None,
+):
+    """Computes E_x and E_y on the grid spanned by xs and ys through adaptive
+    sampling of its extent at up to resolution points across the longer
+    side"""
+    bounds = (
+        min(xs[0], xs[-1]),
+        max(xs[0], xs[-1]),
+        min(ys[0], ys[-1]),
+        max(ys[0], ys[-1]),
+    )
+    grid = AdaptiveGrid(charges, bounds, resolution, tolerance, radius)
+    if not grid.refine(progress, cancel):
+        return None
+    return grid.resample(xs, ys)
@@ -0,0 +1,249 @@
+"""Animations of moving and oscillating charges.
+
+Fields are computed quasi-statically: each frame is the Coulomb field of
+the charges at their positions and values at that time, which holds while
+the charges move much slower than light over the domain (retardation
+across 40 cm is about a nanosecond). Frames are evaluated ``BATCH`` time
+steps at a time. When the charges do not move (``alternate``) a batch is
+a single pass over the grid with the charge values of all its frames in
+one matrix product. Computed frames are kept in a FieldCache so scrubbing
+back to them is instant, and saving streams them to an animation writer
+one frame at a time.
+"""
+
+import numpy as np
+
+from electricfield.cache import FieldCache, field_key
+from electricfield.charges import ChargeSet
+from electricfield.field import (
+    BLOCK_BYTES,
+    CHARGE_CHUNK,
+    K_E,
+    PROGRESS_POINTS,
+    accumulate_E,
+)
+from electricfield.settings import grid_coordinates
+
+# oscillate: charges move by amplitude (cm) * sin(2 pi f t) along angle
+# translate: charges move at amplitude (cm/s) along angle
+# alternate: charge values follow q * cos(2 pi f t), positions are fixed
+MOTIONS = ("oscillate", "translate", "alternate")
+BATCH = 8
+FRAME_CACHE_BYTES = 512 * 2**20
+# Motion and timing of a new animation, duration in s
+DEFAULT_OPTIONS = {
+    "motion": "oscillate",
+    "amplitude": 1.0,
+    "frequency": 1.0,
+    "angle": 0.0,
+    "duration": 1.0,
+    "frames": 25,
+    "fps": 10,
+}
+
+
+def charges_at(charges, times, motion, amplitude, frequency=1.0, angle=0.0):
+    """Returns X (cm), Y (cm) and q (C) of shape (len(times), n)"""
+    X, Y, q = (np.asarray(a, dtype=float) for a in (charges.X, charges.Y, charges.q))
+    t = np.asarray(times, dtype=float)[:, None]
+    direction = np.radians(angle)
+    if motion == "oscillate":
+        shift = amplitude * np.sin(2 * np.pi * frequency * t)
+    elif motion == "translate":
+        shift = amplitude * t
+    elif motion == "alternate":
+        shift = np.zeros_like(t)
+        q = q * np.cos(2 * np.pi * frequency * t)
+    else:
+        raise ValueError(f"Unknown motion {motion!r}, expected one of {MOTIONS}")
+    shape = (len(t), len(X))
+    return (
+        np.broadcast_to(X + shift * np.cos(direction), shape),
+        np.broadcast_to(Y + shift * np.sin(direction), shape),
+        np.broadcast_to(q, shape),
+    )
+
+
+def calculate_E_frames(X, Y, q, xs, ys, cancel=None, dtype=float):
+    """Computes E_x and E_y of shape (frames, len(ys), len(xs)) for charges
+    given as (frames, n) arrays in cm and C"""
+    frames = X.shape[0]
+    shape = (frames, len(ys), len(xs))
+    E_x = np.zeros(shape, dtype=dtype)
+    E_y = np.zeros(shape, dtype=dtype)
+    static = bool(np.all(X == X[:1]) and np.all(Y == Y[:1]))
+    rows = max(1, PROGRESS_POINTS // max(len(xs), 1))
+    for r0 in range(0, len(ys), rows):
+        if cancel is not None and cancel.is_set():
+            return None
+        r1 = min(r0 + rows, len(ys))
+        px = np.tile(xs, r1 - r0)
+        py = np.repeat(ys[r0:r1], len(xs))
+        if static:
+            _accumulate_frames(
+                px,
+                py,
+                X[0] * 1e-2,
+                Y[0] * 1e-2,
+                q,
+                E_x[:, r0:r1].reshape(frames, -1),
+                E_y[:, r0:r1].reshape(frames, -1),
+            )
+            continue
+        for frame in range(frames):
+            accumulate_E(
+                px,
+                py,
+                X[frame] * 1e-2,
+                Y[frame] * 1e-2,
+                q[frame],
+                E_x[frame, r0:r1].reshape(-1),
+                E_y[frame, r0:r1].reshape(-1),
+            )
+    return E_x, E_y
+
+
+def _accumulate_frames(px, py, cx, cy, cq, ex, ey, block_bytes=BLOCK_BYTES):
+    """accumulate_E for charges at fixed positions whose values differ per
+    frame: the geometry of a block is computed once for all frames"""
+    kq = K_E * cq
+    chunk = min(cx.shape[0], CHARGE_CHUNK) or 1
+    block = max(1, block_bytes // (3 * 8 * chunk))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for c0 in range(0, len(cx), CHARGE_CHUNK):
+            c1 = c0 + CHARGE_CHUNK
+            cxc = cx[c0:c1, None]
+            cyc = cy[c0:c1, None]
+            kqc = kq[:, c0:c1]
+            for p0 in range(0, len(px), block):
+                p1 = p0 + block
+                dx = px[None, p0:p1] - cxc
+                dy = py[None, p0:p1] - cyc
+                r3 = dx * dx
+                r3 += dy * dy
+                r3 *= np.sqrt(r3)
+                np.divide(dx, r3, out=dx)
+                np.divide(dy, r3, out=dy)
+                ex[:, p0:p1] += kqc @ dx
+                ey[:, p0:p1] += kqc @ dy
+
+
+class Animation:
+    """Frames of charges following a motion over times (s)"""
+
+    def __init__(
+        self,
+        charges,
+        settings,
+        times,
+        motion,
+        amplitude,
+        frequency=1.0,
+        angle=0.0,
+        cache=None,
+    ):
+        self.charges = charges
+        self.settings = settings
+        self.times = np.asarray(times, dtype=float)
+        self.motion = (motion, float(amplitude), float(frequency), float(angle))
+        self.coordinates = grid_coordinates(settings)
+        self.dtype = settings.get("precision", "float64")
+        self.cache = cache if cache is not None else FieldCache(FRAME_CACHE_BYTES)
+        self.key = field_key(
+            charges,
+            settings.get("lim"),
+            settings.get("npoints"),
+            settings.get("radius"),
+            "animation",
+            self.dtype,
+            self.motion,
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    def charge_set(self, index):
+        """Returns the charges of frame index as a ChargeSet"""
+        X, Y, q = charges_at(self.charges, self.times[index : index + 1], *self.motion)
+        return ChargeSet(X[0], Y[0], q[0])
+
+    def cached(self, index):
+        return self._key(index) in self.cache
+
+    def frame(self, index, progress=None, cancel=None):
+        """Returns (E_x, E_y) of frame index, computed on a cache miss"""
+        for _, fields in self.frames([index], cancel):
+            return fields
+
+    def frames(self, indices=None, cancel=None, batch=BATCH):
+        """Yields (index, (E_x, E_y)) in order, computing the frames missing
+        from the cache batch time steps at a time"""
+        if indices is None:
+            indices = range(len(self))
+        indices = list(indices)
+        for start in range(0, len(indices), batch):
+            chunk = indices[start : start + batch]
+            found = {i: self.cache.get(self._key(i)) for i in chunk}
+            missing = [i for i in chunk if found[i] is None]
+            if missing:
+                X, Y, q = charges_at(self.charges, self.times[missing], *self.motion)
+                fields = calculate_E_frames(
+                    X, Y, q, self.coordinates, self.coordinates, cancel, self.dtype
+                )
+                if fields is None:
+                    return
+                for i, index in enumerate(missing):
+                    found[index] = (fields[0][i].copy(), fields[1][i].copy())
+                    self.cache.put(self._key(index), found[index])
+            for index in chunk:
+                yield index, found[index]
+
+    def compute(self, progress=None, cancel=None, batch=BATCH):
+        """Computes every frame into the cache, returns False when cancelled"""
+        for index, _ in self.frames(cancel=cancel, batch=batch):
+            if progress is not None:
+                progress((index + 1) / len(self))
+        return not (cancel is not None and cancel.is_set())
+
+    def save(self, path, fps=10, dpi=None, progress=None, cancel=None, batch=BATCH):
+        """Streams every frame to a video or GIF at path.
+
+        Uses ffmpeg when available (or ImageMagick for GIFs), which take the
+        frames one at a time. Without either, GIFs are written with Pillow,
+        which keeps the encoded frames until the end.
+        """
+        from matplotlib import animation
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        from electricfield.plot import FieldFigure
+
+        if animation.writers.is_available("ffmpeg"):
+            writer = animation.FFMpegWriter(fps=fps)
+        elif path.lower().endswith(".gif"):
+            if animation.writers.is_available("imagemagick"):
+                writer = animation.ImageMagickWriter(fps=fps)
+            else:
+                writer = animation.PillowWriter(fps=fps)
+        else:
+            raise RuntimeError(
+                "Saving videos needs ffmpeg, install it or save as .gif instead"
+            )
+        view = FieldFigure(self.settings.get("figsize"), interactive=False)
+        FigureCanvasAgg(view.figure)
+        with writer.saving(view.figure, path, dpi or view.figure.dpi):
+            for index, fields in self.frames(cancel=cancel, batch=batch):
+                view.update(
+                    fields,
+                    self.charge_set(index),
+                    self.settings,
+                    f"t = {self.times[index]:.4g} s",
+                )
+                writer.grab_frame()
+                if progress is not None:
+                    progress((index + 1) / len(self))
+        if cancel is not None and cancel.is_set():
+            return None
+        return path
+
+    def _key(self, index):
+        return f"{self.key}_{self.times[index]!r}"
@@ -0,0 +1,324 @@
+"""Headless computation of many charge layouts.
+
+Every layout file is a job run by a process pool. A job writes
+``<name>_Ex.npy``, ``<name>_Ey.npy`` and ``<name>_E.npy`` (and optionally
+``<name>.png`` and a ``<name>.efs`` session, see electricfield.session) to
+the output directory and reports its timing. With a ``store_dir``
+setting each grid is instead streamed to a FieldStore. Probe runs write
+the field at sensor positions only, see electricfield.probes, and sweeps
+the statistics of many sets of charge values, see electricfield.sweep.
+Volume runs stream z-slices to disk, see electricfield.volume.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from electricfield.field import BACKENDS, field_magnitude
+from electricfield.fieldlines import compute_overlay
+from electricfield.loader import READERS, load_charges
+from electricfield.probes import LeadField, save_probes
+from electricfield.session import result_key, save_session
+from electricfield.settings import backend_options, grid_coordinates
+from electricfield.store import FieldStore, compute_store
+from electricfield.sweep import HIST_BINS, HIST_RANGE, UnitBasis, sweep
+from electricfield.volume import compute_volume, z_coordinates
+
+
+def output_name(path):
+    """Returns the name the outputs of the layout at path start with"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def check_names(paths):
+    """Raises ValueError when layouts in paths share an output name, as
+    their outputs would overwrite each other"""
+    seen = {}
+    for path in paths:
+        seen.setdefault(output_name(path), []).append(path)
+    clashes = [", ".join(group) for group in seen.values() if len(group) > 1]
+    if clashes:
+        raise ValueError(
+            "layouts with the same file name would overwrite each other's"
+            " outputs: " + "; ".join(clashes)
+        )
+
+
+def find_inputs(patterns):
+    """Expands directories and glob patterns into a sorted list of files,
+    raises ValueError when two of them share an output name"""
+    paths = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            for extension in READERS:
+                paths.update(glob.glob(os.path.join(pattern, f"*{extension}")))
+        else:
+            paths.update(glob.glob(pattern))
+    paths = sorted(paths)
+    check_names(paths)
+    return paths
+
+
+def save_png(path, fields, charges, settings):
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    from electricfield.plot import FieldFigure
+
+    view = FieldFigure(settings.get("figsize"), interactive=False)
+    FigureCanvasAgg(view.figure)
+    if isinstance(fields, FieldStore):
+        fields = fields.fields_for(view.pixels())
+    view.update(fields, charges, settings)
+    if settings.get("field_lines") == "on" or settings.get("equipotentials"):
+        view.set_overlay(*compute_overlay(charges, settings, fields))
+    view.figure.savefig(path)
+
+
+def run_job(path, settings, out_dir, png=False, session=False):
+    """Computes the field of one layout file, returns its timing report"""
+    name = output_name(path)
+    start = time.perf_counter()
+    charges = load_charges(path)
+    loaded = time.perf_counter()
+    coordinates = grid_coordinates(settings)
+    calculate = BACKENDS[settings.get("backend")]
+    options = backend_options(settings)
+    if settings.get("store_dir"):
+        # Streamed to a FieldStore in store_dir/<name>, see electricfield.store
+        fields = compute_store(
+            charges,
+            coordinates,
+            coordinates,
+            os.path.join(settings.get("store_dir"), name),
+            calculate,
+            **options,
+        )
+        computed = time.perf_counter()
+    else:
+        fields = E_x, E_y = calculate(charges, coordinates, coordinates, **options)
+        computed = time.perf_counter()
+        np.save(os.path.join(out_dir, f"{name}_Ex.npy"), E_x)
+        np.save(os.path.join(out_dir, f"{name}_Ey.npy"), E_y)
+        # Written straight to the file, without a third grid in memory
+        magnitude = open_memmap(
+            os.path.join(out_dir, f"{name}_E.npy"), "w+", E_x.dtype, E_x.shape
+        )
+        field_magnitude(E_x, E_y, out=magnitude)
+        magnitude.flush()
+        del magnitude
+    if png:
+        save_png(os.path.join(out_dir, f"{name}.png"), fields, charges, settings)
+    if session:
+        if isinstance(fields, FieldStore):
+            fields = fields.level(0)
+        save_session(
+            os.path.join(out_dir, f"{name}.efs"),
+            charges,
+            settings,
+            fields,
+            result_key(charges, settings),
+        )
+    return {
+        "file": path,
+        "charges": len(charges),
+        "points": len(coordinates) ** 2,
+        "load_s": loaded - start,
+        "compute_s": computed - loaded,
+        "write_s": time.perf_counter() - computed,
+        "total_s": time.perf_counter() - start,
+    }
+
+
+def run_batch(
+    paths, settings, out_dir, jobs=None, png=False, report=print, session=False
+):
+    """Runs every layout in paths through a process pool of jobs processes.
+
+    Returns the per-job reports, failed jobs get an ``error`` entry.
+    """
+    check_names(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    results = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(jobs) as pool:
+        futures = {
+            pool.submit(run_job, path, settings, out_dir, png, session): path
+            for path in paths
+        }
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as error:
+                result = {"file": futures[future], "error": str(error)}
+                report(f"{result['file']}: failed, {error}")
+            else:
+                report(
+                    f"{result['file']}: {result['charges']} charges,"
+                    f" {result['points']} points in {result['total_s']:.2f} s"
+                    f" (compute {result['compute_s']:.2f} s,"
+                    f" {result['points'] / max(result['compute_s'], 1e-9):.3g}"
+                    " points/s)"
+                )
+            results.append(result)
+    elapsed = time.perf_counter() - start
+    done = [r for r in results if "error" not in r]
+    points = sum(r["points"] for r in done)
+    report(
+        f"{len(done)}/{len(results)} layouts in {elapsed:.2f} s:"
+        f" {len(done) / elapsed:.3g} layouts/s, {points / elapsed:.3g} points/s"
+    )
+    return results
+
+
+def run_probes(paths, sx, sy, out_dir, report=print):
+    """Evaluates every layout in paths at the sensors (sx, sy) and writes
+    ``<name>_probes.csv``. Layouts sharing charge positions reuse the same
+    lead-field matrices, so they run in this process one after another.
+    """
+    check_names(paths)
+    os.makedirs(out_dir, exist_ok=True)
+    field = LeadField(sx, sy)
+    results = []
+    for path in paths:
+        name = output_name(path)
+        start = time.perf_counter()
+        try:
+            charges = load_charges(path)
+            E_x, E_y = field.evaluate(charges)
+            save_probes(os.path.join(out_dir, f"{name}_probes.csv"), sx, sy, E_x, E_y)
+        except Exception as error:
+            result = {"file": path, "error": str(error)}
+            report(f"{path}: failed, {error}")
+        else:
+            result = {
+                "file": path,
+                "charges": len(charges),
+                "sensors": len(sx),
+                "total_s": time.perf_counter() - start,
+            }
+            report(
+                f"{path}: {result['charges']} charges at {result['sensors']}"
+                f" sensors in {result['total_s']:.3f} s"
+            )
+        results.append(result)
+    return results
+
+
+def run_sweep(
+    path,
+    Q,
+    settings,
+    out_dir,
+    sensors=None,
+    basis_dir=None,
+    dtype=np.float32,
+    bins=HIST_BINS,
+    report=print,
+):
+    """Evaluates the layout at path with every row of Q as charge values.
+
+    Streams one row of statistics per sweep to ``<name>_sweeps.csv`` and
+    the log10 |E| histograms to ``<name>_hist.npy`` (bin edges in
+    ``<name>_hist_edges.npy``). ``sensors`` are optional (x, y) arrays (m)
+    whose field is added to every row. Returns the timing report.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    name = output_name(path)
+    start = time.perf_counter()
+    charges = load_charges(path)
+    if Q.ndim != 2 or Q.shape[1] != len(charges):
+        raise ValueError(
+            f"{path} has {len(charges)} charges, the charge values must be"
+            f" sweeps x {len(charges)}"
+        )
+    coordinates = grid_coordinates(settings)
+    size = UnitBasis.size(charges, coordinates, coordinates, dtype)
+    if basis_dir is None and size > settings.get("memory_mb") * 2**20:
+        raise MemoryError(
+            f"The unit charge basis needs {size / 2**20:.0f} MB, more than the"
+            f" {settings.get('memory_mb')} MB memory budget (use --basis-dir,"
+            " --memory-mb or fewer points)"
+        )
+    basis = UnitBasis.compute(charges, coordinates, coordinates, basis_dir, dtype)
+    built = time.perf_counter()
+    probe = LeadField(*sensors) if sensors is not None else None
+    columns = ["sweep", "max_E", "x", "y"]
+    if probe is not None:
+        columns += [f"{c}_{i}" for i in range(len(probe)) for c in ("E_x", "E_y", "E")]
+    hist = open_memmap(
+        os.path.join(out_dir, f"{name}_hist.npy"), "w+", np.int64, (len(Q), bins)
+    )
+    np.save(
+        os.path.join(out_dir, f"{name}_hist_edges.npy"),
+        np.linspace(*HIST_RANGE, bins + 1),
+    )
+    with open(os.path.join(out_dir, f"{name}_sweeps.csv"), "w") as file:
+        file.write(",".join(columns) + "\n")
+        for stats in sweep(basis, Q, probe, charges, bins=bins):
+            row = [stats["max_E"], stats["x"], stats["y"]]
+            if probe is not None:
+                E = field_magnitude(stats["E_x"], stats["E_y"])
+                row += np.column_stack([stats["E_x"], stats["E_y"], E]).ravel().tolist()
+            file.write(f"{stats['sweep']}," + ",".join(f"{v:.9g}" for v in row) + "\n")
+            hist[stats["sweep"]] = stats["hist"]
+    hist.flush()
+    result = {
+        "file": path,
+        "charges": len(charges),
+        "sweeps": len(Q),
+        "basis_s": built - start,
+        "sweep_s": time.perf_counter() - built,
+    }
+    report(
+        f"{path}: {result['sweeps']} sweeps of {result['charges']} charges,"
+        f" basis {result['basis_s']:.2f} s, sweeps {result['sweep_s']:.2f} s"
+        f" ({result['sweeps'] / max(result['sweep_s'], 1e-9):.3g} sweeps/s)"
+    )
+    return result
+
+
+def run_volume(paths, settings, out_dir, report=print):
+    """Computes the volume of every layout in paths into ``out_dir/<name>``
+    (see electricfield.volume). Returns the per-layout reports, failed
+    layouts get an ``error`` entry.
+    """
+    check_names(paths)
+    coordinates = grid_coordinates(settings)
+    zs = z_coordinates(settings)
+    results = []
+    for path in paths:
+        name = output_name(path)
+        start = time.perf_counter()
+        try:
+            charges = load_charges(path)
+            compute_volume(
+                charges,
+                coordinates,
+                coordinates,
+                zs,
+                os.path.join(out_dir, name),
+                dtype=settings.get("precision"),
+                workers=settings.get("workers"),
+                memory=settings.get("memory_mb") * 2**20,
+            )
+        except Exception as error:
+            result = {"file": path, "error": str(error)}
+            report(f"{path}: failed, {error}")
+        else:
+            result = {
+                "file": path,
+                "charges": len(charges),
+                "points": len(coordinates) ** 2 * len(zs),
+                "total_s": time.perf_counter() - start,
+            }
+            report(
+                f"{path}: {result['charges']} charges, {len(zs)} slices of"
+                f" {len(coordinates)}^2 points in {result['total_s']:.2f} s"
+                f" ({result['points'] / max(result['total_s'], 1e-9):.3g} points/s)"
+            )
+        results.append(result)
+    return results
@@ -0,0 +1,83 @@
+"""Content addressed cache of computed field grids.
+
+Grids are keyed by a hash of everything that determines them, so display
+only settings (linthresh, linscale, vmin, vmax) never cause a recompute.
+Entries live in an in-memory LRU bounded by a byte budget and, when a
+directory is given, are also persisted as ``<key>_x.npy``/``<key>_y.npy``.
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+from electricfield.field import charge_arrays
+
+
+def field_key(charges, lim, npoints, radius, *extra):
+    """Returns a hex digest identifying the field grid of a configuration.
+
+    ``extra`` identifies approximate backends so their results are never
+    returned for an exact run.
+    """
+    digest = hashlib.sha1()
+    for array in charge_arrays(charges):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    digest.update(repr((float(lim), int(npoints), float(radius))).encode())
+    if extra:
+        digest.update(repr(extra).encode())
+    return digest.hexdigest()
+
+
+class FieldCache:
+    """LRU of ``key -> (E_x, E_y)`` holding at most ``max_bytes`` in memory"""
+
+    def __init__(self, max_bytes=512 * 2**20, directory=None):
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.nbytes = 0
+
+    def __contains__(self, key):
+        return key in self.entries or (
+            self.directory is not None and os.path.exists(self._path(key, "y"))
+        )
+
+    def get(self, key):
+        """Returns the cached fields for key or None"""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        if self.directory is None or not os.path.exists(self._path(key, "y")):
+            return None
+        fields = (np.load(self._path(key, "x")), np.load(self._path(key, "y")))
+        self._remember(key, fields)
+        return fields
+
+    def put(self, key, fields):
+        self._remember(key, fields)
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+            # Write E_y last, get() treats its presence as a complete entry
+            np.save(self._path(key, "x"), fields[0])
+            np.save(self._path(key, "y"), fields[1])
+
+    def clear(self):
+        self.entries.clear()
+        self.nbytes = 0
+
+    def _remember(self, key, fields):
+        if key in self.entries:
+            self.nbytes -= sum(f.nbytes for f in self.entries.pop(key))
+        size = sum(f.nbytes for f in fields)
+        if size > self.max_bytes:
+            return
+        self.entries[key] = fields
+        self.nbytes += size
+        while self.nbytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.nbytes -= sum(f.nbytes for f in evicted)
+
+    def _path(self, key, component):
+        return os.path.join(self.directory, f"{key}_{component}.npy")
@@ -0,0 +1,84 @@
+"""Columnar storage for charge layouts.
+
+The GUI historically kept charges as a list of ``{"X", "Y", "q"}`` dicts.
+ChargeSet keeps the same view (indexing and iterating yield such dicts)
+but stores three growable float arrays, so layouts with millions of
+charges can be loaded, copied and handed to the field engines without
+creating a Python object per charge.
+"""
+
+import numpy as np
+
+
+class ChargeSet:
+    """X and Y in cm, q in C"""
+
+    def __init__(self, X=(), Y=(), q=()):
+        self._data = np.empty((3, 0))
+        self._size = 0
+        self.extend(X, Y, q)
+
+    @property
+    def X(self):
+        return self._data[0, : self._size]
+
+    @property
+    def Y(self):
+        return self._data[1, : self._size]
+
+    @property
+    def q(self):
+        return self._data[2, : self._size]
+
+    def __len__(self):
+        return self._size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._size))]
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError("charge index out of range")
+        x, y, q = self._data[:, index].tolist()
+        return {"X": x, "Y": y, "q": q}
+
+    def __iter__(self):
+        for x, y, q in self._data[:, : self._size].T.tolist():
+            yield {"X": x, "Y": y, "q": q}
+
+    def __setitem__(self, index, charge):
+        if index < 0:
+            index += self._size
+        self._data[:, index] = charge["X"], charge["Y"], charge["q"]
+
+    def __delitem__(self, index):
+        if index < 0:
+            index += self._size
+        self._data[:, index : self._size - 1] = self._data[:, index + 1 : self._size]
+        self._size -= 1
+
+    def _reserve(self, size):
+        if size > self._data.shape[1]:
+            grown = np.empty((3, max(size, 2 * self._data.shape[1], 16)))
+            grown[:, : self._size] = self._data[:, : self._size]
+            self._data = grown
+
+    def append(self, charge):
+        self._reserve(self._size + 1)
+        self._data[:, self._size] = charge["X"], charge["Y"], charge["q"]
+        self._size += 1
+
+    def extend(self, X, Y, q):
+        n = len(q)
+        self._reserve(self._size + n)
+        self._data[0, self._size : self._size + n] = X
+        self._data[1, self._size : self._size + n] = Y
+        self._data[2, self._size : self._size + n] = q
+        self._size += n
+
+    def clear(self):
+        self._size = 0
+
+    def copy(self):
+        return ChargeSet(self.X, self.Y, self.q)
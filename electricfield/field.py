@@ -0,0 +1,212 @@
+"""Vectorized Coulomb superposition for stationary point charges.
+
+Charges are given the same way the GUI stores them: a list of
+``{"X": cm, "Y": cm, "q": C}`` records. Fields are returned in N/C on a
+grid described by two 1-D coordinate vectors in meters, laid out like
+``np.meshgrid(xs, ys, indexing="xy")`` (rows follow ``ys``).
+"""
+
+import numpy as np
+
+EPSILON_0 = 8.8541878128e-12
+K_E = 1 / (4 * np.pi * EPSILON_0)
+
+# Size in bytes of the scratch arrays used for one (charges x points) block.
+# Small enough to stay in L2 cache, large enough to amortize the Python loop.
+BLOCK_BYTES = 1 << 20
+CHARGE_CHUNK = 256
+# Number of grid points finished between two progress reports
+PROGRESS_POINTS = 1 << 16
+# Default memory budget in bytes for the output grids and scratch arrays
+MEMORY_BUDGET = 1 << 30
+
+
+def charge_arrays(charges):
+    """Returns x (m), y (m) and q (C) float arrays for a list of charges"""
+    if hasattr(charges, "q"):  # ChargeSet, already columnar
+        return charges.X * 1e-2, charges.Y * 1e-2, charges.q.copy()
+    n = len(charges)
+    x = np.fromiter((c["X"] for c in charges), dtype=float, count=n) * 1e-2
+    y = np.fromiter((c["Y"] for c in charges), dtype=float, count=n) * 1e-2
+    q = np.fromiter((c["q"] for c in charges), dtype=float, count=n)
+    return x, y, q
+
+
+def accumulate_E(px, py, cx, cy, cq, ex, ey, block_bytes=BLOCK_BYTES):
+    """Adds the field of charges (cx, cy, cq) at points (px, py) to ex and ey"""
+    kq = K_E * cq
+    chunk = min(len(cq), CHARGE_CHUNK) or 1
+    block = max(1, block_bytes // (3 * 8 * chunk))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for c0 in range(0, len(cq), CHARGE_CHUNK):
+            c1 = c0 + CHARGE_CHUNK
+            cxc = cx[c0:c1, None]
+            cyc = cy[c0:c1, None]
+            kqc = kq[c0:c1]
+            for p0 in range(0, len(px), block):
+                p1 = p0 + block
+                dx = px[None, p0:p1] - cxc
+                dy = py[None, p0:p1] - cyc
+                r3 = dx * dx
+                r3 += dy * dy
+                r3 *= np.sqrt(r3)
+                np.divide(dx, r3, out=dx)
+                np.divide(dy, r3, out=dy)
+                ex[p0:p1] += kqc @ dx
+                ey[p0:p1] += kqc @ dy
+
+
+def plan_blocks(shape, dtype=float, memory=None, extra=0):
+    """Returns the rows per block and scratch bytes per (charges x points)
+    block that keep E_x, E_y, |E|, extra bytes and the scratch arrays within
+    memory"""
+    memory = int(memory or MEMORY_BUDGET)
+    rows, cols = shape
+    grids = 3 * rows * cols * np.dtype(dtype).itemsize + extra
+    scratch = memory - grids
+    if scratch < 1 << 20:
+        raise MemoryError(
+            f"A {rows}x{cols} grid needs {grids / 2**20:.0f} MB, more than the"
+            f" {memory / 2**20:.0f} MB memory budget (use float32, fewer points or a large grid folder)"
+        )
+    # Coordinates of a row block take 16 bytes per point
+    points = min(PROGRESS_POINTS, scratch // 2 // 16)
+    return max(1, points // max(cols, 1)), min(BLOCK_BYTES, scratch // 2)
+
+
+def calculate_E(
+    charges,
+    xs,
+    ys,
+    progress=None,
+    cancel=None,
+    workers=1,
+    dtype=float,
+    memory=None,
+    symmetry=False,
+):
+    """Computes E_x and E_y on the grid spanned by xs and ys.
+
+    Only the in-plane components are evaluated, directly from the 1-D
+    coordinate vectors. ``dtype`` is the dtype of the returned grids
+    (float32 halves their memory) and ``memory`` a budget in bytes the
+    grids plus scratch arrays must fit in, blocks are sized accordingly.
+    ``progress`` is called with the finished fraction after each block of
+    rows and the computation stops early (returning None) once ``cancel``
+    (a ``threading.Event``) is set. With ``workers > 1`` the grid is split
+    into tiles evaluated by a process pool (see electricfield.parallel).
+    With ``symmetry`` a single process only evaluates the fundamental
+    domain of the mirror and rotation symmetries of the layout and grid
+    (see electricfield.symmetry), if it has any and its orbit bookkeeping
+    fits in ``memory`` too.
+    """
+    shape = (len(ys), len(xs))
+    rows, block_bytes = plan_blocks(shape, dtype, memory)
+    if symmetry and workers <= 1:
+        from electricfield.symmetry import (
+            MIN_CHARGES,
+            calculate_E_symmetric,
+            fits_symmetric,
+            symmetry_group,
+        )
+
+        group = symmetry_group(charges, xs, ys) if len(charges) >= MIN_CHARGES else []
+        if len(group) > 1 and fits_symmetric(shape, dtype, memory):
+            return calculate_E_symmetric(
+                charges, xs, ys, group, progress, cancel, dtype, memory
+            )
+    if workers > 1:
+        from electricfield.parallel import calculate_E_parallel
+
+        return calculate_E_parallel(
+            charges, xs, ys, progress, cancel, workers, dtype=dtype, memory=memory
+        )
+    cx, cy, cq = charge_arrays(charges)
+    E_x = np.zeros(shape, dtype=dtype)
+    E_y = np.zeros(shape, dtype=dtype)
+    for r0 in range(0, len(ys), rows):
+        if cancel is not None and cancel.is_set():
+            return None
+        r1 = min(r0 + rows, len(ys))
+        px = np.tile(xs, r1 - r0)
+        py = np.repeat(ys[r0:r1], len(xs))
+        accumulate_E(
+            px,
+            py,
+            cx,
+            cy,
+            cq,
+            E_x[r0:r1].reshape(-1),
+            E_y[r0:r1].reshape(-1),
+            block_bytes,
+        )
+        if progress is not None:
+            progress(r1 / len(ys))
+    return E_x, E_y
+
+
+def field_magnitude(E_x, E_y, out=None):
+    """Returns |E| without temporaries, reusing out when given"""
+    return np.hypot(E_x, E_y, out=out)
+
+
+def calculate_E_pycharge(charges, xs, ys, progress=None, cancel=None):
+    """Computes E_x and E_y through pycharge's general retarded-time solver.
+
+    Kept as the reference implementation to validate the other backends.
+    """
+    import pycharge as pc
+
+    source = [
+        pc.StationaryCharge(position=(c["X"] * 1e-2, c["Y"] * 1e-2, 0), q=c["q"])
+        for c in charges
+    ]
+    simulation = pc.Simulation(source)
+    x, y, z = np.meshgrid(xs, ys, 0, indexing="xy")
+    E_x, E_y, E_z = simulation.calculate_E(t=0, x=x, y=y, z=z)
+    if progress is not None:
+        progress(1)
+    return E_x[:, :, 0], E_y[:, :, 0]
+
+
+def calculate_E_treecode(charges, xs, ys, progress=None, cancel=None, theta=0.3):
+    """Approximates E_x and E_y with the tree code in electricfield.treecode"""
+    from electricfield import treecode
+
+    return treecode.calculate_E(charges, xs, ys, progress, cancel, theta)
+
+
+def calculate_E_adaptive(
+    charges,
+    xs,
+    ys,
+    progress=None,
+    cancel=None,
+    resolution=4000,
+    tolerance=0.01,
+    radius=None,
+):
+    """Computes E_x and E_y by adaptive sampling, see electricfield.adaptive"""
+    from electricfield import adaptive
+
+    return adaptive.calculate_E(
+        charges, xs, ys, progress, cancel, resolution, tolerance, radius
+    )
+
+
+BACKENDS = {
+    "numpy": calculate_E,
+    "adaptive": calculate_E_adaptive,
+    "treecode": calculate_E_treecode,
+    "pycharge": calculate_E_pycharge,
+}
+
+
+def compare_backends(charges, xs, ys, backend="numpy", reference="pycharge"):
+    """Returns the largest relative difference between two backends"""
+    E_x, E_y = BACKENDS[backend](charges, xs, ys)
+    R_x, R_y = BACKENDS[reference](charges, xs, ys)
+    diff = np.hypot(E_x - R_x, E_y - R_y)
+    scale = np.hypot(R_x, R_y)
+    finite = np.isfinite(diff) & (scale > 0)
+    return float(np.max(diff[finite] / scale[finite], initial=0))
@@ -0,0 +1,222 @@
+"""Field lines and equipotentials.
+
+All field lines are integrated together: every RK4 step evaluates the
+field at the current point of every live line in one call. Lines start on
+a small circle around the charges (following E from positive charges and
+against it from negative ones) and stop at another charge, at the domain
+edge or after ``MAX_STEPS`` steps. The field is evaluated by direct
+summation when that is cheap and interpolated from the run's grid
+otherwise. The potential for the equipotential contours is computed on a
+grid of up to ``CONTOUR_POINTS`` a side, enough for contours at screen
+resolution.
+"""
+
+import numpy as np
+
+from electricfield.field import CHARGE_CHUNK, K_E, accumulate_E, charge_arrays
+
+SEEDS = 12  # Lines per charge
+MAX_SEEDS = 1200
+MAX_STEPS = 2000
+STEPS_PER_DOMAIN = 800  # Step length is 2 * lim / STEPS_PER_DOMAIN
+# Charge x line products below which the field is summed directly
+DIRECT_WORK = 4_000_000
+CONTOUR_POINTS = 400
+# Charge x point products the potential grid is limited to, large charge
+# sets get a coarser grid down to MIN_CONTOUR_POINTS
+CONTOUR_WORK = 2e8
+MIN_CONTOUR_POINTS = 64
+
+
+class DirectField:
+    """Exact E at arbitrary points by summation over the charges"""
+
+    def __init__(self, cx, cy, cq):
+        self.charges = cx, cy, cq
+
+    def __call__(self, px, py):
+        ex = np.zeros(len(px))
+        ey = np.zeros(len(px))
+        accumulate_E(px, py, *self.charges, ex, ey)
+        return ex, ey
+
+
+class GridField:
+    """E at arbitrary points by bilinear interpolation of a computed grid"""
+
+    def __init__(self, xs, ys, E_x, E_y):
+        self.xs = np.asarray(xs)
+        self.ys = np.asarray(ys)
+        self.grids = np.asarray(E_x, dtype=float), np.asarray(E_y, dtype=float)
+
+    def __call__(self, px, py):
+        fx = np.interp(px, self.xs, np.arange(len(self.xs)))
+        fy = np.interp(py, self.ys, np.arange(len(self.ys)))
+        ix = np.minimum(fx.astype(int), len(self.xs) - 2)
+        iy = np.minimum(fy.astype(int), len(self.ys) - 2)
+        tx = fx - ix
+        ty = fy - iy
+        return tuple(
+            (grid[iy, ix] * (1 - tx) + grid[iy, ix + 1] * tx) * (1 - ty)
+            + (grid[iy + 1, ix] * (1 - tx) + grid[iy + 1, ix + 1] * tx) * ty
+            for grid in self.grids
+        )
+
+
+def seed_points(cx, cy, cq, radius, seeds=SEEDS, max_seeds=MAX_SEEDS):
+    """Returns x, y and direction (+1 along E, -1 against) of the starting
+    points, spread evenly on circles of radius around the strongest charges"""
+    order = np.argsort(-np.abs(cq), kind="stable")
+    order = order[cq[order] != 0]
+    per_charge = int(np.clip(max_seeds // max(len(order), 1), 1, seeds))
+    order = order[: max_seeds // per_charge]
+    angles = 2 * np.pi * (np.arange(per_charge) + 0.5) / per_charge
+    x = (cx[order, None] + radius * np.cos(angles)).ravel()
+    y = (cy[order, None] + radius * np.sin(angles)).ravel()
+    sign = np.repeat(np.sign(cq[order]), per_charge)
+    return x, y, sign
+
+
+def occupancy(cx, cy, lim, cell):
+    """Returns a grid of cells of side cell that are within one cell of a
+    charge"""
+    n = int(np.ceil(2 * lim / cell)) + 1
+    occupied = np.zeros((n + 2, n + 2), dtype=bool)
+    inside = (np.abs(cx) <= lim) & (np.abs(cy) <= lim)
+    ix = ((cx[inside] + lim) / cell).astype(int) + 1
+    iy = ((cy[inside] + lim) / cell).astype(int) + 1
+    for dy in (-1, 0, 1):
+        for dx in (-1, 0, 1):
+            occupied[iy + dy, ix + dx] = True
+    return occupied
+
+
+def trace_lines(
+    charges,
+    lim,
+    grid=None,
+    seeds=SEEDS,
+    max_seeds=MAX_SEEDS,
+    max_steps=MAX_STEPS,
+    cancel=None,
+):
+    """Traces field lines from the charges, returns a list of (k, 2) arrays
+    of points in meters.
+
+    ``grid`` is an optional ``(xs, ys, E_x, E_y)`` used instead of direct
+    summation for large charge sets.
+    """
+    cx, cy, cq = charge_arrays(charges)
+    step = 2 * lim / STEPS_PER_DOMAIN
+    cell = step
+    x, y, sign = seed_points(cx, cy, cq, 3 * cell, seeds, max_seeds)
+    if len(x) == 0:
+        return []
+    if grid is not None and len(cq) * len(x) > DIRECT_WORK:
+        field = GridField(*grid)
+    else:
+        field = DirectField(cx, cy, cq)
+    occupied = occupancy(cx, cy, lim, cell)
+
+    def direction(px, py, s):
+        ex, ey = field(px, py)
+        norm = np.hypot(ex, ey)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return s * ex / norm, s * ey / norm
+
+    paths = np.full((max_steps + 1, len(x), 2), np.nan)
+    paths[0, :, 0] = x
+    paths[0, :, 1] = y
+    live = np.arange(len(x))
+    for i in range(1, max_steps + 1):
+        if cancel is not None and cancel.is_set():
+            return None
+        px, py, s = x[live], y[live], sign[live]
+        k1x, k1y = direction(px, py, s)
+        k2x, k2y = direction(px + step / 2 * k1x, py + step / 2 * k1y, s)
+        k3x, k3y = direction(px + step / 2 * k2x, py + step / 2 * k2y, s)
+        k4x, k4y = direction(px + step * k3x, py + step * k3y, s)
+        px = px + step / 6 * (k1x + 2 * k2x + 2 * k3x + k4x)
+        py = py + step / 6 * (k1y + 2 * k2y + 2 * k3y + k4y)
+        x[live] = px
+        y[live] = py
+        paths[i, live, 0] = px
+        paths[i, live, 1] = py
+        inside = np.isfinite(px) & (np.abs(px) <= lim) & (np.abs(py) <= lim)
+        arrived = np.zeros(len(live), dtype=bool)
+        ix = ((px[inside] + lim) / cell).astype(int) + 1
+        iy = ((py[inside] + lim) / cell).astype(int) + 1
+        arrived[inside] = occupied[iy, ix]
+        live = live[inside & ~arrived]
+        if len(live) == 0:
+            break
+    lines = []
+    for line in np.moveaxis(paths, 1, 0):
+        line = line[np.isfinite(line[:, 0])]
+        if len(line) > 1:
+            lines.append(line)
+    return lines
+
+
+def calculate_V(charges, xs, ys, cancel=None):
+    """Computes the electric potential (V) on the grid spanned by xs and ys"""
+    cx, cy, cq = charge_arrays(charges)
+    kq = K_E * cq
+    V = np.zeros((len(ys), len(xs)))
+    rows = max(1, (1 << 16) // max(len(xs), 1))
+    with np.errstate(divide="ignore"):
+        for r0 in range(0, len(ys), rows):
+            if cancel is not None and cancel.is_set():
+                return None
+            r1 = min(r0 + rows, len(ys))
+            px = np.tile(xs, r1 - r0)
+            py = np.repeat(ys[r0:r1], len(xs))
+            out = V[r0:r1].reshape(-1)
+            for c0 in range(0, len(cq), CHARGE_CHUNK):
+                c1 = c0 + CHARGE_CHUNK
+                r = np.hypot(px[None] - cx[c0:c1, None], py[None] - cy[c0:c1, None])
+                out += kq[c0:c1] @ np.reciprocal(r, out=r)
+    return V
+
+
+def potential_levels(V, count):
+    """Returns count contour levels spread logarithmically over the typical
+    range of |V|, on both signs when the potential takes both"""
+    values = V[np.isfinite(V)]
+    values = values[values != 0]
+    if count <= 0 or len(values) == 0:
+        return np.array([])
+    low, high = np.percentile(np.abs(values), [5, 99])
+    signs = [s for s in (-1, 1) if np.any(np.sign(values) == s)]
+    per_sign = max(1, count // len(signs))
+    levels = np.concatenate([s * np.geomspace(low, high, per_sign) for s in signs])
+    return np.sort(levels)
+
+
+def compute_overlay(charges, settings, fields=None, progress=None, cancel=None):
+    """Returns the field lines and (xs, ys, V, levels) of the equipotentials
+    the settings ask for, either may be None"""
+    lim = settings.get("lim")
+    lines = contours = None
+    if settings.get("field_lines") == "on":
+        grid = None
+        if fields is not None:
+            coordinates = np.linspace(-lim, lim, fields[0].shape[1])
+            grid = (coordinates, coordinates, *fields)
+        lines = trace_lines(charges, lim, grid, cancel=cancel)
+        if lines is None:
+            return None
+    if progress is not None:
+        progress(0.5)
+    count = int(settings.get("equipotentials") or 0)
+    if count > 0:
+        points = np.sqrt(CONTOUR_WORK / max(len(charges), 1))
+        points = int(np.clip(points, MIN_CONTOUR_POINTS, CONTOUR_POINTS))
+        coordinates = np.linspace(-lim, lim, points)
+        V = calculate_V(charges, coordinates, coordinates, cancel)
+        if V is None:
+            return None
+        contours = (coordinates, coordinates, V, potential_levels(V, count))
+    if progress is not None:
+        progress(1)
+    return lines, contours
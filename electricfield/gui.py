@@ -0,0 +1,2096 @@
+import copy
+import os
+import shutil
+import tempfile
+import threading
+import tkinter as tk
+import tkinter.font as tkfont
+import customtkinter as ctk
+import numpy as np
+
+from electricfield.animation import (
+    DEFAULT_OPTIONS,
+    FRAME_CACHE_BYTES,
+    MOTIONS,
+    Animation,
+)
+from electricfield.cache import FieldCache
+from electricfield.charges import ChargeSet
+from electricfield.field import BACKENDS
+from electricfield.fieldlines import compute_overlay
+from electricfield.incremental import IncrementalField
+from electricfield.loader import FILETYPES, load_charges
+from electricfield.probes import (
+    LeadField,
+    head_circle_points,
+    load_sensors,
+    probe_table,
+    save_probes,
+)
+from electricfield.profiling import PhaseTimer
+from electricfield.raster import MARKER_RADIUS, SCALE, render_markers, to_ppm
+from electricfield.session import FILETYPES as SESSION_FILETYPES
+from electricfield.session import load_session, result_key, save_session
+from electricfield.settings import (
+    DEFAULT_SETTINGS,
+    backend_options,
+    grid_coordinates,
+)
+from electricfield.spatial import SpatialIndex
+from electricfield.store import FieldStore, compute_store
+from electricfield.treecode import sample_error
+from electricfield.volume import PLANES, compute_volume, volume_key, z_coordinates
+from electricfield.worker import Worker
+from electricfield.zoom import TILE_CACHE_BYTES, TiledField
+
+USER_SETTINGS = copy.deepcopy(DEFAULT_SETTINGS)
+
+# Interval in ms between two checks of a running simulation
+POLL_MS = 50
+# Delay in ms after the last zoom or pan before the view is recomputed
+ZOOM_DELAY_MS = 250
+
+
+class VirtualListbox(tk.Listbox):
+    """Listbox showing rows of a sequence, only the visible rows exist in Tk.
+
+    The attached scrollbar must call ``yview`` and is updated by the widget
+    itself, so refreshing costs the same for 10 or 10 million rows.
+    """
+
+    def __init__(self, master, source=(), **kwargs):
+        super().__init__(master, **kwargs)
+        self.source = source
+        self.first = 0
+        self.rows = 1
+        self.scrollbar = None
+        self.bind("<Configure>", self._resize)
+        self.bind("<MouseWheel>", self._wheel)
+        self.bind("<Button-4>", lambda event: self.yview("scroll", -1, "units"))
+        self.bind("<Button-5>", lambda event: self.yview("scroll", 1, "units"))
+
+    def set_source(self, source):
+        self.source = source
+        self.first = 0
+        self.refresh()
+
+    def refresh(self):
+        self.first = max(0, min(self.first, len(self.source) - self.rows))
+        self.delete(0, "end")
+        for row in self.source[self.first : self.first + self.rows]:
+            self.insert("end", str(row))
+        if self.scrollbar is not None:
+            total = max(len(self.source), 1)
+            self.scrollbar.set(
+                self.first / total, min(self.first + self.rows, total) / total
+            )
+
+    def show(self, index):
+        """Scrolls to and selects the row of source index"""
+        self.first = index - self.rows // 2
+        self.refresh()
+        self.selection_clear(0, "end")
+        self.selection_set(index - self.first)
+
+    def selected(self):
+        """Returns the source index of the selected row or None"""
+        selection = self.curselection()
+        return self.first + selection[0] if selection else None
+
+    def yview(self, *args):
+        if not args:
+            return super().yview()
+        if args[0] == "moveto":
+            self.first = int(float(args[1]) * len(self.source))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.first += int(args[1]) * step
+        self.refresh()
+
+    def _resize(self, event):
+        line = tkfont.Font(font=self.cget("font")).metrics("linespace") + 1
+        rows = max(1, event.height // line)
+        if rows != self.rows:
+            self.rows = rows
+            self.refresh()
+
+    def _wheel(self, event):
+        self.yview("scroll", -1 if event.delta > 0 else 1, "units")
+
+
+def CenterWindowToDisplay(
+    Screen: ctk.CTk, width: int, height: int, scale_factor: float = 1.0
+):
+    """Centers the window to the main display/monitor"""
+    screen_width = Screen.winfo_screenwidth()
+    screen_height = Screen.winfo_screenheight()
+    x = int(((screen_width / 2) - (width / 2)) * scale_factor)
+    y = int(((screen_height / 2) - (height / 2)) * scale_factor)
+    return f"{width}x{height}+{x}+{y}"
+
+
+def check_duplicate(index, x, y, ignore=None):
+    found = index.find(x, y)
+    return found is not None and found != ignore
+
+
+def check_value(val):
+    if val > 20 or val < -20:
+        return True
+    else:
+        return False
+
+
+def clear_screen(event=None):
+    global CHARGES, CHARGE_INDEX
+    CHARGES = ChargeSet()  # Reset CHARGES list
+    CHARGE_INDEX = SpatialIndex()
+    listbox.set_source(CHARGES)
+    canvas.delete("all")  # Clear the canvas
+    canvas.create_image(0, 0, anchor="nw", image=charge_layer)
+    draw_charges()
+    canvas.create_oval(
+        (20 - USER_SETTINGS.get("radius") * 100) * 20,
+        (20 - USER_SETTINGS.get("radius") * 100) * 20,
+        (20 + USER_SETTINGS.get("radius") * 100) * 20,
+        (20 + USER_SETTINGS.get("radius") * 100) * 20,
+        width=4,
+    )
+
+
+def draw_charges():
+    image = render_markers(
+        CHARGES.X, CHARGES.Y, canvas.winfo_reqwidth(), canvas.winfo_reqheight()
+    )
+    charge_layer.configure(data=to_ppm(image), format="PPM")
+
+
+def delete_charge(event=None):
+    index = listbox.selected()
+    if index is None:
+        return
+    del CHARGES[index]
+    CHARGE_INDEX.remove(index)
+    listbox.refresh()
+    draw_charges()
+
+
+def load_csv(event=None):
+    global LOAD_WORKER
+    path = tk.filedialog.askopenfilename(filetypes=FILETYPES)
+    if not path:
+        return
+    cancel_load()
+    progressbar.set(0)
+    LOAD_WORKER = Worker(load_indexed, path).start()
+    window.after(POLL_MS, poll_load, LOAD_WORKER)
+
+
+def load_indexed(path, progress=None, cancel=None):
+    charges = load_charges(path, progress, cancel)
+    if charges is None:
+        return None
+    return charges, SpatialIndex(charges.X, charges.Y)
+
+
+def cancel_load(event=None):
+    global LOAD_WORKER
+    if LOAD_WORKER is not None:
+        LOAD_WORKER.cancel()
+        LOAD_WORKER = None
+        progressbar.set(0)
+
+
+def poll_load(worker):
+    global CHARGES, CHARGE_INDEX, LOAD_WORKER
+    if worker is not LOAD_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            LOAD_WORKER = None
+            clear_screen()
+            CHARGES, CHARGE_INDEX = value
+            listbox.set_source(CHARGES)
+            draw_charges()
+            return
+        elif kind == "error":
+            LOAD_WORKER = None
+            progressbar.set(0)
+            title = getattr(value, "title", "Error")
+            tk.messagebox.showerror(title, str(value))
+            return
+        else:
+            LOAD_WORKER = None
+            return
+    window.after(POLL_MS, poll_load, worker)
+
+
+def cancel(event=None):
+    cancel_sim()
+    cancel_load()
+    cancel_zoom()
+    cancel_animation()
+    cancel_probes()
+    cancel_volume()
+    cancel_session()
+
+
+def run_sim(event=None):
+    global SIM_WORKER, RUN_TIMER
+    cancel_sim()
+    progressbar.set(0)
+    RUN_TIMER.stop()
+    timer = RUN_TIMER = PhaseTimer(TRACK_MEMORY.get(), PROFILE_RUN.get())
+    if RESULT_WINDOW is None:
+        # Loads matplotlib while the field is computed
+        threading.Thread(target=import_plotting, daemon=True).start()
+
+    # Calculate E field components at t=0 off the Tk thread, the worker gets
+    # its own copies so edits made while it runs do not affect the result
+    with timer.phase("snapshot"):
+        charges = CHARGES.copy()
+        settings = dict(USER_SETTINGS)
+        coordinates = grid_coordinates(settings)
+    with timer.phase("cache lookup"):
+        key = result_key(charges, settings)
+        fields = FIELD_CACHE.get(key) if not settings.get("store_dir") else None
+    if settings.get("store_dir"):
+        # Giant grids are streamed to disk, the folder of a finished run is
+        # reused like a cache entry
+        directory = os.path.join(settings.get("store_dir"), key)
+        if FieldStore.complete(directory):
+            progressbar.set(1)
+            show_results(FieldStore(directory), charges, settings, key)
+            return
+        SIM_WORKER = Worker(
+            timer.wrap("compute_store", compute_store),
+            charges,
+            coordinates,
+            coordinates,
+            directory,
+            BACKENDS[settings.get("backend")],
+            **backend_options(settings),
+        ).start()
+        window.after(POLL_MS, poll_sim, SIM_WORKER, key, charges, settings)
+        return
+    if fields is not None:
+        progressbar.set(1)
+        show_results(fields, charges, settings, key)
+        return
+    if settings.get("backend") == "numpy":
+        # Only the charges added or removed since the last run are evaluated
+        calculate_E = INCREMENTAL_FIELD.update
+    else:
+        calculate_E = BACKENDS[settings.get("backend")]
+    SIM_WORKER = Worker(
+        timer.wrap("calculate_E", calculate_E),
+        charges,
+        coordinates,
+        coordinates,
+        **backend_options(settings),
+    ).start()
+    window.after(POLL_MS, poll_sim, SIM_WORKER, key, charges, settings)
+
+
+def cancel_sim(event=None):
+    global SIM_WORKER
+    if SIM_WORKER is not None:
+        SIM_WORKER.cancel()
+        SIM_WORKER = None
+        progressbar.set(0)
+
+
+def poll_sim(worker, key, charges, settings):
+    global SIM_WORKER
+    if worker is not SIM_WORKER:
+        return  # Cancelled or replaced by a newer run
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            SIM_WORKER = None
+            if not isinstance(value, FieldStore):
+                with RUN_TIMER.phase("cache store"):
+                    FIELD_CACHE.put(key, value)
+            show_results(value, charges, settings, key)
+            return
+        elif kind == "error":
+            SIM_WORKER = None
+            progressbar.set(0)
+            tk.messagebox.showerror("Simulation Error", f"Error: {value}")
+            return
+        else:
+            SIM_WORKER = None
+            return
+    window.after(POLL_MS, poll_sim, worker, key, charges, settings)
+
+
+def import_plotting():
+    """Imports matplotlib and the results figure, which takes a while and
+    is only needed once a result is shown"""
+    from matplotlib.backends import backend_tkagg
+
+    from electricfield import plot
+
+    return backend_tkagg, plot
+
+
+def result_figure(settings):
+    """Shows the results window, building it on first use"""
+    global RESULT_WINDOW, FIELD_FIGURE
+    if RESULT_WINDOW is None:
+        backend_tkagg, plot = import_plotting()
+        # Built once, later runs only update the artists of the same figure
+        RESULT_WINDOW = ctk.CTkToplevel(window)
+        RESULT_WINDOW.title("Simulation Results")
+        RESULT_WINDOW.protocol("WM_DELETE_WINDOW", RESULT_WINDOW.withdraw)
+        FIELD_FIGURE = plot.FieldFigure(settings.get("figsize"))
+        figure_canvas = backend_tkagg.FigureCanvasTkAgg(
+            FIELD_FIGURE.figure, master=RESULT_WINDOW
+        )
+        backend_tkagg.NavigationToolbar2Tk(figure_canvas, RESULT_WINDOW)
+        figure_canvas.get_tk_widget().pack(side="top", fill="both", expand=True)
+        FIELD_FIGURE.axes[0].callbacks.connect("xlim_changed", view_changed)
+        FIELD_FIGURE.axes[0].callbacks.connect("ylim_changed", view_changed)
+    else:
+        RESULT_WINDOW.deiconify()
+    return FIELD_FIGURE
+
+
+def show_results(fields, charges, settings, key):
+    global LAST_RUN, RESULT, ZOOM_FIELD, ZOOM_VIEW
+    # The full result, kept for session files
+    LAST_RUN = (key, fields)
+    store = fields if isinstance(fields, FieldStore) else None
+    timer = RUN_TIMER
+    note = ""
+    if settings.get("backend") == "treecode":
+        with timer.phase("error estimate"):
+            if store is not None:
+                fields = store.level(0)
+            lim = settings.get("lim")
+            coordinates = np.linspace(-lim, lim, fields[0].shape[1])
+            max_error, rms_error = sample_error(
+                charges, coordinates, coordinates, fields
+            )
+        note = (
+            f"Tree code (theta={settings.get('theta')}) error against direct"
+            f" summation on sampled points: max {max_error:.2e}, rms {rms_error:.2e}"
+        )
+    with timer.phase("results window"):
+        result_figure(settings)
+    if store is not None:
+        # Only the pyramid level matching the panels' pixels is read
+        with timer.phase("pyramid level"):
+            fields = store.fields_for(FIELD_FIGURE.pixels())
+    cancel_zoom()
+    RESULT = (fields, charges, settings, note)
+    # Zoomed views are evaluated tile by tile with the same backend, one
+    # process per tile is enough
+    options = backend_options(settings)
+    options.pop("workers", None)
+    ZOOM_FIELD = TiledField(
+        charges,
+        key,
+        settings.get("lim"),
+        BACKENDS[settings.get("backend")],
+        TILE_CACHE,
+        **options,
+    )
+    ZOOM_VIEW = None
+    FIELD_FIGURE.update(fields, charges, settings, note, timer=timer)
+    timer.stop()
+    show_diagnostics()
+    show_overlay(fields, charges, settings)
+    zoom_view()
+
+
+def show_overlay(fields, charges, settings):
+    """Traces the field lines and equipotentials of a result in the
+    background and draws them over it"""
+    global OVERLAY_WORKER
+    cancel_overlay()
+    FIELD_FIGURE.set_overlay()
+    if settings.get("field_lines") != "on" and not settings.get("equipotentials"):
+        return
+    OVERLAY_WORKER = Worker(compute_overlay, charges, settings, fields).start()
+    window.after(POLL_MS, poll_overlay, OVERLAY_WORKER)
+
+
+def cancel_overlay():
+    global OVERLAY_WORKER
+    if OVERLAY_WORKER is not None:
+        OVERLAY_WORKER.cancel()
+        OVERLAY_WORKER = None
+
+
+def poll_overlay(worker):
+    global OVERLAY_WORKER
+    if worker is not OVERLAY_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "done":
+            OVERLAY_WORKER = None
+            if value is not None:
+                FIELD_FIGURE.set_overlay(*value)
+            return
+        elif kind == "error":
+            OVERLAY_WORKER = None
+            tk.messagebox.showerror("Field Line Error", f"Error: {value}")
+            return
+        elif kind == "cancelled":
+            OVERLAY_WORKER = None
+            return
+    window.after(POLL_MS, poll_overlay, worker)
+
+
+def view_changed(axes):
+    global ZOOM_AFTER
+    if ZOOM_AFTER is not None:
+        window.after_cancel(ZOOM_AFTER)
+    ZOOM_AFTER = window.after(ZOOM_DELAY_MS, zoom_view)
+
+
+def zoom_view():
+    """Shows the visible extent at screen resolution, evaluating only the
+    tiles it overlaps once the computed grid is coarser than the screen"""
+    global ZOOM_AFTER, ZOOM_WORKER, ZOOM_VIEW
+    ZOOM_AFTER = None
+    if RESULT is None:
+        return  # Showing animation frames
+    fields, charges, settings, note = RESULT
+    xlim = FIELD_FIGURE.axes[0].get_xlim()
+    ylim = FIELD_FIGURE.axes[0].get_ylim()
+    pixels = FIELD_FIGURE.pixels()
+    view = (xlim, ylim, pixels)
+    if view == ZOOM_VIEW:
+        return  # Set by the update of the last result
+    ZOOM_VIEW = view
+    cancel_zoom()
+    lim = settings.get("lim")
+    width = max(xlim[1] - xlim[0], ylim[1] - ylim[0])
+    if width / pixels >= 2 * lim / fields[0].shape[1]:
+        # The computed grid already has a point per pixel
+        if list(FIELD_FIGURE.images[0].get_extent()) != [-lim, lim, -lim, lim]:
+            FIELD_FIGURE.update(fields, charges, settings, note)
+        return
+    ZOOM_WORKER = Worker(ZOOM_FIELD.render, xlim, ylim, pixels).start()
+    window.after(POLL_MS, poll_zoom, ZOOM_WORKER)
+
+
+def cancel_zoom():
+    global ZOOM_WORKER
+    if ZOOM_WORKER is not None:
+        ZOOM_WORKER.cancel()
+        ZOOM_WORKER = None
+
+
+def poll_zoom(worker):
+    global ZOOM_WORKER
+    if worker is not ZOOM_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            ZOOM_WORKER = None
+            if value is not None:
+                fields, extent = value
+                _, charges, settings, note = RESULT
+                FIELD_FIGURE.update(fields, charges, settings, note, extent)
+            return
+        elif kind == "error":
+            ZOOM_WORKER = None
+            tk.messagebox.showerror("Simulation Error", f"Error: {value}")
+            return
+        else:
+            ZOOM_WORKER = None
+            return
+    window.after(POLL_MS, poll_zoom, worker)
+
+
+def show_diagnostics():
+    if DIAGNOSTICS_TEXT is None:
+        return
+    DIAGNOSTICS_TEXT.configure(state="normal")
+    DIAGNOSTICS_TEXT.delete("1.0", "end")
+    DIAGNOSTICS_TEXT.insert("1.0", RUN_TIMER.summary() or "No run yet")
+    DIAGNOSTICS_TEXT.configure(state="disabled")
+
+
+def diagnostics_window(event=None):
+    global DIAGNOSTICS_TEXT
+
+    def close():
+        global DIAGNOSTICS_TEXT
+        DIAGNOSTICS_TEXT = None
+        diagnostics_window.destroy()
+
+    def export_trace():
+        path = tk.filedialog.asksaveasfilename(
+            defaultextension=".json", filetypes=[("Chrome trace", "*.json")]
+        )
+        if path:
+            RUN_TIMER.save_trace(path)
+
+    def save_profile():
+        if not RUN_TIMER.profiles:
+            tk.messagebox.showerror(
+                "Profile Error",
+                "Error: The last run was not profiled, check 'cProfile the"
+                " next runs' and run the simulation again",
+            )
+            return
+        path = tk.filedialog.asksaveasfilename(
+            defaultextension=".prof", filetypes=[("cProfile stats", "*.prof")]
+        )
+        if path:
+            RUN_TIMER.save_profile(path)
+
+    if DIAGNOSTICS_TEXT is not None:
+        DIAGNOSTICS_TEXT.winfo_toplevel().lift()
+        return
+    diagnostics_window = ctk.CTkToplevel(window)
+    diagnostics_window.title("Diagnostics")
+    diagnostics_window.geometry(
+        CenterWindowToDisplay(window, 520, 420, window._get_window_scaling())
+    )
+    diagnostics_window.protocol("WM_DELETE_WINDOW", close)
+
+    DIAGNOSTICS_TEXT = ctk.CTkTextbox(diagnostics_window, font=("Consolas", 13))
+    DIAGNOSTICS_TEXT.pack(fill="both", expand=True, padx=5, pady=5)
+    show_diagnostics()
+
+    memory_check = ctk.CTkCheckBox(
+        diagnostics_window,
+        font=("Segoe UI Semibold", 15),
+        text="Track memory peaks in the next runs (slower)",
+        variable=TRACK_MEMORY,
+    )
+    memory_check.pack(fill="x", padx=5, pady=5)
+
+    profile_check = ctk.CTkCheckBox(
+        diagnostics_window,
+        font=("Segoe UI Semibold", 15),
+        text="cProfile the next runs",
+        variable=PROFILE_RUN,
+    )
+    profile_check.pack(fill="x", padx=5, pady=5)
+
+    trace_button = ctk.CTkButton(
+        diagnostics_window,
+        font=("Segoe UI Semibold", 15),
+        text="Export Chrome Trace",
+        command=export_trace,
+    )
+    trace_button.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+
+    profile_button = ctk.CTkButton(
+        diagnostics_window,
+        font=("Segoe UI Semibold", 15),
+        text="Save Profile",
+        command=save_profile,
+    )
+    profile_button.pack(side="right", fill="x", expand=True, padx=5, pady=5)
+
+
+def cancel_animation():
+    global ANIMATION_WORKER
+    if ANIMATION_WORKER is not None:
+        ANIMATION_WORKER.cancel()
+        ANIMATION_WORKER = None
+        progressbar.set(0)
+
+
+def poll_animation(worker, done):
+    global ANIMATION_WORKER
+    if worker is not ANIMATION_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            ANIMATION_WORKER = None
+            done(value)
+            return
+        elif kind == "error":
+            ANIMATION_WORKER = None
+            progressbar.set(0)
+            tk.messagebox.showerror("Animation Error", f"Error: {value}")
+            return
+        else:
+            ANIMATION_WORKER = None
+            return
+    window.after(POLL_MS, poll_animation, worker, done)
+
+
+def show_frame(index):
+    """Shows frame index of the current animation, computing it in the
+    background unless cached"""
+    global ANIMATION_WORKER
+    index = int(index)
+    if ANIMATION is None or index >= len(ANIMATION):
+        return
+
+    def show(fields):
+        global RESULT
+        cancel_zoom()
+        cancel_overlay()
+        RESULT = None
+        figure = result_figure(ANIMATION.settings)
+        figure.set_overlay()
+        figure.update(
+            fields,
+            ANIMATION.charge_set(index),
+            ANIMATION.settings,
+            f"t = {ANIMATION.times[index]:.4g} s",
+        )
+
+    if ANIMATION.cached(index):
+        show(ANIMATION.frame(index))
+        return
+    cancel_animation()
+    ANIMATION_WORKER = Worker(ANIMATION.frame, index).start()
+    window.after(POLL_MS, poll_animation, ANIMATION_WORKER, show)
+
+
+def animation_window(event=None):
+    def read_options():
+        global ANIMATION
+        try:
+            options = {
+                "motion": motion_menu.get(),
+                "amplitude": float(amplitude_entry.get()),
+                "frequency": float(frequency_entry.get()),
+                "angle": float(angle_entry.get()),
+                "duration": float(duration_entry.get()),
+                "frames": max(1, int(frames_entry.get())),
+                "fps": max(1, int(fps_entry.get())),
+            }
+        except ValueError:
+            tk.messagebox.showerror(
+                "Value Error",
+                "Error:The following checks faild\n -'Frames' and 'Frames per second' must be integers\n -All other values must be floats",
+            )
+            return None
+        # A new animation whenever the motion, charges or settings changed,
+        # frames computed before stay in FRAME_CACHE
+        ANIMATION_OPTIONS.update(options)
+        animation = Animation(
+            CHARGES.copy(),
+            dict(USER_SETTINGS),
+            np.linspace(0, options["duration"], options["frames"]),
+            options["motion"],
+            options["amplitude"],
+            options["frequency"],
+            options["angle"],
+            FRAME_CACHE,
+        )
+        if ANIMATION is None or animation.key != ANIMATION.key:
+            ANIMATION = animation
+            steps = max(len(ANIMATION) - 1, 1)
+            slider.configure(to=steps, number_of_steps=steps)
+            slider.set(0)
+        return ANIMATION
+
+    def compute():
+        global ANIMATION_WORKER
+        animation = read_options()
+        if animation is None:
+            return
+        cancel_animation()
+        progressbar.set(0)
+        ANIMATION_WORKER = Worker(animation.compute).start()
+        window.after(
+            POLL_MS,
+            poll_animation,
+            ANIMATION_WORKER,
+            lambda value: show_frame(slider.get()),
+        )
+
+    def save():
+        global ANIMATION_WORKER
+        animation = read_options()
+        if animation is None:
+            return
+        path = tk.filedialog.asksaveasfilename(
+            defaultextension=".gif",
+            filetypes=[("GIF", "*.gif"), ("MP4 video", "*.mp4")],
+        )
+        if not path:
+            return
+        cancel_animation()
+        progressbar.set(0)
+        ANIMATION_WORKER = Worker(
+            animation.save, path, ANIMATION_OPTIONS["fps"]
+        ).start()
+        window.after(POLL_MS, poll_animation, ANIMATION_WORKER, lambda value: None)
+
+    animation_window = ctk.CTkToplevel(window)
+    animation_window.title("Animation")
+    animation_window.geometry(
+        CenterWindowToDisplay(window, 400, 620, window._get_window_scaling())
+    )
+    animation_window.resizable(False, False)
+
+    form_frame = ctk.CTkScrollableFrame(animation_window, bg_color="transparent")
+    form_frame.pack(fill="both", expand=True, padx=3, pady=3)
+
+    motion_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Motion ↓",
+        bg_color="transparent",
+    )
+    motion_label.pack(fill="x", expand=True)
+
+    motion_menu = ctk.CTkOptionMenu(
+        form_frame, font=("Segoe UI Semibold", 16), values=list(MOTIONS)
+    )
+    motion_menu.set(ANIMATION_OPTIONS["motion"])
+    motion_menu.pack(fill="x", expand=True, padx=5, pady=5)
+
+    entries = []
+    for text, key in (
+        ("Amplitude (cm, cm/s to translate)", "amplitude"),
+        ("Frequency (Hz)", "frequency"),
+        ("Direction (degrees)", "angle"),
+        ("Duration (s)", "duration"),
+        ("Frames", "frames"),
+        ("Frames per second", "fps"),
+    ):
+        label = ctk.CTkLabel(
+            form_frame,
+            font=("Segoe UI Semibold", 18),
+            text=f"↓ {text} ↓",
+            bg_color="transparent",
+        )
+        label.pack(fill="x", expand=True)
+        entry = ctk.CTkEntry(
+            form_frame, font=("Segoe UI Semibold", 16), justify="center"
+        )
+        entry.insert(0, ANIMATION_OPTIONS[key])
+        entry.pack(fill="x", expand=True, padx=5, pady=5)
+        entries.append(entry)
+    (
+        amplitude_entry,
+        frequency_entry,
+        angle_entry,
+        duration_entry,
+        frames_entry,
+        fps_entry,
+    ) = entries
+
+    # Scrubs through the frames, cached ones are shown immediately
+    steps = max(len(ANIMATION) - 1, 1) if ANIMATION is not None else 1
+    slider = ctk.CTkSlider(
+        animation_window, from_=0, to=steps, number_of_steps=steps, command=show_frame
+    )
+    slider.set(0)
+    slider.pack(fill="x", padx=5, pady=5)
+
+    compute_button = ctk.CTkButton(
+        animation_window,
+        font=("Segoe UI Semibold", 15),
+        text="Compute Frames",
+        command=compute,
+    )
+    compute_button.pack(side="left", fill="x", expand=True, padx=5, pady=5)
+
+    save_button = ctk.CTkButton(
+        animation_window,
+        font=("Segoe UI Semibold", 15),
+        text="Save Animation",
+        command=save,
+    )
+    save_button.pack(side="right", fill="x", expand=True, padx=5, pady=5)
+
+
+def cancel_probes():
+    global PROBE_WORKER
+    if PROBE_WORKER is not None:
+        PROBE_WORKER.cancel()
+        PROBE_WORKER = None
+        progressbar.set(0)
+
+
+def poll_probes(worker, text):
+    global PROBE_WORKER, PROBE_RESULT
+    if worker is not PROBE_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            PROBE_WORKER = None
+            progressbar.set(1)
+            E_x, E_y = value
+            PROBE_RESULT = (PROBE_FIELD.sx, PROBE_FIELD.sy, E_x, E_y)
+            table = probe_table(*PROBE_RESULT)
+            text.configure(state="normal")
+            text.delete("1.0", "end")
+            text.insert(
+                "end", f"{'#':>4} {'x (m)':>9} {'y (m)':>9} {'|E| (N/C)':>12}\n"
+            )
+            for sensor, x, y, _, _, E in table:
+                text.insert("end", f"{int(sensor):>4} {x:>9.4f} {y:>9.4f} {E:>12.4g}\n")
+            text.configure(state="disabled")
+            return
+        elif kind == "error":
+            PROBE_WORKER = None
+            progressbar.set(0)
+            tk.messagebox.showerror("Probe Error", f"Error: {value}")
+            return
+        else:
+            PROBE_WORKER = None
+            return
+    window.after(POLL_MS, poll_probes, worker, text)
+
+
+def probes_window(event=None):
+    def set_sensors(sx, sy):
+        global PROBE_FIELD, PROBE_RESULT
+        # The cached lead fields belong to the old sensors
+        PROBE_FIELD = LeadField(sx, sy)
+        PROBE_RESULT = None
+        sensors_label.configure(text=f"{len(sx)} sensors")
+
+    def circle():
+        try:
+            n = int(count_entry.get())
+        except ValueError:
+            tk.messagebox.showerror(
+                "Value Error", "Error: 'Sensors on head circle' must be an integer"
+            )
+            return
+        set_sensors(*head_circle_points(max(1, n), USER_SETTINGS.get("radius")))
+
+    def load():
+        path = tk.filedialog.askopenfilename(filetypes=[("CSV file", "*.csv")])
+        if not path:
+            return
+        try:
+            set_sensors(*load_sensors(path))
+        except ValueError as error:
+            tk.messagebox.showerror("Error", f"Error: {error}")
+
+    def evaluate():
+        global PROBE_WORKER
+        if PROBE_FIELD is None:
+            circle()
+        if PROBE_FIELD is None:
+            return
+        cancel_probes()
+        progressbar.set(0)
+        PROBE_WORKER = Worker(PROBE_FIELD.evaluate, CHARGES.copy()).start()
+        window.after(POLL_MS, poll_probes, PROBE_WORKER, text)
+
+    def export():
+        if PROBE_RESULT is None:
+            tk.messagebox.showerror("Export Error", "Error: Evaluate the sensors first")
+            return
+        path = tk.filedialog.asksaveasfilename(
+            defaultextension=".csv", filetypes=[("CSV file", "*.csv")]
+        )
+        if path:
+            save_probes(path, *PROBE_RESULT)
+
+    probes_window = ctk.CTkToplevel(window)
+    probes_window.title("Probes")
+    probes_window.geometry(
+        CenterWindowToDisplay(window, 420, 560, window._get_window_scaling())
+    )
+
+    count_label = ctk.CTkLabel(
+        probes_window,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Sensors on head circle ↓",
+        bg_color="transparent",
+    )
+    count_label.pack(fill="x")
+
+    count_entry = ctk.CTkEntry(
+        probes_window, font=("Segoe UI Semibold", 16), justify="center"
+    )
+    count_entry.insert(0, len(PROBE_FIELD) if PROBE_FIELD is not None else 64)
+    count_entry.pack(fill="x", padx=5, pady=5)
+
+    sensors_label = ctk.CTkLabel(
+        probes_window,
+        font=("Segoe UI Semibold", 15),
+        text=f"{len(PROBE_FIELD)} sensors" if PROBE_FIELD is not None else "",
+        bg_color="transparent",
+    )
+    sensors_label.pack(fill="x")
+
+    text = ctk.CTkTextbox(probes_window, font=("Consolas", 13), state="disabled")
+    text.pack(fill="both", expand=True, padx=5, pady=5)
+
+    buttons = ctk.CTkFrame(probes_window, bg_color="transparent")
+    buttons.pack(fill="x")
+    for column, (label, command) in enumerate(
+        (
+            ("Place on Circle", circle),
+            ("Load Sensors", load),
+            ("Evaluate", evaluate),
+            ("Export CSV", export),
+        )
+    ):
+        button = ctk.CTkButton(
+            buttons, font=("Segoe UI Semibold", 15), text=label, command=command
+        )
+        button.grid(row=column // 2, column=column % 2, sticky="ew", padx=5, pady=5)
+    buttons.grid_columnconfigure((0, 1), weight=1)
+
+
+def cancel_volume():
+    global VOLUME_WORKER
+    if VOLUME_WORKER is not None:
+        VOLUME_WORKER.cancel()
+        VOLUME_WORKER = None
+        progressbar.set(0)
+
+
+def poll_volume(worker, done):
+    global VOLUME_WORKER
+    if worker is not VOLUME_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            VOLUME_WORKER = None
+            done(value)
+            return
+        elif kind == "error":
+            VOLUME_WORKER = None
+            progressbar.set(0)
+            tk.messagebox.showerror("Volume Error", f"Error: {value}")
+            return
+        else:
+            VOLUME_WORKER = None
+            return
+    window.after(POLL_MS, poll_volume, worker, done)
+
+
+def show_cut(plane, index):
+    """Shows a slice or cut of the current volume, read from disk"""
+    global RESULT
+    if VOLUME is None:
+        return
+    normal = VOLUME.normal(plane)
+    index = min(int(index), len(normal) - 1)
+    fields, extent = VOLUME.cut(plane, index)
+    horizontal, vertical = PLANES[plane]
+    axis = ({"x", "y", "z"} - {horizontal, vertical}).pop()
+    # The charges lie in the x-y plane, the cuts do not show them
+    charges = VOLUME_CHARGES if plane == "x-y" else ChargeSet()
+    cancel_zoom()
+    cancel_overlay()
+    RESULT = None
+    result_figure(VOLUME_SETTINGS)
+    FIELD_FIGURE.set_overlay()
+    FIELD_FIGURE.update(
+        fields,
+        charges,
+        VOLUME_SETTINGS,
+        f"{axis} = {normal[index] * 1e2:.3g} cm",
+        extent,
+        titles=(f"E_{horizontal}", f"E_{vertical}", f"E_{plane}"),
+    )
+
+
+def volume_window(event=None):
+    def set_plane(plane):
+        steps = max(len(VOLUME.normal(plane)) - 1, 1) if VOLUME is not None else 1
+        slider.configure(to=steps, number_of_steps=steps)
+        slider.set(steps // 2)
+        show_cut(plane, steps // 2)
+
+    def compute():
+        global VOLUME_WORKER, VOLUME_DIR
+        try:
+            z_min = float(z_min_entry.get())
+            z_max = float(z_max_entry.get())
+            z_points = max(1, int(z_points_entry.get()))
+        except ValueError:
+            tk.messagebox.showerror(
+                "Value Error",
+                "Error:The following checks faild\n -'z from' and 'z to' must be floats\n -'z slices' must be an integer",
+            )
+            return
+        USER_SETTINGS.update(z_min=z_min, z_max=z_max, z_points=z_points)
+        if USER_SETTINGS.get("store_dir"):
+            root = os.path.join(USER_SETTINGS.get("store_dir"), "volume")
+        else:
+            if VOLUME_DIR is None:
+                VOLUME_DIR = tempfile.TemporaryDirectory(prefix="electricfield-")
+            root = VOLUME_DIR.name
+        settings = dict(USER_SETTINGS)
+        charges = CHARGES.copy()
+        coordinates = grid_coordinates(settings)
+        zs = z_coordinates(settings)
+        key = volume_key(
+            charges, coordinates, coordinates, zs, settings.get("precision")
+        )
+        cancel_volume()
+        progressbar.set(0)
+        # Every volume gets its own folder, the one shown stays untouched
+        # while another is computed
+        VOLUME_WORKER = Worker(
+            compute_volume,
+            charges,
+            coordinates,
+            coordinates,
+            zs,
+            os.path.join(root, key),
+            dtype=settings.get("precision"),
+            key=key,
+            workers=settings.get("workers"),
+            memory=settings.get("memory_mb") * 2**20,
+        ).start()
+        window.after(
+            POLL_MS,
+            poll_volume,
+            VOLUME_WORKER,
+            lambda volume: done(volume, charges, settings),
+        )
+
+    def done(volume, charges, settings):
+        global VOLUME, VOLUME_CHARGES, VOLUME_SETTINGS
+        if volume is None:
+            return
+        old = VOLUME.directory if VOLUME is not None else None
+        VOLUME, VOLUME_CHARGES, VOLUME_SETTINGS = volume, charges, settings
+        set_plane(plane_menu.get())
+        if old is not None and old != volume.directory:
+            # Nothing maps the replaced volume anymore
+            shutil.rmtree(old, ignore_errors=True)
+
+    volume_window = ctk.CTkToplevel(window)
+    volume_window.title("Volume")
+    volume_window.geometry(
+        CenterWindowToDisplay(window, 400, 480, window._get_window_scaling())
+    )
+    volume_window.resizable(False, False)
+
+    entries = []
+    for text, key in (
+        ("z from (m)", "z_min"),
+        ("z to (m)", "z_max"),
+        ("z slices", "z_points"),
+    ):
+        label = ctk.CTkLabel(
+            volume_window,
+            font=("Segoe UI Semibold", 18),
+            text=f"↓ {text} ↓",
+            bg_color="transparent",
+        )
+        label.pack(fill="x")
+        entry = ctk.CTkEntry(
+            volume_window, font=("Segoe UI Semibold", 16), justify="center"
+        )
+        entry.insert(0, USER_SETTINGS.get(key))
+        entry.pack(fill="x", padx=5, pady=5)
+        entries.append(entry)
+    z_min_entry, z_max_entry, z_points_entry = entries
+
+    plane_label = ctk.CTkLabel(
+        volume_window,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Plane ↓",
+        bg_color="transparent",
+    )
+    plane_label.pack(fill="x")
+
+    plane_menu = ctk.CTkOptionMenu(
+        volume_window,
+        font=("Segoe UI Semibold", 16),
+        values=list(PLANES),
+        command=set_plane,
+    )
+    plane_menu.pack(fill="x", padx=5, pady=5)
+
+    # Moves the slice or cut along the axis normal to the plane, every
+    # position is read from the volume on disk
+    slider = ctk.CTkSlider(
+        volume_window,
+        from_=0,
+        to=1,
+        number_of_steps=1,
+        command=lambda index: show_cut(plane_menu.get(), index),
+    )
+    slider.pack(fill="x", padx=5, pady=5)
+    if VOLUME is not None:
+        set_plane(plane_menu.get())
+
+    compute_button = ctk.CTkButton(
+        volume_window,
+        font=("Segoe UI Semibold", 15),
+        text="Compute Volume",
+        command=compute,
+    )
+    compute_button.pack(fill="x", padx=5, pady=5)
+
+
+def save_session_file(event=None):
+    global SESSION_WORKER
+    path = tk.filedialog.asksaveasfilename(
+        defaultextension=".efs", filetypes=SESSION_FILETYPES
+    )
+    if not path:
+        return
+    charges = CHARGES.copy()
+    settings = dict(USER_SETTINGS)
+    key = result_key(charges, settings)
+    fields = None
+    # Only a result that is still up to date with the charges and settings
+    # is embedded
+    if SESSION_FIELDS.get() and LAST_RUN is not None and LAST_RUN[0] == key:
+        fields = LAST_RUN[1]
+        if isinstance(fields, FieldStore):
+            fields = fields.level(0)
+    cancel_session()
+    progressbar.set(0)
+    SESSION_WORKER = Worker(
+        save_session,
+        path,
+        charges,
+        settings,
+        fields,
+        key,
+        compress=SESSION_COMPRESS.get(),
+    ).start()
+    window.after(POLL_MS, poll_session, SESSION_WORKER)
+
+
+def open_session_file(event=None):
+    global SESSION_WORKER
+    path = tk.filedialog.askopenfilename(filetypes=SESSION_FILETYPES)
+    if not path:
+        return
+    cancel_session()
+    progressbar.set(0)
+    SESSION_WORKER = Worker(open_indexed, path).start()
+    window.after(POLL_MS, poll_session, SESSION_WORKER)
+
+
+def open_indexed(path, progress=None, cancel=None):
+    session = load_session(path, progress=progress, cancel=cancel)
+    if session is None or (cancel is not None and cancel.is_set()):
+        return None
+    charges = session.charges
+    return session, SpatialIndex(charges.X, charges.Y)
+
+
+def cancel_session():
+    global SESSION_WORKER
+    if SESSION_WORKER is not None:
+        SESSION_WORKER.cancel()
+        SESSION_WORKER = None
+        progressbar.set(0)
+
+
+def poll_session(worker):
+    global SESSION_WORKER
+    if worker is not SESSION_WORKER:
+        return
+    for kind, value in worker.poll():
+        if kind == "progress":
+            progressbar.set(value)
+        elif kind == "done":
+            SESSION_WORKER = None
+            progressbar.set(1)
+            if isinstance(value, tuple):
+                show_session(*value)
+            return
+        elif kind == "error":
+            SESSION_WORKER = None
+            progressbar.set(0)
+            title = getattr(value, "title", "Session Error")
+            tk.messagebox.showerror(title, f"Error: {value}")
+            return
+        else:
+            SESSION_WORKER = None
+            return
+    window.after(POLL_MS, poll_session, worker)
+
+
+def show_session(session, index):
+    """Replaces the charges and settings with those of an opened session and
+    shows its field without recomputing it"""
+    global CHARGES, CHARGE_INDEX
+    cancel_sim()
+    USER_SETTINGS.clear()
+    USER_SETTINGS.update(session.settings)
+    FIELD_CACHE.directory = USER_SETTINGS.get("cache_dir") or None
+    FRAME_CACHE.directory = FIELD_CACHE.directory
+    clear_screen()
+    CHARGES, CHARGE_INDEX = session.charges, index
+    listbox.set_source(CHARGES)
+    draw_charges()
+    settings = dict(USER_SETTINGS)
+    key = result_key(CHARGES, settings)
+    fields = session.fields if session.key == key else None
+    directory = os.path.join(settings.get("store_dir") or "", key)
+    if settings.get("store_dir") and FieldStore.complete(directory):
+        # The pyramid of a streamed run shows faster than the full grid
+        fields = FieldStore(directory)
+    elif fields is not None:
+        FIELD_CACHE.put(key, fields)
+    if fields is not None:
+        show_results(fields, CHARGES.copy(), settings, key)
+
+
+def session_window(event=None):
+    session_window = ctk.CTkToplevel(window)
+    session_window.title("Session")
+    session_window.geometry(
+        CenterWindowToDisplay(window, 360, 220, window._get_window_scaling())
+    )
+    session_window.resizable(False, False)
+
+    for text, variable in (
+        ("Include computed field", SESSION_FIELDS),
+        ("Compress field", SESSION_COMPRESS),
+    ):
+        checkbox = ctk.CTkCheckBox(
+            session_window,
+            font=("Segoe UI Semibold", 15),
+            text=text,
+            variable=variable,
+        )
+        checkbox.pack(fill="x", padx=10, pady=5)
+
+    for text, command in (
+        ("Save Session", save_session_file),
+        ("Open Session", open_session_file),
+    ):
+        button = ctk.CTkButton(
+            session_window,
+            font=("Segoe UI Semibold", 15),
+            text=text,
+            command=command,
+        )
+        button.pack(fill="x", padx=5, pady=5)
+
+
+def canvas_click(event):
+    center_x = canvas.winfo_reqwidth() / 2
+    center_y = canvas.winfo_reqheight() / 2
+    x = (event.x - center_x) / 20
+    y = (center_y - event.y) / 20
+    hit = CHARGE_INDEX.nearest(x, y, MARKER_RADIUS / SCALE)
+    if hit is None:
+        add_window(event)
+    else:
+        listbox.show(hit)
+        add_window(edit=hit)
+
+
+def edit_charge(event=None):
+    index = listbox.selected()
+    if index is not None:
+        add_window(edit=index)
+
+
+def add_window(event=None, edit=None):
+    def save(event=None):
+        try:
+            x = float(x_entry.get())
+            y = float(y_entry.get())
+            q = float(q_entry.get())
+            if check_value(x) is True or check_value(y) is True:
+                tk.messagebox.showerror(
+                    "Value Error",
+                    "Error: One of the following checks faild\n -X must be between -20 and 20\n -Y must be between -20 and 20",
+                )
+            elif check_duplicate(CHARGE_INDEX, x, y, ignore=edit) is True:
+                tk.messagebox.showerror(
+                    "Duplicate Error",
+                    "Error: A charge already exists at this coordinates!\nchnage coordinates or edit/delete the existing charge",
+                )
+            else:
+                if edit is None:
+                    CHARGES.append({"X": x, "Y": y, "q": q})
+                    CHARGE_INDEX.add(x, y)
+                else:
+                    CHARGES[edit] = {"X": x, "Y": y, "q": q}
+                    CHARGE_INDEX.move(edit, x, y)
+                listbox.refresh()
+                draw_charges()
+                add_window.destroy()
+        except:
+            tk.messagebox.showerror(
+                "Value Error",
+                "Error: Float conversion failed please make sure all inputs are numerical\n*scientific representation is allowed",
+            )
+
+    add_window = ctk.CTkToplevel(window)
+    if edit is None:
+        add_window.title("Adding new stationary charge")
+    else:
+        add_window.title("Editing stationary charge")
+    add_window.geometry(
+        CenterWindowToDisplay(window, 340, 150, window._get_window_scaling())
+    )
+    add_window.resizable(False, False)
+    add_window.grab_set()
+
+    info_frame = ctk.CTkFrame(add_window, width=300, height=100, bg_color="transparent")
+    info_frame.pack(anchor="center", padx=5, pady=5, fill="both")
+
+    button_frame = ctk.CTkFrame(
+        add_window, width=300, height=40, bg_color="transparent"
+    )
+    button_frame.pack(anchor="center", padx=5, pady=5, fill="both")
+    button_frame.pack_propagate(0)
+
+    save_button = ctk.CTkButton(
+        button_frame, font=("Segoe UI Semibold", 15), text="Save", command=save
+    )
+    save_button.pack(fill="both", expand=True, anchor="s", padx=5, pady=5)
+
+    x_frame = ctk.CTkFrame(info_frame, width=100, height=75, bg_color="transparent")
+    x_frame.pack(anchor="center", padx=5, pady=5, fill="both", side="left")
+    x_frame.pack_propagate(0)
+
+    y_frame = ctk.CTkFrame(info_frame, width=100, height=75, bg_color="transparent")
+    y_frame.pack(anchor="center", padx=5, pady=5, fill="both", side="left")
+    y_frame.pack_propagate(0)
+
+    q_frame = ctk.CTkFrame(info_frame, width=100, height=75, bg_color="transparent")
+    q_frame.pack(anchor="center", padx=5, pady=5, fill="both", side="left")
+    q_frame.pack_propagate(0)
+
+    x_label = ctk.CTkLabel(
+        x_frame,
+        font=("Segoe UI Semibold", 14),
+        text="↓ X ↓",
+        bg_color="transparent",
+    )
+    x_label.pack(anchor="s", padx=5, pady=5, fill="both")
+
+    x_entry = ctk.CTkEntry(
+        x_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+        placeholder_text="cm",
+        bg_color="transparent",
+    )
+    x_entry.pack(anchor="s", padx=5, pady=5, fill="both")
+
+    y_label = ctk.CTkLabel(
+        y_frame,
+        font=("Segoe UI Semibold", 14),
+        text="↓ Y ↓",
+        bg_color="transparent",
+    )
+    y_label.pack(anchor="s", padx=5, pady=5, fill="both")
+
+    y_entry = ctk.CTkEntry(
+        y_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+        placeholder_text="cm",
+        bg_color="transparent",
+    )
+    y_entry.pack(anchor="s", padx=5, pady=5, fill="both")
+
+    q_label = ctk.CTkLabel(
+        q_frame,
+        font=("Segoe UI Semibold", 14),
+        text="↓ q ↓",
+        bg_color="transparent",
+    )
+    q_label.pack(anchor="s", padx=5, pady=5, fill="both")
+
+    q_entry = ctk.CTkEntry(
+        q_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+        placeholder_text="C",
+        bg_color="transparent",
+    )
+    q_entry.pack(anchor="s", padx=5, pady=5, fill="both")
+
+    add_window.bind("<Return>", save)
+
+    if event != None and int(event.type) == 4:
+        center_x = canvas.winfo_reqwidth() / 2
+        center_y = canvas.winfo_reqheight() / 2
+        x = (event.x - center_x) / 20
+        y = (center_y - event.y) / 20
+        x_entry.insert(0, x)
+        y_entry.insert(0, y)
+    elif edit is not None:
+        x_entry.insert(0, CHARGES[edit]["X"])
+        y_entry.insert(0, CHARGES[edit]["Y"])
+        q_entry.insert(0, CHARGES[edit]["q"])
+
+
+def settings_window(event=None):
+    def save_settings(event=None):
+        cls = False
+        if float(USER_SETTINGS["radius"]) != float(radius_entry.get()):
+            cls = True
+        if float(radius_entry.get()) > 0.18:
+            tk.messagebox.showerror(
+                "Value Error",
+                "Error:The following checks faild\n -Radius must be smaller than 0.18",
+            )
+        else:
+            try:
+                USER_SETTINGS["radius"] = float(radius_entry.get())
+                USER_SETTINGS["npoints"] = int(npoints_entry.get())
+                USER_SETTINGS["workers"] = max(1, int(workers_entry.get()))
+                USER_SETTINGS["precision"] = precision_menu.get()
+                USER_SETTINGS["memory_mb"] = max(1, int(memory_entry.get()))
+                USER_SETTINGS["linthresh"] = float(linthresh_entry.get())
+                USER_SETTINGS["linscale"] = float(linscale_entry.get())
+                USER_SETTINGS["vmin"] = float(vmin_entry.get())
+                USER_SETTINGS["vmax"] = float(vmax_entry.get())
+                USER_SETTINGS["field_lines"] = field_lines_menu.get()
+                USER_SETTINGS["symmetry"] = symmetry_menu.get()
+                USER_SETTINGS["equipotentials"] = max(
+                    0, int(equipotentials_entry.get())
+                )
+                USER_SETTINGS["backend"] = backend_menu.get()
+                USER_SETTINGS["theta"] = float(theta_entry.get())
+                USER_SETTINGS["adaptive_resolution"] = int(resolution_entry.get())
+                USER_SETTINGS["adaptive_tolerance"] = float(tolerance_entry.get())
+                USER_SETTINGS["cache_dir"] = cache_dir_entry.get()
+                USER_SETTINGS["store_dir"] = store_dir_entry.get()
+                FIELD_CACHE.directory = USER_SETTINGS.get("cache_dir") or None
+                FRAME_CACHE.directory = FIELD_CACHE.directory
+                if cls:
+                    clear_screen()
+                settings_window.destroy()
+            except:
+                tk.messagebox.showerror(
+                    "Value Error",
+                    "Error:The following checks faild\n -All values besides 'Number of simulation points', 'Worker processes', 'Memory budget (MB)', 'Adaptive finest resolution' and 'Equipotential lines' must be a float \n -These five must be integers",
+                )
+
+    def reset():
+        radius_entry.delete(0, "end")
+        radius_entry.insert(0, DEFAULT_SETTINGS.get("radius"))
+        npoints_entry.delete(0, "end")
+        npoints_entry.insert(0, DEFAULT_SETTINGS.get("npoints"))
+        workers_entry.delete(0, "end")
+        workers_entry.insert(0, DEFAULT_SETTINGS.get("workers"))
+        precision_menu.set(DEFAULT_SETTINGS.get("precision"))
+        memory_entry.delete(0, "end")
+        memory_entry.insert(0, DEFAULT_SETTINGS.get("memory_mb"))
+        linthresh_entry.delete(0, "end")
+        linthresh_entry.insert(0, DEFAULT_SETTINGS.get("linthresh"))
+        linscale_entry.delete(0, "end")
+        linscale_entry.insert(0, DEFAULT_SETTINGS.get("linscale"))
+        vmin_entry.delete(0, "end")
+        vmin_entry.insert(0, DEFAULT_SETTINGS.get("vmin"))
+        vmax_entry.delete(0, "end")
+        vmax_entry.insert(0, DEFAULT_SETTINGS.get("vmax"))
+        field_lines_menu.set(DEFAULT_SETTINGS.get("field_lines"))
+        symmetry_menu.set(DEFAULT_SETTINGS.get("symmetry"))
+        equipotentials_entry.delete(0, "end")
+        equipotentials_entry.insert(0, DEFAULT_SETTINGS.get("equipotentials"))
+        backend_menu.set(DEFAULT_SETTINGS.get("backend"))
+        theta_entry.delete(0, "end")
+        theta_entry.insert(0, DEFAULT_SETTINGS.get("theta"))
+        resolution_entry.delete(0, "end")
+        resolution_entry.insert(0, DEFAULT_SETTINGS.get("adaptive_resolution"))
+        tolerance_entry.delete(0, "end")
+        tolerance_entry.insert(0, DEFAULT_SETTINGS.get("adaptive_tolerance"))
+        cache_dir_entry.delete(0, "end")
+        cache_dir_entry.insert(0, DEFAULT_SETTINGS.get("cache_dir"))
+        store_dir_entry.delete(0, "end")
+        store_dir_entry.insert(0, DEFAULT_SETTINGS.get("store_dir"))
+
+    settings_window = ctk.CTkToplevel(window)
+    settings_window.title("Settings")
+    settings_window.geometry(
+        CenterWindowToDisplay(window, 400, 760, window._get_window_scaling())
+    )
+    settings_window.resizable(False, False)
+    settings_window.grab_set()
+
+    window_title_frame = ctk.CTkFrame(
+        settings_window, bg_color="transparent", width=400, height=80
+    )
+    window_title_frame.pack(fill="both", padx=3, pady=3)
+
+    # Scrollable, the form no longer fits on small screens
+    form_frame = ctk.CTkScrollableFrame(settings_window, bg_color="transparent")
+    form_frame.pack(fill="both", padx=3, pady=3, expand=True)
+
+    edit_util_frame = ctk.CTkFrame(
+        settings_window, bg_color="transparent", width=400, height=40
+    )
+    edit_util_frame.pack(fill="both", padx=3, pady=3)
+
+    window_title = ctk.CTkLabel(
+        window_title_frame, font=("Segoe UI Semibold", 25), text="Settings"
+    )
+    window_title.place(relx=0.5, rely=0.5, anchor="center")
+
+    radius_warning_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 12),
+        text="WARNING: Changing head radius will clear all the charges",
+        bg_color="transparent",
+    )
+    radius_warning_label.pack(fill="x", expand=True)
+
+    radius_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Head radius ↓",
+        bg_color="transparent",
+    )
+    radius_label.pack(fill="x", expand=True)
+
+    radius_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    radius_entry.insert(0, USER_SETTINGS.get("radius"))
+    radius_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    simpoints_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Number of simulation points(O(n^2)) ↓",
+        bg_color="transparent",
+    )
+    simpoints_label.pack(fill="x", expand=True)
+
+    npoints_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    npoints_entry.insert(0, USER_SETTINGS.get("npoints"))
+    npoints_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    workers_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Worker processes ↓",
+        bg_color="transparent",
+    )
+    workers_label.pack(fill="x", expand=True)
+
+    workers_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    workers_entry.insert(0, USER_SETTINGS.get("workers"))
+    workers_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    precision_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Field precision ↓",
+        bg_color="transparent",
+    )
+    precision_label.pack(fill="x", expand=True)
+
+    precision_menu = ctk.CTkOptionMenu(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        values=["float64", "float32"],
+    )
+    precision_menu.set(USER_SETTINGS.get("precision"))
+    precision_menu.pack(fill="x", expand=True, padx=5, pady=5)
+
+    memory_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Memory budget (MB) ↓",
+        bg_color="transparent",
+    )
+    memory_label.pack(fill="x", expand=True)
+
+    memory_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    memory_entry.insert(0, USER_SETTINGS.get("memory_mb"))
+    memory_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    linthresh_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ linthresh ↓",
+        bg_color="transparent",
+    )
+    linthresh_label.pack(fill="x", expand=True)
+
+    linthresh_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    linthresh_entry.insert(0, USER_SETTINGS.get("linthresh"))
+    linthresh_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    linscale_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ linscale ↓",
+        bg_color="transparent",
+    )
+    linscale_label.pack(fill="x", expand=True)
+
+    linscale_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    linscale_entry.insert(0, USER_SETTINGS.get("linscale"))
+    linscale_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    vmin_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ vmin ↓",
+        bg_color="transparent",
+    )
+    vmin_label.pack(fill="x", expand=True)
+
+    vmin_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    vmin_entry.insert(0, USER_SETTINGS.get("vmin"))
+    vmin_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    vmax_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ vmax ↓",
+        bg_color="transparent",
+    )
+    vmax_label.pack(fill="x", expand=True)
+
+    vmax_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    vmax_entry.insert(0, USER_SETTINGS.get("vmax"))
+    vmax_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    symmetry_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Use symmetry ↓",
+        bg_color="transparent",
+    )
+    symmetry_label.pack(fill="x", expand=True)
+
+    symmetry_menu = ctk.CTkOptionMenu(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        values=["on", "off"],
+    )
+    symmetry_menu.set(USER_SETTINGS.get("symmetry"))
+    symmetry_menu.pack(fill="x", expand=True, padx=5, pady=5)
+
+    field_lines_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Field lines ↓",
+        bg_color="transparent",
+    )
+    field_lines_label.pack(fill="x", expand=True)
+
+    field_lines_menu = ctk.CTkOptionMenu(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        values=["off", "on"],
+    )
+    field_lines_menu.set(USER_SETTINGS.get("field_lines"))
+    field_lines_menu.pack(fill="x", expand=True, padx=5, pady=5)
+
+    equipotentials_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Equipotential lines ↓",
+        bg_color="transparent",
+    )
+    equipotentials_label.pack(fill="x", expand=True)
+
+    equipotentials_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    equipotentials_entry.insert(0, USER_SETTINGS.get("equipotentials"))
+    equipotentials_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    backend_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Field backend ↓",
+        bg_color="transparent",
+    )
+    backend_label.pack(fill="x", expand=True)
+
+    backend_menu = ctk.CTkOptionMenu(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        values=list(BACKENDS),
+    )
+    backend_menu.set(USER_SETTINGS.get("backend"))
+    backend_menu.pack(fill="x", expand=True, padx=5, pady=5)
+
+    theta_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Tree code accuracy (theta) ↓",
+        bg_color="transparent",
+    )
+    theta_label.pack(fill="x", expand=True)
+
+    theta_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    theta_entry.insert(0, USER_SETTINGS.get("theta"))
+    theta_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    resolution_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Adaptive finest resolution ↓",
+        bg_color="transparent",
+    )
+    resolution_label.pack(fill="x", expand=True)
+
+    resolution_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    resolution_entry.insert(0, USER_SETTINGS.get("adaptive_resolution"))
+    resolution_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    tolerance_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Adaptive tolerance ↓",
+        bg_color="transparent",
+    )
+    tolerance_label.pack(fill="x", expand=True)
+
+    tolerance_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+    )
+    tolerance_entry.insert(0, USER_SETTINGS.get("adaptive_tolerance"))
+    tolerance_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    cache_dir_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Field cache folder ↓",
+        bg_color="transparent",
+    )
+    cache_dir_label.pack(fill="x", expand=True)
+
+    cache_dir_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+        placeholder_text="memory only",
+    )
+    cache_dir_entry.insert(0, USER_SETTINGS.get("cache_dir"))
+    cache_dir_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    store_dir_label = ctk.CTkLabel(
+        form_frame,
+        font=("Segoe UI Semibold", 18),
+        text="↓ Large grid folder ↓",
+        bg_color="transparent",
+    )
+    store_dir_label.pack(fill="x", expand=True)
+
+    store_dir_entry = ctk.CTkEntry(
+        form_frame,
+        font=("Segoe UI Semibold", 16),
+        justify="center",
+        placeholder_text="grids kept in memory",
+    )
+    store_dir_entry.insert(0, USER_SETTINGS.get("store_dir"))
+    store_dir_entry.pack(fill="x", expand=True, padx=5, pady=5)
+
+    cancel_button = ctk.CTkButton(
+        edit_util_frame,
+        text="Reset",
+        font=("Segoe UI Semibold", 15),
+        fg_color=("#dbdbdb", "#2b2b2b"),
+        hover_color=("#f9f9fa", "#343638"),
+        text_color="#c0382c",
+        border_color="#c0382c",
+        border_width=3,
+        command=reset,
+    )
+    cancel_button.pack(side="left", fill="x", expand=True, anchor="s", padx=5, pady=5)
+
+    save_button = ctk.CTkButton(
+        edit_util_frame,
+        font=("Segoe UI Semibold", 15),
+        text="Save",
+        command=save_settings,
+    )
+    save_button.pack(side="right", fill="x", expand=True, anchor="s", padx=5, pady=5)
+    settings_window.bind("<Return>", save_settings)
+
+
+# The UI is only built when run as a script, so process pool workers that
+# re-import this module (spawn start method) do not open windows
+def main():
+    """Builds the interface and runs it until the main window is closed"""
+    global ANIMATION, ANIMATION_OPTIONS, ANIMATION_WORKER, CHARGES, CHARGE_INDEX
+    global DIAGNOSTICS_TEXT, FIELD_CACHE, FIELD_FIGURE, FRAME_CACHE, INCREMENTAL_FIELD
+    global LOAD_WORKER, OVERLAY_WORKER, PROBE_FIELD, PROBE_RESULT, PROBE_WORKER
+    global PROFILE_RUN, RESULT, RESULT_WINDOW, RUN_TIMER, SIM_WORKER, TILE_CACHE
+    global LAST_RUN, SESSION_COMPRESS, SESSION_FIELDS, SESSION_WORKER
+    global TRACK_MEMORY, VOLUME, VOLUME_CHARGES, VOLUME_DIR, VOLUME_SETTINGS
+    global VOLUME_WORKER, ZOOM_AFTER, ZOOM_FIELD, ZOOM_VIEW, ZOOM_WORKER, cancel_button
+    global canvas, charge_layer, listbox, progressbar, window
+    window = ctk.CTk()
+    ctk.set_appearance_mode("light")
+    window.title("Electric Field Simulator")
+    window.geometry(
+        CenterWindowToDisplay(window, 980, 680, window._get_window_scaling())
+    )
+    window.resizable(False, False)
+
+    CHARGES = ChargeSet()
+    CHARGE_INDEX = SpatialIndex()
+    SIM_WORKER = None
+    LOAD_WORKER = None
+    RESULT_WINDOW = None
+    FIELD_FIGURE = None
+    RESULT = None
+    LAST_RUN = None
+    ZOOM_FIELD = None
+    ZOOM_WORKER = None
+    ZOOM_AFTER = None
+    ZOOM_VIEW = None
+    # At most a quarter of the memory budget, the grids and field cache
+    # need the rest
+    TILE_CACHE = FieldCache(
+        min(TILE_CACHE_BYTES, int(USER_SETTINGS.get("memory_mb") * 2**18))
+    )
+    INCREMENTAL_FIELD = IncrementalField()
+    FIELD_CACHE = FieldCache(directory=USER_SETTINGS.get("cache_dir") or None)
+    RUN_TIMER = PhaseTimer()
+    OVERLAY_WORKER = None
+    ANIMATION = None
+    ANIMATION_WORKER = None
+    ANIMATION_OPTIONS = dict(DEFAULT_OPTIONS)
+    FRAME_CACHE = FieldCache(
+        FRAME_CACHE_BYTES, directory=USER_SETTINGS.get("cache_dir") or None
+    )
+    PROBE_FIELD = None
+    PROBE_WORKER = None
+    PROBE_RESULT = None
+    VOLUME = None
+    VOLUME_WORKER = None
+    VOLUME_DIR = None
+    VOLUME_SETTINGS = None
+    VOLUME_CHARGES = None
+    DIAGNOSTICS_TEXT = None
+    TRACK_MEMORY = tk.BooleanVar(value=False)
+    PROFILE_RUN = tk.BooleanVar(value=False)
+    SESSION_WORKER = None
+    SESSION_FIELDS = tk.BooleanVar(value=True)
+    SESSION_COMPRESS = tk.BooleanVar(value=False)
+
+    app_util_frame = ctk.CTkFrame(window, width=300, height=640, bg_color="transparent")
+    app_util_frame.pack(padx=5, pady=5, side="right", fill="both")
+
+    app_title_frame = ctk.CTkFrame(
+        app_util_frame, width=300, height=80, bg_color="transparent"
+    )
+    app_title_frame.pack(anchor="center", padx=5, pady=5, fill="both")
+
+    charge_list_frame = ctk.CTkFrame(
+        app_util_frame, width=300, height=410, bg_color="transparent"
+    )
+    charge_list_frame.pack(anchor="center", padx=5, pady=5, fill="both", expand=True)
+
+    buttons_list_frame = ctk.CTkFrame(
+        app_util_frame, width=300, height=160, bg_color="transparent"
+    )
+    buttons_list_frame.pack(anchor="center", side="bottom", padx=5, pady=3, fill="both")
+
+    display_frame = ctk.CTkFrame(window, width=650, height=650, bg_color="transparent")
+    display_frame.pack(
+        padx=5, pady=5, side="left", fill="both", expand=True, anchor="n"
+    )
+
+    title = ctk.CTkLabel(
+        app_title_frame, font=("Segoe UI Semibold", 25), text="Electric Field Simulator"
+    )
+    title.place(relx=0.5, rely=0.5, anchor="center")
+
+    global progressbar
+    progressbar = ctk.CTkProgressBar(
+        display_frame, orientation="horizontal", mode="determinate"
+    )
+    progressbar.pack(padx=5, pady=5, side="bottom", fill="both", expand=True)
+    progressbar.set(100)
+
+    # Create a canvas and bind the mouse click event
+    canvas = tk.Canvas(display_frame, width=796, height=796, background="white")
+
+    canvas.bind("<Button-1>", canvas_click)
+
+    canvas.pack(padx=5, pady=5, side="top")
+    # All charge markers are drawn into this single image
+    charge_layer = tk.PhotoImage(
+        width=canvas.winfo_reqwidth(), height=canvas.winfo_reqheight()
+    )
+    listbox = VirtualListbox(
+        charge_list_frame,
+        CHARGES,
+        font=("Segoe UI Semibold", 14),
+        selectbackground="#0084d0",
+        background="#cfcfcf",
+        relief="flat",
+    )
+    listbox.bind("<Double-1>", edit_charge)
+    listbox.bind("<Delete>", delete_charge)
+    listbox.bind("<BackSpace>", delete_charge)
+    listbox.pack(side="left", fill="both", expand=True, padx=5, pady=5)
+    scroll = ctk.CTkScrollbar(
+        charge_list_frame,
+        orientation="vertical",
+        button_color=("#3B8ED0", "#1F6AA5"),
+        button_hover_color=("#36719F", "#144870"),
+        command=listbox.yview,
+    )
+    listbox.scrollbar = scroll
+    scroll.pack(fill="y", expand=True, pady=5)
+    clear_screen()
+
+    # Create a button to run the convex hull computation
+    add = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        text="Add Charge",
+        command=add_window,
+    )
+    add.pack(side="top", padx=5, pady=5, fill="both")
+
+    open_file = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        text="Load Charges",
+        command=load_csv,
+    )
+    open_file.pack(side="top", padx=5, pady=5, fill="both")
+
+    run = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        text="Run Simulation",
+        command=run_sim,
+    )
+    run.pack(side="top", padx=5, pady=5, fill="both")
+
+    cancel_button = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        text="Cancel",
+        command=cancel,
+    )
+    cancel_button.pack(side="top", padx=5, pady=5, fill="both")
+
+    clear = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=clear_screen,
+        text="Clear All",
+    )
+    clear.pack(side="top", padx=5, pady=5, fill="both")
+
+    settings = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=settings_window,
+        text="Settings",
+    )
+    settings.pack(side="top", padx=5, pady=5, fill="both")
+
+    diagnostics = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=diagnostics_window,
+        text="Diagnostics",
+    )
+    diagnostics.pack(side="top", padx=5, pady=5, fill="both")
+
+    animate = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=animation_window,
+        text="Animate",
+    )
+    animate.pack(side="top", padx=5, pady=5, fill="both")
+
+    probes = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=probes_window,
+        text="Probes",
+    )
+    probes.pack(side="top", padx=5, pady=5, fill="both")
+
+    volume = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=volume_window,
+        text="Volume",
+    )
+    volume.pack(side="top", padx=5, pady=5, fill="both")
+
+    session = ctk.CTkButton(
+        buttons_list_frame,
+        font=("Segoe UI Semibold", 15),
+        command=session_window,
+        text="Session",
+    )
+    session.pack(side="top", padx=5, pady=5, fill="both")
+
+    window.bind("<Control-a>", add_window)
+    window.bind("<Control-c>", clear_screen)
+    window.bind("<Control-r>", run_sim)
+    window.bind("<Escape>", cancel)
+    window.bind("<Control-l>", load_csv)
+    window.bind("<F1>", settings_window)
+    window.bind("<F2>", diagnostics_window)
+    window.bind("<F3>", animation_window)
+    window.bind("<F4>", probes_window)
+    window.bind("<F5>", volume_window)
+    window.bind("<F6>", session_window)
+    window.bind("<Control-s>", save_session_file)
+    window.bind("<Control-o>", open_session_file)
+    # Start the main event loop
+    window.mainloop()
+
+
+if __name__ == "__main__":
+    main()
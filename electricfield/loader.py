@@ -0,0 +1,165 @@
+"""Streaming readers for charge layout files.
+
+Layouts are read in chunks of ``CHUNK_ROWS`` charges and every chunk is
+validated in a single vectorized pass, so million-charge files load in
+bounded memory and can report progress and be cancelled. Supported inputs:
+
+- ``.csv`` with the columns ``X,Y,q`` (needs pandas)
+- ``.npy`` holding either a structured array with fields X, Y and q or an
+  ``(n, 3)`` array, read memory mapped
+- ``.npz`` with the arrays ``X``, ``Y`` and ``q``
+- ``.parquet`` with the columns X, Y and q (needs pyarrow)
+"""
+
+import os
+
+import numpy as np
+
+from electricfield.charges import ChargeSet
+from electricfield.spatial import duplicate_rows
+
+CHUNK_ROWS = 1 << 16
+# Charges must lie within the canvas, coordinates are in cm
+LIMIT = 20
+
+FILETYPES = [
+    ("Charge layouts", "*.csv *.npy *.npz *.parquet *.efs"),
+    ("CSV file", "*.csv"),
+    ("NumPy array", "*.npy *.npz"),
+    ("Parquet file", "*.parquet"),
+]
+
+
+class ChargeFileError(ValueError):
+    """Raised for unreadable or invalid layout files, title is meant for the
+    message box"""
+
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+
+    def __reduce__(self):
+        return type(self), (self.title, str(self))
+
+
+def validate(X, Y, q, offset=0):
+    """Checks a chunk of charges, offset is the row of its first charge"""
+    valid = (np.abs(X) <= LIMIT) & (np.abs(Y) <= LIMIT) & np.isfinite(q)
+    if not valid.all():
+        row = offset + int(np.argmin(valid)) + 1
+        raise ChargeFileError(
+            "Value Error",
+            f"Error: Charge {row} failed one of the following checks\n -X must be between -20 and 20\n -Y must be between -20 and 20\n -q must be a finite number",
+        )
+
+
+def _float_columns(columns):
+    try:
+        return [np.asarray(c, dtype=float) for c in columns]
+    except (TypeError, ValueError):
+        raise ChargeFileError(
+            "Value Error",
+            "Error: Float conversion failed please make sure all inputs are numerical\n*scientific representation is allowed",
+        ) from None
+
+
+def _read_csv(path, chunk_rows):
+    import pandas as pd
+
+    size = max(os.path.getsize(path), 1)
+    name = os.path.basename(path)
+    with open(path, "rb") as handle:
+        try:
+            for chunk in pd.read_csv(handle, chunksize=chunk_rows):
+                if list(chunk.columns) != ["X", "Y", "q"]:
+                    raise ChargeFileError(
+                        "Error", "CSV file has invalid columns (should be 'X,Y,q')"
+                    )
+                yield _float_columns(
+                    [chunk["X"], chunk["Y"], chunk["q"]]
+                ), handle.tell() / size
+        except pd.errors.EmptyDataError:
+            raise ChargeFileError("Error", f"{name} is empty") from None
+        except (pd.errors.ParserError, UnicodeDecodeError) as error:
+            raise ChargeFileError(
+                "Error", f"{name} is not a valid CSV file ({str(error).strip()})"
+            ) from None
+
+
+def _read_npy(path, chunk_rows):
+    array = np.load(path, mmap_mode="r")
+    if array.dtype.names is not None:
+        if not {"X", "Y", "q"} <= set(array.dtype.names):
+            raise ChargeFileError("Error", "Array has no 'X', 'Y' and 'q' fields")
+        columns = [array["X"], array["Y"], array["q"]]
+    elif array.ndim == 2 and array.shape[1] == 3:
+        columns = [array[:, 0], array[:, 1], array[:, 2]]
+    else:
+        raise ChargeFileError("Error", "Array must have shape (n, 3) (columns X,Y,q)")
+    yield from _chunk_columns(columns, chunk_rows)
+
+
+def _read_npz(path, chunk_rows):
+    with np.load(path) as archive:
+        if not {"X", "Y", "q"} <= set(archive.files):
+            raise ChargeFileError("Error", "Archive has no 'X', 'Y' and 'q' arrays")
+        columns = [archive["X"], archive["Y"], archive["q"]]
+    yield from _chunk_columns(columns, chunk_rows)
+
+
+def _read_parquet(path, chunk_rows):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ChargeFileError(
+            "Error", "Reading Parquet files requires pyarrow (pip install pyarrow)"
+        ) from None
+    parquet = pq.ParquetFile(path)
+    total = max(parquet.metadata.num_rows, 1)
+    done = 0
+    if not {"X", "Y", "q"} <= set(parquet.schema_arrow.names):
+        raise ChargeFileError("Error", "Parquet file has no 'X', 'Y' and 'q' columns")
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=["X", "Y", "q"]):
+        done += batch.num_rows
+        columns = [batch.column(name).to_numpy(zero_copy_only=False) for name in "XYq"]
+        yield _float_columns(columns), done / total
+
+
+def _chunk_columns(columns, chunk_rows):
+    total = len(columns[0])
+    for start in range(0, total, chunk_rows):
+        stop = min(start + chunk_rows, total)
+        yield _float_columns([c[start:stop] for c in columns]), stop / total
+
+
+READERS = {
+    ".csv": _read_csv,
+    ".npy": _read_npy,
+    ".npz": _read_npz,
+    ".parquet": _read_parquet,
+    # Session files, see electricfield.session
+    ".efs": _read_npz,
+}
+
+
+def load_charges(path, progress=None, cancel=None, chunk_rows=CHUNK_ROWS):
+    """Reads a layout file into a ChargeSet, returns None if cancelled"""
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in READERS:
+        raise ChargeFileError("Error", f"Unsupported file type '{extension}'")
+    charges = ChargeSet()
+    for (X, Y, q), fraction in READERS[extension](path, chunk_rows):
+        if cancel is not None and cancel.is_set():
+            return None
+        validate(X, Y, q, len(charges))
+        charges.extend(X, Y, q)
+        if progress is not None:
+            progress(fraction)
+    first, second = duplicate_rows(charges.X, charges.Y)
+    if len(first):
+        rows = sorted((int(first[0]) + 1, int(second[0]) + 1))
+        raise ChargeFileError(
+            "Duplicate Error",
+            f"Error: Charges {rows[0]} and {rows[1]} have the same coordinates",
+        )
+    return charges
@@ -0,0 +1,248 @@
+"""Three-panel E_x / E_y / |E| figure that is built once and updated in place.
+
+Re-running a simulation only swaps the image data, norms, head circle and
+charge offsets of the existing artists. In interactive mode those artists
+are animated: the static parts (axes, ticks, colorbars) are cached as a
+background after every full draw and updates are blitted on top of it.
+"""
+
+import numpy as np
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.colors import SymLogNorm
+from matplotlib.figure import Figure
+from matplotlib.markers import MarkerStyle
+from matplotlib.patches import Circle
+from matplotlib.transforms import IdentityTransform
+from mpl_toolkits.axes_grid1.inset_locator import inset_axes
+
+from electricfield.field import charge_arrays, field_magnitude
+from electricfield.profiling import PhaseTimer
+
+TITLES = ("E_x", "E_y", "E_x-y")
+CMAP = "Spectral"
+
+
+def decide_marker(p):
+    if p > 0:
+        return "$+$"
+    elif p < 0:
+        return "$-$"
+    else:
+        return "$0$"
+
+
+def _marker_path(marker):
+    style = MarkerStyle(marker)
+    return style.get_path().transformed(style.get_transform())
+
+
+MARKER_PATHS = {m: _marker_path(m) for m in ("$+$", "$-$", "$0$")}
+
+
+def make_norms(settings):
+    """Returns the norms of the component panels and of the magnitude panel"""
+    components = SymLogNorm(
+        linthresh=settings.get("linthresh"),
+        linscale=settings.get("linscale"),
+        vmin=settings.get("vmin"),
+        vmax=settings.get("vmax"),
+    )
+    magnitude = SymLogNorm(
+        linthresh=settings.get("linthresh"),
+        linscale=settings.get("linscale"),
+        vmin=0,
+        vmax=settings.get("vmax"),
+    )
+    return components, magnitude
+
+
+class FieldFigure:
+    """Long-lived figure showing E_x, E_y and |E| with the charges on top"""
+
+    def __init__(self, figsize=(15, 5), interactive=True):
+        self.figure = Figure(figsize=figsize)
+        self.figure.subplots_adjust(
+            left=0.05, bottom=0.04, right=0.92, top=1.0, wspace=0.4
+        )
+        self.axes = self.figure.subplots(1, 3, sharex=True, sharey=True)
+        self.interactive = interactive
+        self.background = None
+        self.norm_settings = None
+        # |E| of the last update, reused as output when the grid matches
+        self.magnitude = None
+        self.images = []
+        self.circles = []
+        self.markers = []
+        self.lines = []
+        self.contours = [None] * 3
+        empty = np.zeros((2, 2))
+        for ax, title in zip(self.axes, TITLES):
+            image = ax.imshow(empty, origin="lower", cmap=CMAP, extent=[-1, 1, -1, 1])
+            circle = Circle((0, 0), 0, fill=False)
+            ax.add_patch(circle)
+            markers = PathCollection(
+                [],
+                sizes=[35],
+                offsets=np.empty((0, 2)),
+                offset_transform=ax.transData,
+                transform=IdentityTransform(),
+                facecolors="white",
+                edgecolors="white",
+            )
+            ax.add_collection(markers, autolim=False)
+            lines = LineCollection([], colors="black", linewidths=0.6, alpha=0.6)
+            ax.add_collection(lines, autolim=False)
+            ax.set_xticks(np.arange(-20e-2, 25e-2, 0.05))
+            ax.tick_params(axis="x", rotation=45)
+            ax.set_title(title)
+            cax = inset_axes(
+                ax,
+                width="6%",
+                height="100%",
+                loc="lower left",
+                bbox_to_anchor=(1.05, 0.0, 1, 1),
+                bbox_transform=ax.transAxes,
+                borderpad=0,
+            )
+            self.figure.colorbar(image, cax=cax, label="E (N/C)")
+            self.images.append(image)
+            self.circles.append(circle)
+            self.markers.append(markers)
+            self.lines.append(lines)
+        self.note = self.figure.text(0.5, 0.99, "", ha="center", va="top")
+        for artist in self.animated_artists():
+            artist.set_animated(interactive)
+        if interactive:
+            self.figure.canvas.mpl_connect("draw_event", self._on_draw)
+
+    def animated_artists(self):
+        return [*self.images, *self.circles, *self.markers, *self.lines, self.note]
+
+    def set_overlay(self, lines=None, contours=None):
+        """Shows field lines (a list of (k, 2) arrays) and equipotentials
+        ((xs, ys, V, levels)) over the panels, None removes them"""
+        for ax, collection, index in zip(self.axes, self.lines, range(3)):
+            collection.set_segments(lines or [])
+            if self.contours[index] is not None:
+                self.contours[index].remove()
+                self.contours[index] = None
+            if contours is not None and len(contours[3]) > 0:
+                xs, ys, V, levels = contours
+                contour = ax.contour(
+                    xs,
+                    ys,
+                    V,
+                    levels,
+                    colors="black",
+                    linestyles="dashed",
+                    linewidths=0.6,
+                    alpha=0.6,
+                )
+                contour.set_animated(self.interactive)
+                self.contours[index] = contour
+        if self.interactive and self.background is not None:
+            self.blit()
+
+    def update(
+        self,
+        fields,
+        charges,
+        settings,
+        note="",
+        extent=None,
+        timer=None,
+        titles=TITLES,
+    ):
+        """Shows new fields, redraws only the artists when possible.
+
+        ``extent`` defaults to the whole domain, zoomed views pass the part
+        of it the fields cover. ``timer`` (a PhaseTimer) times each step.
+        ``titles`` name the two components and their magnitude, e.g. for
+        cuts through a volume.
+        """
+        timer = timer or PhaseTimer()
+        E_x, E_y = fields
+        lim = settings.get("lim")
+        extent = extent or [-lim, lim, -lim, lim]
+        full = self.background is None or list(self.images[0].get_extent()) != extent
+        if [ax.get_title() for ax in self.axes] != list(titles):
+            for ax, title in zip(self.axes, titles):
+                ax.set_title(title)
+            full = True
+        norm_settings = tuple(
+            settings.get(k) for k in ("linthresh", "linscale", "vmin", "vmax")
+        )
+        if norm_settings != self.norm_settings:
+            with timer.phase("norms"):
+                self.norm_settings = norm_settings
+                components, magnitude = make_norms(settings)
+                self.images[0].set_norm(components)
+                self.images[1].set_norm(components)
+                self.images[2].set_norm(magnitude)
+            full = True
+        with timer.phase("magnitude"):
+            out = self.magnitude
+            if (
+                out is None
+                or out.shape != E_x.shape
+                or out.dtype != np.result_type(E_x, E_y)
+            ):
+                out = None
+            magnitude = self.magnitude = field_magnitude(E_x, E_y, out=out)
+        with timer.phase("image data"):
+            for image, data in zip(self.images, (E_x, E_y, magnitude)):
+                image.set_data(data)
+                image.set_extent(extent)
+            if full:
+                # Drop the data limits of earlier extents, so autoscaling
+                # (by contours, or the toolbar) fits the current one
+                for ax in self.axes:
+                    ax.relim()
+        with timer.phase("charge markers"):
+            cx, cy, cq = charge_arrays(charges)
+            offsets = np.column_stack([cx, cy])
+            paths = [MARKER_PATHS[decide_marker(q)] for q in cq.tolist()]
+            for circle, markers in zip(self.circles, self.markers):
+                circle.set_radius(settings.get("radius"))
+                markers.set_offsets(offsets)
+                markers.set_paths(paths)
+            self.note.set_text(note)
+        if not self.interactive:
+            return
+        if full:
+            with timer.phase("draw"):
+                self.figure.canvas.draw()  # Calls _on_draw which blits the artists
+        else:
+            with timer.phase("blit"):
+                self.blit()
+
+    def pixels(self):
+        """Returns the size in screen pixels of the largest panel side"""
+        bbox = self.axes[0].get_window_extent()
+        return int(max(bbox.width, bbox.height))
+
+    def blit(self):
+        canvas = self.figure.canvas
+        canvas.restore_region(self.background)
+        for ax, image, circle, markers, lines, contour in zip(
+            self.axes,
+            self.images,
+            self.circles,
+            self.markers,
+            self.lines,
+            self.contours,
+        ):
+            ax.draw_artist(image)
+            if contour is not None:
+                ax.draw_artist(contour)
+            ax.draw_artist(lines)
+            ax.draw_artist(circle)
+            ax.draw_artist(markers)
+        self.figure.draw_artist(self.note)
+        canvas.blit(self.figure.bbox)
+
+    def _on_draw(self, event):
+        # Full redraws (first show, resize, zoom, norm change) refresh the
+        # cached background, the animated artists are then drawn over it
+        self.background = self.figure.canvas.copy_from_bbox(self.figure.bbox)
+        self.blit()
@@ -0,0 +1,152 @@
+"""Field at sparse sensor positions.
+
+Sensors are arbitrary points (m), e.g. electrodes on the head circle. The
+field is linear in the charge values, so for fixed charge and sensor
+positions ``E_x = L_x @ q`` and ``E_y = L_y @ q`` with the lead-field
+matrices ``L`` (sensors x charges, N/C per C). A LeadField computes them
+once per set of charge positions and keeps them in a FieldCache, after
+which evaluating new charge strengths is a single matrix product.
+Matrices larger than ``max_bytes`` are never formed, the field is then
+summed directly at the sensors.
+"""
+
+import hashlib
+
+import numpy as np
+
+from electricfield.cache import FieldCache
+from electricfield.field import (
+    BLOCK_BYTES,
+    K_E,
+    PROGRESS_POINTS,
+    accumulate_E,
+    charge_arrays,
+    field_magnitude,
+)
+
+# Bytes of lead-field matrices kept in memory, also the largest one formed
+LEAD_FIELD_BYTES = 1 << 30
+# Column header of probe tables, coordinates in m and fields in N/C
+COLUMNS = ("sensor", "x", "y", "E_x", "E_y", "E")
+
+
+def head_circle_points(n, radius, start=0.0):
+    """Returns x and y (m) of n sensors evenly spaced on a circle of radius
+    (m), the first at angle start (degrees)"""
+    angles = np.radians(start) + 2 * np.pi * np.arange(n) / max(n, 1)
+    return radius * np.cos(angles), radius * np.sin(angles)
+
+
+def lead_field(sx, sy, cx, cy, dtype=float):
+    """Returns L_x and L_y of shape (sensors, charges), the field at each
+    sensor of a unit charge at each position"""
+    L_x = np.empty((len(sx), len(cx)), dtype=dtype)
+    L_y = np.empty_like(L_x)
+    columns = max(1, BLOCK_BYTES // (3 * 8 * max(len(sx), 1)))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for c0 in range(0, len(cx), columns):
+            c1 = c0 + columns
+            dx = sx[:, None] - cx[None, c0:c1]
+            dy = sy[:, None] - cy[None, c0:c1]
+            r3 = dx * dx
+            r3 += dy * dy
+            r3 *= np.sqrt(r3)
+            np.divide(K_E * dx, r3, out=L_x[:, c0:c1], casting="unsafe")
+            np.divide(K_E * dy, r3, out=L_y[:, c0:c1], casting="unsafe")
+    return L_x, L_y
+
+
+def evaluate_direct(charges, sx, sy, progress=None, cancel=None):
+    """Returns E_x and E_y at the sensors by direct summation"""
+    cx, cy, cq = charge_arrays(charges)
+    ex = np.zeros(len(sx))
+    ey = np.zeros(len(sx))
+    step = max(1, PROGRESS_POINTS * 16 // max(len(sx), 1))
+    for c0 in range(0, len(cq), step):
+        if cancel is not None and cancel.is_set():
+            return None
+        c1 = c0 + step
+        accumulate_E(sx, sy, cx[c0:c1], cy[c0:c1], cq[c0:c1], ex, ey)
+        if progress is not None:
+            progress(min(c1, len(cq)) / len(cq))
+    return ex, ey
+
+
+class LeadField:
+    """Evaluates charge layouts at fixed sensors through cached lead-field
+    matrices"""
+
+    def __init__(self, sx, sy, cache=None, max_bytes=LEAD_FIELD_BYTES):
+        self.sx = np.asarray(sx, dtype=float)
+        self.sy = np.asarray(sy, dtype=float)
+        self.cache = cache if cache is not None else FieldCache(max_bytes)
+        self.max_bytes = max_bytes
+
+    def __len__(self):
+        return len(self.sx)
+
+    def key(self, cx, cy):
+        """Returns a hex digest of the sensor and charge positions"""
+        digest = hashlib.sha1()
+        for array in (self.sx, self.sy, cx, cy):
+            digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+        return digest.hexdigest()
+
+    def matrices(self, charges):
+        """Returns (L_x, L_y) for the positions of charges, None when they
+        would exceed max_bytes"""
+        cx, cy, _ = charge_arrays(charges)
+        if 2 * len(self) * len(cx) * 8 > self.max_bytes:
+            return None
+        key = self.key(cx, cy)
+        matrices = self.cache.get(key)
+        if matrices is None:
+            matrices = lead_field(self.sx, self.sy, cx, cy)
+            self.cache.put(key, matrices)
+        return matrices
+
+    def evaluate(self, charges, progress=None, cancel=None):
+        """Returns E_x and E_y (N/C) at the sensors"""
+        matrices = self.matrices(charges)
+        if matrices is None:
+            return evaluate_direct(charges, self.sx, self.sy, progress, cancel)
+        q = charge_arrays(charges)[2]
+        return matrices[0] @ q, matrices[1] @ q
+
+    def evaluate_many(self, charges, q):
+        """Returns E_x and E_y of shape (sensors, k) for k sets of charge
+        values q of shape (charges, k) at the positions of charges"""
+        matrices = self.matrices(charges)
+        if matrices is None:
+            raise MemoryError(
+                f"The lead field of {len(charges)} charges and {len(self)} sensors"
+                f" exceeds {self.max_bytes / 2**20:.0f} MB"
+            )
+        return matrices[0] @ q, matrices[1] @ q
+
+
+def probe_table(sx, sy, E_x, E_y):
+    """Returns the sensors x components table as a (sensors, 6) array with
+    the columns of COLUMNS"""
+    return np.column_stack(
+        [np.arange(len(sx)), sx, sy, E_x, E_y, field_magnitude(E_x, E_y)]
+    )
+
+
+def save_probes(path, sx, sy, E_x, E_y):
+    np.savetxt(
+        path,
+        probe_table(sx, sy, E_x, E_y),
+        fmt=["%d"] + ["%.9g"] * 5,
+        delimiter=",",
+        header=",".join(COLUMNS),
+        comments="",
+    )
+
+
+def load_sensors(path):
+    """Reads sensor positions (m) from a CSV file with the columns x,y"""
+    data = np.genfromtxt(path, delimiter=",", names=True, ndmin=1)
+    if data.dtype.names is None or not {"x", "y"} <= set(data.dtype.names):
+        raise ValueError(f"{path} must have the columns 'x,y' (m)")
+    return np.asarray(data["x"], dtype=float), np.asarray(data["y"], dtype=float)
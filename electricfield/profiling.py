@@ -0,0 +1,138 @@
+"""Per-phase timing of a simulation run.
+
+A PhaseTimer records the start and end of named phases from any thread,
+optionally with the peak of Python-tracked allocations (tracemalloc, above
+what was allocated when the phase started) and a cProfile profile of each
+phase. tracemalloc counts the allocations of the whole process, so peaks
+are only recorded for phases that ran while no other phase did. Only one
+profiler can be active in a process, phases starting while another one is
+profiled are not profiled. Runs export as Chrome trace JSON, which
+chrome://tracing and https://ui.perfetto.dev display as a timeline.
+"""
+
+import cProfile
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Held by the phase being profiled, cProfile allows one active profiler
+_PROFILING = threading.Lock()
+
+
+class PhaseTimer:
+    """Collects ``(name, start, end, thread, peak_bytes)`` phase records"""
+
+    def __init__(self, memory=False, profile=False):
+        self.memory = memory
+        self.profile = profile
+        self.origin = time.perf_counter()
+        self.phases = []
+        self.profiles = []
+        self.lock = threading.Lock()
+        # Running phases, each a list holding whether another phase ran
+        # alongside it
+        self.running = []
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @contextmanager
+    def phase(self, name):
+        """Times the enclosed block as phase name"""
+        # Nested phases are covered by the profile of the outermost one
+        profile = None
+        if self.profile and _PROFILING.acquire(blocking=False):
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                # Another profiler outside the timer is active
+                _PROFILING.release()
+                profile = None
+        overlapped = [False]
+        with self.lock:
+            for other in self.running:
+                other[0] = True
+            overlapped[0] = bool(self.running)
+            self.running.append(overlapped)
+            baseline = 0
+            if self.memory and tracemalloc.is_tracing() and not overlapped[0]:
+                tracemalloc.reset_peak()
+                baseline = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            if profile is not None:
+                profile.disable()
+                _PROFILING.release()
+            with self.lock:
+                # By identity, the lists of other phases may compare equal
+                self.running = [o for o in self.running if o is not overlapped]
+                peak = None
+                if self.memory and tracemalloc.is_tracing() and not overlapped[0]:
+                    peak = tracemalloc.get_traced_memory()[1] - baseline
+                self.phases.append((name, start, end, threading.get_ident(), peak))
+                if profile is not None:
+                    self.profiles.append(profile)
+
+    def wrap(self, name, function):
+        """Returns function timed as phase name in whichever thread calls it"""
+
+        def timed(*args, **kwargs):
+            with self.phase(name):
+                return function(*args, **kwargs)
+
+        return timed
+
+    def stop(self):
+        """Stops memory tracing started by this timer"""
+        if self.memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def summary(self):
+        """Returns one line per phase, in start order"""
+        lines = []
+        for name, start, end, _, peak in sorted(self.phases, key=lambda p: p[1]):
+            line = f"{name:<20} {(end - start) * 1e3:>10.1f} ms"
+            if peak is not None:
+                line += f" {peak / 2**20:>9.1f} MB peak"
+            lines.append(line)
+        if self.phases:
+            total = max(p[2] for p in self.phases) - min(p[1] for p in self.phases)
+            lines.append(f"{'total':<20} {total * 1e3:>10.1f} ms")
+        if self.memory and self.phases:
+            lines.append("Peaks are process-wide, phases overlapping another have none")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Returns the phases as a Chrome trace event dict"""
+        events = []
+        for name, start, end, thread, peak in self.phases:
+            event = {
+                "name": name,
+                "ph": "X",
+                "ts": (start - self.origin) * 1e6,
+                "dur": (end - start) * 1e6,
+                "pid": os.getpid(),
+                "tid": thread,
+            }
+            if peak is not None:
+                event["args"] = {"peak_bytes": peak}
+            events.append(event)
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save_trace(self, path):
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+    def save_profile(self, path):
+        """Writes the merged cProfile stats of all phases, for pstats or
+        snakeviz"""
+        if not self.profiles:
+            raise ValueError("The run was not profiled")
+        pstats.Stats(*self.profiles).dump_stats(path)
@@ -0,0 +1,46 @@
+"""Vectorized rasterization of charge markers for the preview canvas.
+
+Instead of one canvas item per charge the GUI shows a single image. Marker
+centers are set in a boolean mask and the mask is dilated by a disc, so
+the cost beyond marking the centers does not depend on the charge count.
+"""
+
+import numpy as np
+
+# Canvas pixels per cm, as used for the canvas preview
+SCALE = 20
+MARKER_RADIUS = 5
+
+
+def disc_offsets(radius):
+    """Returns the (dy, dx) offsets of the pixels of a filled disc"""
+    dy, dx = np.mgrid[-radius : radius + 1, -radius : radius + 1]
+    inside = dx * dx + dy * dy <= radius * radius
+    return dy[inside], dx[inside]
+
+
+def render_markers(X, Y, width, height, scale=SCALE, radius=MARKER_RADIUS):
+    """Returns an RGB image of black discs at the charge positions (cm)"""
+    mask = np.zeros((height + 2 * radius, width + 2 * radius), dtype=bool)
+    cols = np.rint(np.asarray(X) * scale + width / 2).astype(np.int64) + radius
+    rows = np.rint(height / 2 - np.asarray(Y) * scale).astype(np.int64) + radius
+    inside = (cols >= 0) & (cols < mask.shape[1]) & (rows >= 0) & (rows < mask.shape[0])
+    centers = np.zeros_like(mask)
+    centers[rows[inside], cols[inside]] = True
+    for dy, dx in zip(*disc_offsets(radius)):
+        mask[
+            max(dy, 0) : mask.shape[0] + min(dy, 0),
+            max(dx, 0) : mask.shape[1] + min(dx, 0),
+        ] |= centers[
+            max(-dy, 0) : mask.shape[0] + min(-dy, 0),
+            max(-dx, 0) : mask.shape[1] + min(-dx, 0),
+        ]
+    image = np.full((height, width, 3), 255, dtype=np.uint8)
+    image[mask[radius : radius + height, radius : radius + width]] = 0
+    return image
+
+
+def to_ppm(image):
+    """Encodes an RGB uint8 image as binary PPM, which Tk reads natively"""
+    height, width, _ = image.shape
+    return b"P6 %d %d 255\n" % (width, height) + image.tobytes()
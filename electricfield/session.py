@@ -0,0 +1,171 @@
+"""Session files holding charges, settings and optionally a computed field.
+
+A session is a single zip file (an ``.npz`` archive NumPy can read) with
+the members:
+
+- ``X.npy``, ``Y.npy``, ``q.npy``: the charges as columns (cm, cm, C), so
+  a session also loads as a layout file
+- ``session.json``: the settings, and the cache key of the field if any
+- ``Ex.npy``, ``Ey.npy``: the computed field, optional
+
+The field members are either deflated or stored uncompressed. Stored
+members start on a ``ALIGN`` byte boundary and are memory mapped straight
+from the zip file when a session is opened, so even large grids show
+without being read or recomputed. Sessions are written to a temporary
+file first and moved in place, an interrupted save keeps the old session.
+"""
+
+import json
+import os
+import struct
+import zipfile
+
+import numpy as np
+from numpy.lib import format
+
+from electricfield.cache import field_key
+from electricfield.charges import ChargeSet
+from electricfield.loader import ChargeFileError
+from electricfield.settings import DEFAULT_SETTINGS, cache_extra
+
+FILETYPES = [("Simulator session", "*.efs")]
+ALIGN = 64
+# Extra field id used for padding, as by Android's zipalign
+PADDING_ID = 0xD935
+# Size of the fixed part of a zip local file header
+LOCAL_HEADER = 30
+
+
+class Session:
+    """Charges, settings and the field computed for them (or None)"""
+
+    def __init__(self, charges, settings, fields=None, key=None):
+        self.charges = charges
+        self.settings = settings
+        self.fields = fields
+        self.key = key
+
+
+def result_key(charges, settings):
+    """Returns the cache key of the field of charges under settings, a
+    session's field is shown only while its key still matches"""
+    return field_key(
+        charges,
+        settings.get("lim"),
+        settings.get("npoints"),
+        settings.get("radius"),
+        *cache_extra(settings),
+    )
+
+
+def _write_array(archive, name, array, compress):
+    """Writes array as the member name, aligning stored members"""
+    info = zipfile.ZipInfo(name, date_time=(1980, 1, 1, 0, 0, 0))
+    info.compress_type = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    large = array.nbytes > 2**31
+    if not compress:
+        # The npy header pads the data to a multiple of 64 bytes from its
+        # start, so the member itself must start on the boundary
+        start = archive.fp.tell() + LOCAL_HEADER + len(name.encode()) + 4
+        start += 20 if large else 0  # zip64 extra field
+        padding = -start % ALIGN
+        info.extra = struct.pack("<HH", PADDING_ID, padding) + b"\0" * padding
+    with archive.open(info, "w", force_zip64=large) as handle:
+        format.write_array(handle, np.asanyarray(array), allow_pickle=False)
+
+
+def save_session(
+    path,
+    charges,
+    settings,
+    fields=None,
+    key=None,
+    compress=False,
+    progress=None,
+    cancel=None,
+):
+    """Writes a session file, fields are only written when given.
+
+    ``compress`` deflates the field members, which makes them smaller but
+    loaded into memory when the session is opened. Returns the path or None
+    when cancelled, the existing file is then left as it was.
+    """
+    columns = (charges.X, charges.Y, charges.q)
+    members = [(f"{name}.npy", column, True) for name, column in zip("XYq", columns)]
+    if fields is not None:
+        members += [
+            (f"{name}.npy", grid, compress) for name, grid in zip(("Ex", "Ey"), fields)
+        ]
+    meta = {"settings": settings, "key": key if fields is not None else None}
+    temporary = path + ".tmp"
+    with zipfile.ZipFile(temporary, "w", allowZip64=True) as archive:
+        archive.writestr(
+            zipfile.ZipInfo("session.json", date_time=(1980, 1, 1, 0, 0, 0)),
+            json.dumps(meta, indent=1),
+            zipfile.ZIP_DEFLATED,
+        )
+        for done, (name, array, deflate) in enumerate(members, 1):
+            if cancel is not None and cancel.is_set():
+                break
+            _write_array(archive, name, array, deflate)
+            if progress is not None:
+                progress(done / len(members))
+    if cancel is not None and cancel.is_set():
+        os.remove(temporary)
+        return None
+    os.replace(temporary, path)
+    return path
+
+
+def _read_array(archive, path, info, mmap=True):
+    """Reads a member, memory mapping it when it is stored uncompressed"""
+    if not mmap or info.compress_type != zipfile.ZIP_STORED:
+        with archive.open(info) as handle:
+            return format.read_array(handle, allow_pickle=False)
+    with open(path, "rb") as file:
+        file.seek(info.header_offset + 26)
+        name_length, extra_length = struct.unpack("<HH", file.read(4))
+        file.seek(info.header_offset + LOCAL_HEADER + name_length + extra_length)
+        if format.read_magic(file) == (1, 0):
+            shape, fortran, dtype = format.read_array_header_1_0(file)
+        else:
+            shape, fortran, dtype = format.read_array_header_2_0(file)
+        offset = file.tell()
+    if np.prod(shape) == 0:
+        return np.empty(shape, dtype=dtype)
+    return np.memmap(
+        path,
+        dtype=dtype,
+        mode="r",
+        offset=offset,
+        shape=shape,
+        order="F" if fortran else "C",
+    )
+
+
+def load_session(path, mmap=True, progress=None, cancel=None):
+    """Opens a session file, stored field members are memory mapped unless
+    mmap is False. Returns None when cancelled between members."""
+    with zipfile.ZipFile(path) as archive:
+        members = {info.filename: info for info in archive.infolist()}
+        if "session.json" not in members:
+            raise ChargeFileError("Error", f"{path} is not a session file")
+        meta = json.loads(archive.read("session.json"))
+        names = ["X", "Y", "q"]
+        if "Ex.npy" in members and "Ey.npy" in members:
+            names += ["Ex", "Ey"]
+        arrays = []
+        for name in names:
+            if cancel is not None and cancel.is_set():
+                return None
+            info = members[f"{name}.npy"]
+            # The charge columns are small and always read into memory
+            field = name in ("Ex", "Ey")
+            arrays.append(_read_array(archive, path, info, mmap and field))
+            if progress is not None:
+                progress(len(arrays) / len(names))
+    X, Y, q = arrays[:3]
+    fields = tuple(arrays[3:]) or None
+    # Settings added since the session was saved keep their defaults
+    settings = dict(DEFAULT_SETTINGS, **meta["settings"])
+    return Session(ChargeSet(X, Y, q), settings, fields, meta.get("key"))
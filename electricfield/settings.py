@@ -0,0 +1,73 @@
+"""Simulation settings shared by the GUI and the command line"""
+
+import numpy as np
+
+DEFAULT_SETTINGS = {
+    "linthresh": 1.01e6,
+    "linscale": 1,
+    "vmin": -1e10,
+    "vmax": 1e10,
+    "lim": 20e-2,
+    "npoints": 1000,
+    "radius": 7.22e-2,
+    "figsize": [15, 5],
+    "backend": "numpy",
+    "cache_dir": "",
+    "workers": 1,
+    "theta": 0.3,
+    "adaptive_resolution": 4000,
+    "adaptive_tolerance": 0.01,
+    "precision": "float64",
+    "memory_mb": 1024,
+    "store_dir": "",
+    "field_lines": "off",
+    "equipotentials": 0,
+    "z_min": -10e-2,
+    "z_max": 10e-2,
+    "z_points": 41,
+    "symmetry": "on",
+}
+
+
+def grid_coordinates(settings):
+    """Returns the grid coordinates (m) from -lim to lim, same for x and y"""
+    lim = settings.get("lim")
+    return np.linspace(-lim, lim, settings.get("npoints"))
+
+
+def backend_options(settings):
+    """Returns the keyword options the selected backend takes from settings"""
+    backend = settings.get("backend")
+    if backend == "numpy":
+        return {
+            "workers": settings.get("workers"),
+            "dtype": settings.get("precision"),
+            "memory": settings.get("memory_mb") * 2**20,
+            "symmetry": settings.get("symmetry") == "on",
+        }
+    if backend == "treecode":
+        return {"theta": settings.get("theta")}
+    if backend == "adaptive":
+        return {
+            "resolution": settings.get("adaptive_resolution"),
+            "tolerance": settings.get("adaptive_tolerance"),
+            "radius": settings.get("radius"),
+        }
+    return {}
+
+
+def cache_extra(settings):
+    """Returns what besides charges and grid identifies a computed field, so
+    approximate or reduced precision results are cached apart"""
+    backend = settings.get("backend")
+    if backend == "treecode":
+        return (backend, settings.get("theta"))
+    if backend == "adaptive":
+        return (
+            backend,
+            settings.get("adaptive_resolution"),
+            settings.get("adaptive_tolerance"),
+        )
+    if settings.get("precision") != "float64":
+        return (settings.get("precision"),)
+    return ()
@@ -0,0 +1,163 @@
+"""Hash grid over charge coordinates.
+
+Charges are bucketed by the ``CELL`` x ``CELL`` cm square they fall in, so
+duplicate checks and nearest-charge lookups only look at a few buckets
+instead of every charge. Buckets hold charge ids as integer arrays, which
+map to positions in the ChargeSet (see SpatialIndex).
+"""
+
+import numpy as np
+
+CELL = 0.5
+# Coordinates closer than this (cm) are considered the same position
+TOLERANCE = 1e-6
+
+
+def duplicate_rows(X, Y, tolerance=TOLERANCE):
+    """Returns the index pairs (first, second) of coordinates that are equal
+    within tolerance, found in one vectorized pass"""
+    kx = np.rint(np.asarray(X) / tolerance).astype(np.int64)
+    ky = np.rint(np.asarray(Y) / tolerance).astype(np.int64)
+    order = np.lexsort((ky, kx))
+    same = (np.diff(kx[order]) == 0) & (np.diff(ky[order]) == 0)
+    return order[:-1][same], order[1:][same]
+
+
+class SpatialIndex:
+    """Buckets of charge indices keyed by grid cell.
+
+    Buckets hold ids, the index a charge had when it was added. Removing a
+    charge only records its id, the indices of later charges follow from
+    the ids removed before them, so no edit renumbers the other buckets.
+    Coordinates grow by doubling like a ChargeSet, and the index is rebuilt
+    once half of its ids are removed.
+    """
+
+    def __init__(self, X=(), Y=(), cell=CELL, tolerance=TOLERANCE):
+        self.cell = cell
+        self.tolerance = tolerance
+        self._build(np.asarray(X, dtype=float), np.asarray(Y, dtype=float))
+
+    def _build(self, X, Y):
+        self._xy = np.empty((2, max(len(X), 16)))
+        self._xy[0, : len(X)] = X
+        self._xy[1, : len(Y)] = Y
+        self._size = len(X)  # Ids handed out
+        self._removed = np.empty(0, dtype=np.int64)  # Sorted removed ids
+        self.buckets = {}
+        if len(X) == 0:
+            return
+        ix = np.floor(X / self.cell).astype(np.int64)
+        iy = np.floor(Y / self.cell).astype(np.int64)
+        order = np.lexsort((iy, ix))
+        starts = np.flatnonzero(
+            np.r_[True, (np.diff(ix[order]) != 0) | (np.diff(iy[order]) != 0)]
+        )
+        for start, members in zip(starts, np.split(order, starts[1:])):
+            self.buckets[(int(ix[order[start]]), int(iy[order[start]]))] = members
+
+    @property
+    def X(self):
+        return np.delete(self._xy[0, : self._size], self._removed)
+
+    @property
+    def Y(self):
+        return np.delete(self._xy[1, : self._size], self._removed)
+
+    def __len__(self):
+        return self._size - len(self._removed)
+
+    def _key(self, x, y):
+        return int(np.floor(x / self.cell)), int(np.floor(y / self.cell))
+
+    def _index(self, ids):
+        """Returns the charge indices of ids"""
+        return ids - np.searchsorted(self._removed, ids)
+
+    def _id(self, index):
+        """Returns the id of the charge at index"""
+        # The number k of removed ids below the id is the number of removed
+        # ids r[j] with r[j] - j <= index, and r[j] - j does not decrease
+        low, high = 0, len(self._removed)
+        while low < high:
+            middle = (low + high) // 2
+            if self._removed[middle] - middle <= index:
+                low = middle + 1
+            else:
+                high = middle
+        return index + low
+
+    def _candidates(self, x, y, distance):
+        x0, y0 = self._key(x - distance, y - distance)
+        x1, y1 = self._key(x + distance, y + distance)
+        found = [
+            self.buckets[(i, j)]
+            for i in range(x0, x1 + 1)
+            for j in range(y0, y1 + 1)
+            if (i, j) in self.buckets
+        ]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def find(self, x, y):
+        """Returns the index of a charge at (x, y) within tolerance or None"""
+        candidates = self._candidates(x, y, self.tolerance)
+        same = (np.abs(self._xy[0, candidates] - x) <= self.tolerance) & (
+            np.abs(self._xy[1, candidates] - y) <= self.tolerance
+        )
+        return int(self._index(candidates[same][0])) if same.any() else None
+
+    def contains(self, x, y):
+        return self.find(x, y) is not None
+
+    def nearest(self, x, y, max_distance):
+        """Returns the index of the closest charge within max_distance or None"""
+        candidates = self._candidates(x, y, max_distance)
+        if len(candidates) == 0:
+            return None
+        distance = np.hypot(self._xy[0, candidates] - x, self._xy[1, candidates] - y)
+        best = int(np.argmin(distance))
+        if distance[best] > max_distance:
+            return None
+        return int(self._index(candidates[best]))
+
+    def add(self, x, y):
+        """Indexes a charge appended at the end of the charge set"""
+        if self._size == self._xy.shape[1]:
+            grown = np.empty((2, 2 * self._size))
+            grown[:, : self._size] = self._xy[:, : self._size]
+            self._xy = grown
+        self._xy[:, self._size] = x, y
+        self._insert(self._size)
+        self._size += 1
+
+    def move(self, index, x, y):
+        """Updates the position of a charge that was edited"""
+        charge_id = self._id(index)
+        self._discard(charge_id)
+        self._xy[:, charge_id] = x, y
+        self._insert(charge_id)
+
+    def remove(self, index):
+        """Unindexes a deleted charge, following indices shift down by one"""
+        charge_id = self._id(index)
+        self._discard(charge_id)
+        self._removed = np.insert(
+            self._removed, np.searchsorted(self._removed, charge_id), charge_id
+        )
+        if len(self._removed) > max(len(self), 16):
+            self._build(self.X, self.Y)
+
+    def _insert(self, charge_id):
+        key = self._key(*self._xy[:, charge_id])
+        self.buckets[key] = np.append(self.buckets.get(key, []), charge_id).astype(
+            np.int64
+        )
+
+    def _discard(self, charge_id):
+        key = self._key(*self._xy[:, charge_id])
+        members = self.buckets[key]
+        members = members[members != charge_id]
+        if len(members):
+            self.buckets[key] = members
+        else:
+            del self.buckets[key]
@@ -0,0 +1,152 @@
+"""Out-of-core field grids with a level-of-detail pyramid.
+
+Grids too large for memory are computed in bands of rows that are streamed
+into memory-mapped ``Ex_0.npy``/``Ey_0.npy`` files. Level ``k + 1`` halves
+level ``k`` by averaging 2x2 blocks, down to about ``MIN_SIZE`` points a
+side, so a viewer only ever reads the level matching its pixels.
+``store.json`` is written last and marks a complete store.
+"""
+
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from electricfield.field import calculate_E
+
+# Bytes of E_x plus E_y computed (and held in memory) per band of rows
+BAND_BYTES = 64 << 20
+# Side in points of the coarsest pyramid level
+MIN_SIZE = 256
+
+
+def downsample(block):
+    """Averages 2x2 blocks, odd edges are padded by repeating the last
+    row or column"""
+    rows, cols = block.shape
+    block = np.pad(block, ((0, rows % 2), (0, cols % 2)), mode="edge")
+    return block.reshape(block.shape[0] // 2, 2, block.shape[1] // 2, 2).mean(
+        axis=(1, 3), dtype=float
+    )
+
+
+class FieldStore:
+    """E_x and E_y of one grid stored on disk in ``directory``"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "store.json")) as file:
+            meta = json.load(file)
+        self.extent = meta["extent"]
+        self.shapes = [tuple(shape) for shape in meta["shapes"]]
+
+    @staticmethod
+    def complete(directory):
+        return os.path.exists(os.path.join(directory, "store.json"))
+
+    def level(self, index):
+        """Returns (E_x, E_y) of pyramid level index as read-only memmaps"""
+        return tuple(
+            np.load(self._path(name, index), mmap_mode="r") for name in ("Ex", "Ey")
+        )
+
+    def level_for(self, pixels):
+        """Returns the coarsest level with at least pixels points a side"""
+        for index in range(len(self.shapes) - 1, 0, -1):
+            if min(self.shapes[index]) >= pixels:
+                return index
+        return 0
+
+    def fields_for(self, pixels):
+        """Loads the level matching a view pixels wide into memory"""
+        return tuple(np.array(grid) for grid in self.level(self.level_for(pixels)))
+
+    def _path(self, name, index):
+        return os.path.join(self.directory, f"{name}_{index}.npy")
+
+
+def compute_store(
+    charges,
+    xs,
+    ys,
+    directory,
+    calculate=calculate_E,
+    progress=None,
+    cancel=None,
+    dtype=float,
+    min_size=MIN_SIZE,
+    **options,
+):
+    """Computes E_x and E_y into a FieldStore in directory, band by band.
+
+    ``calculate`` is any backend, it is called with the rows of one band
+    at a time. Returns the store or None when cancelled.
+    """
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, "store.json")
+    if os.path.exists(path):
+        os.remove(path)
+    shape = (len(ys), len(xs))
+    itemsize = np.dtype(dtype).itemsize
+    band = max(2, BAND_BYTES // (2 * itemsize * len(xs)) // 2 * 2)
+    if calculate is calculate_E:
+        options["dtype"] = dtype
+    grids = [
+        open_memmap(os.path.join(directory, f"{name}_0.npy"), "w+", dtype, shape)
+        for name in ("Ex", "Ey")
+    ]
+    for r0 in range(0, shape[0], band):
+        r1 = min(r0 + band, shape[0])
+
+        def report(fraction, r0=r0, r1=r1):
+            if progress is not None:
+                progress(0.9 * (r0 + fraction * (r1 - r0)) / shape[0])
+
+        fields = calculate(charges, xs, ys[r0:r1], report, cancel, **options)
+        if fields is None:
+            return None
+        for grid, values in zip(grids, fields):
+            grid[r0:r1] = values
+    for grid in grids:
+        grid.flush()
+
+    shapes = [shape]
+    while min(shapes[-1]) >= 2 * min_size:
+        if cancel is not None and cancel.is_set():
+            return None
+        grids = _build_level(directory, len(shapes), shapes[-1], dtype, band)
+        shapes.append(grids[0].shape)
+        if progress is not None:
+            progress(1 - 0.1 * 0.5 ** (len(shapes) - 1))
+
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "extent": [float(xs[0]), float(xs[-1]), float(ys[0]), float(ys[-1])],
+                "shapes": shapes,
+            },
+            file,
+        )
+    if progress is not None:
+        progress(1)
+    return FieldStore(directory)
+
+
+def _build_level(directory, index, shape, dtype, band):
+    """Streams level index - 1 into level index, band rows at a time"""
+    rows, cols = shape
+    new_shape = ((rows + 1) // 2, (cols + 1) // 2)
+    grids = []
+    for name in ("Ex", "Ey"):
+        source = np.load(os.path.join(directory, f"{name}_{index - 1}.npy"), "r")
+        target = open_memmap(
+            os.path.join(directory, f"{name}_{index}.npy"), "w+", dtype, new_shape
+        )
+        for r0 in range(0, rows, band):
+            target[r0 // 2 : (min(r0 + band, rows) + 1) // 2] = downsample(
+                source[r0 : r0 + band]
+            )
+        target.flush()
+        grids.append(target)
+    return grids
@@ -0,0 +1,231 @@
+"""Charge-strength sweeps over fixed charge positions.
+
+The field is linear in the charge values. With the field of a unit charge
+at every position on every grid point stored as basis matrices ``B_x`` and
+``B_y`` (charges x points), the field of any charge values ``q`` is
+``q @ B``. A UnitBasis is computed once per layout and grid, in float32 by
+default and optionally memory mapped from a directory, after which sweeps
+(rows of q values) are evaluated ``BATCH`` at a time as BLAS matrix
+products over blocks of points. Only summary statistics of every sweep are
+kept: max |E| and where it occurs, the field at chosen points (exact, via
+the lead fields of electricfield.probes) and a histogram of log10 |E|.
+"""
+
+import hashlib
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from electricfield.field import charge_arrays
+from electricfield.probes import lead_field
+
+# Bytes of basis computed per chunk of charges
+BASIS_BYTES = 64 << 20
+# Sweeps evaluated by one matrix product
+BATCH = 256
+# Bytes of E_x, E_y and |E| of one batch held per block of points
+BLOCK_BYTES = 64 << 20
+HIST_BINS = 64
+# log10 |E| (N/C) covered by the histograms, values outside are counted
+# in the first or last bin
+HIST_RANGE = (0.0, 12.0)
+
+
+def basis_key(charges, xs, ys, dtype):
+    """Returns a hex digest of the charge positions, grid and dtype"""
+    cx, cy, _ = charge_arrays(charges)
+    digest = hashlib.sha1()
+    for array in (cx, cy, xs, ys):
+        digest.update(np.ascontiguousarray(array, dtype=float).tobytes())
+    digest.update(np.dtype(dtype).str.encode())
+    return digest.hexdigest()
+
+
+class UnitBasis:
+    """Fields B_x and B_y (charges x points) of unit charges at the charge
+    positions on the grid spanned by xs and ys"""
+
+    def __init__(self, B_x, B_y, xs, ys, key=None):
+        self.B_x = B_x
+        self.B_y = B_y
+        self.xs = np.asarray(xs, dtype=float)
+        self.ys = np.asarray(ys, dtype=float)
+        self.key = key
+
+    def __len__(self):
+        return self.B_x.shape[0]
+
+    @property
+    def nbytes(self):
+        return self.B_x.nbytes + self.B_y.nbytes
+
+    @staticmethod
+    def size(charges, xs, ys, dtype=np.float32):
+        """Returns the bytes the basis of charges on a grid takes"""
+        return 2 * len(charges) * len(xs) * len(ys) * np.dtype(dtype).itemsize
+
+    @classmethod
+    def open(cls, directory):
+        """Returns the basis stored in directory as read-only memmaps"""
+        with open(os.path.join(directory, "basis.json")) as file:
+            meta = json.load(file)
+        B_x, B_y = (
+            np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in ("Bx", "By")
+        )
+        return cls(B_x, B_y, meta["xs"], meta["ys"], meta["key"])
+
+    @classmethod
+    def compute(
+        cls,
+        charges,
+        xs,
+        ys,
+        directory=None,
+        dtype=np.float32,
+        progress=None,
+        cancel=None,
+    ):
+        """Computes the basis, in memory or into memmaps in directory.
+
+        A complete basis for the same positions and grid already in
+        directory is reused. Returns None when cancelled.
+        """
+        key = basis_key(charges, xs, ys, dtype)
+        if directory is not None:
+            path = os.path.join(directory, "basis.json")
+            if os.path.exists(path):
+                basis = cls.open(directory)
+                if basis.key == key:
+                    return basis
+                os.remove(path)
+            os.makedirs(directory, exist_ok=True)
+        cx, cy, _ = charge_arrays(charges)
+        px = np.tile(xs, len(ys))
+        py = np.repeat(ys, len(xs))
+        shape = (len(cx), len(px))
+        if directory is None:
+            grids = [np.empty(shape, dtype=dtype) for _ in range(2)]
+        else:
+            grids = [
+                open_memmap(os.path.join(directory, f"{name}.npy"), "w+", dtype, shape)
+                for name in ("Bx", "By")
+            ]
+        chunk = max(1, BASIS_BYTES // (2 * 8 * max(len(px), 1)))
+        for c0 in range(0, len(cx), chunk):
+            if cancel is not None and cancel.is_set():
+                return None
+            c1 = min(c0 + chunk, len(cx))
+            for grid, values in zip(grids, lead_field(px, py, cx[c0:c1], cy[c0:c1])):
+                grid[c0:c1] = values.T
+            if progress is not None:
+                progress(c1 / len(cx))
+        if directory is not None:
+            for grid in grids:
+                grid.flush()
+            # Written last, marks a complete basis
+            with open(os.path.join(directory, "basis.json"), "w") as file:
+                json.dump(
+                    {
+                        "key": key,
+                        "xs": list(map(float, xs)),
+                        "ys": list(map(float, ys)),
+                    },
+                    file,
+                )
+        return cls(*grids, xs, ys, key)
+
+    def fields(self, q):
+        """Returns E_x and E_y on the grid for one set of charge values"""
+        q = np.asarray(q, dtype=self.B_x.dtype)
+        shape = (len(self.ys), len(self.xs))
+        return (q @ self.B_x).reshape(shape), (q @ self.B_y).reshape(shape)
+
+
+def monte_carlo(q, samples, spread, seed=None):
+    """Returns samples x charges values scattered around q by a relative
+    normal spread"""
+    rng = np.random.default_rng(seed)
+    q = np.asarray(q, dtype=float)
+    return q * (1 + spread * rng.standard_normal((samples, len(q))))
+
+
+def sweep(
+    basis,
+    Q,
+    probe=None,
+    charges=None,
+    batch=BATCH,
+    bins=HIST_BINS,
+    hist_range=HIST_RANGE,
+    progress=None,
+    cancel=None,
+):
+    """Yields the statistics of every row of Q (sweeps x charges) as a dict
+    with ``max_E``, its position ``x`` and ``y`` (m), ``hist`` (counts of
+    log10 |E| in bins over hist_range) and, given a probes.LeadField and
+    the charges, the exact ``E_x`` and ``E_y`` at its sensors.
+    """
+    px = np.tile(basis.xs, len(basis.ys))
+    py = np.repeat(basis.ys, len(basis.xs))
+    low, high = hist_range
+    scale = bins / (high - low)
+    itemsize = basis.B_x.dtype.itemsize
+    for s0 in range(0, len(Q), batch):
+        if cancel is not None and cancel.is_set():
+            return
+        s1 = min(s0 + batch, len(Q))
+        q = np.asarray(Q[s0:s1], dtype=basis.B_x.dtype)
+        k = s1 - s0
+        best = np.full(k, -np.inf)
+        where = np.zeros(k, dtype=np.int64)
+        hist = np.zeros((k, bins), dtype=np.int64)
+        offsets = np.arange(k)[:, None] * bins
+        block = max(1, BLOCK_BYTES // (3 * itemsize * k))
+        for p0 in range(0, len(px), block):
+            p1 = p0 + block
+            E = q @ basis.B_x[:, p0:p1]
+            E_y = q @ basis.B_y[:, p0:p1]
+            np.multiply(E, E, out=E)
+            E += E_y * E_y
+            np.sqrt(E, out=E)
+            # NaN at a charge position
+            E[np.isnan(E)] = -np.inf
+            index = np.argmax(E, axis=1)
+            value = E[np.arange(k), index]
+            better = value > best
+            best[better] = value[better]
+            where[better] = p0 + index[better]
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.log10(E, out=E)
+                finite = np.isfinite(E)
+                binned = np.clip(((E - low) * scale).astype(np.int64), 0, bins - 1)
+            hist += np.bincount((binned + offsets)[finite], minlength=k * bins).reshape(
+                k, bins
+            )
+        if probe is not None:
+            at_x, at_y = probe.evaluate_many(charges, np.asarray(Q[s0:s1], float).T)
+        for i in range(k):
+            stats = {
+                "sweep": s0 + i,
+                "max_E": float(best[i]),
+                "x": float(px[where[i]]),
+                "y": float(py[where[i]]),
+                "hist": hist[i],
+            }
+            if probe is not None:
+                stats["E_x"] = at_x[:, i]
+                stats["E_y"] = at_y[:, i]
+            yield stats
+        if progress is not None:
+            progress(s1 / len(Q))
+
+
+def load_sweeps(path):
+    """Reads sweeps x charges values from a .npy (memory mapped) or a CSV
+    file without header, one sweep per row"""
+    if path.endswith(".npy"):
+        return np.load(path, mmap_mode="r")
+    return np.loadtxt(path, delimiter=",", ndmin=2)
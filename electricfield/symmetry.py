@@ -0,0 +1,184 @@
+"""Evaluation of symmetric layouts on their fundamental domain only.
+
+The symmetries of the square grid are the 8 signed permutation matrices M
+acting on (x, y): identity, the mirrors in both axes and both diagonals
+and the rotations by 90, 180 and 270 degrees. When M maps every charge
+onto a charge of the same value (within ``TOLERANCE``) and the grid onto
+itself, the field obeys ``E(M r) = M E(r)``. The matrices that hold form
+a group; only one grid point of every orbit of the group (the one with
+the lowest index) is evaluated and the others are filled from it with
+``E(r) = M^T E(M r)``, cutting the work by up to 8x. Layouts without
+symmetry, or with fewer than ``MIN_CHARGES`` charges, are evaluated on
+the full grid as before, as are grids whose orbit bookkeeping
+(``orbit_bytes``) does not fit in the memory budget next to the grids.
+"""
+
+import numpy as np
+
+from electricfield.field import accumulate_E, charge_arrays, plan_blocks
+from electricfield.spatial import TOLERANCE
+
+SQUARE = tuple(
+    np.array(matrix)
+    for matrix in (
+        ((1, 0), (0, 1)),
+        ((-1, 0), (0, 1)),
+        ((1, 0), (0, -1)),
+        ((-1, 0), (0, -1)),
+        ((0, 1), (1, 0)),
+        ((0, -1), (-1, 0)),
+        ((0, -1), (1, 0)),
+        ((0, 1), (-1, 0)),
+    )
+)
+# Relative difference below which two charge values are equal
+Q_TOLERANCE = 1e-9
+# Fewer charges are evaluated faster on the full grid than the orbits are
+# worked out
+MIN_CHARGES = 8
+
+
+def _keys(X, Y, q, tolerance):
+    """Returns the charges sorted by rounded position, and their values"""
+    kx = np.rint(X / tolerance).astype(np.int64)
+    ky = np.rint(Y / tolerance).astype(np.int64)
+    order = np.lexsort((ky, kx))
+    return kx[order], ky[order], q[order]
+
+
+def charge_symmetries(charges, tolerance=TOLERANCE):
+    """Returns the matrices of SQUARE that map the charges onto themselves,
+    positions within tolerance (cm)"""
+    cx, cy, cq = charge_arrays(charges)
+    # Back to cm, as tolerance
+    X, Y = cx * 1e2, cy * 1e2
+    kx, ky, q = _keys(X, Y, cq, tolerance)
+    scale = np.max(np.abs(cq), initial=0)
+    found = []
+    for M in SQUARE:
+        mx, my, mq = _keys(
+            M[0, 0] * X + M[0, 1] * Y, M[1, 0] * X + M[1, 1] * Y, cq, tolerance
+        )
+        if (
+            np.array_equal(mx, kx)
+            and np.array_equal(my, ky)
+            and np.all(np.abs(mq - q) <= Q_TOLERANCE * scale)
+        ):
+            found.append(M)
+    return found
+
+
+def grid_symmetries(xs, ys, tolerance=TOLERANCE * 1e-2):
+    """Returns the matrices of SQUARE that map the grid spanned by xs and
+    ys (m) onto itself"""
+    mirror_x = np.allclose(xs, -xs[::-1], rtol=0, atol=tolerance)
+    mirror_y = np.allclose(ys, -ys[::-1], rtol=0, atol=tolerance)
+    swap = len(xs) == len(ys) and np.allclose(xs, ys, rtol=0, atol=tolerance)
+    found = []
+    for M in SQUARE:
+        if M[0, 1] != 0 and not swap:
+            continue
+        # Along the diagonals the mirrors follow from the swap
+        if (np.any(M[0] < 0) and not mirror_x) or (np.any(M[1] < 0) and not mirror_y):
+            continue
+        found.append(M)
+    return found
+
+
+def symmetry_group(charges, xs, ys, tolerance=TOLERANCE):
+    """Returns the symmetries shared by the charges and the grid"""
+    grid = grid_symmetries(xs, ys, tolerance * 1e-2)
+    if len(grid) == 1:
+        return grid
+    return [
+        M
+        for M in charge_symmetries(charges, tolerance)
+        if any(np.array_equal(M, G) for G in grid)
+    ]
+
+
+def transform(A, M):
+    """Returns the view B of grid A with B[j, i] = A at M (x_i, y_j)"""
+    if M[0, 1] == 0:
+        B = A
+        if M[0, 0] < 0:
+            B = B[:, ::-1]
+        if M[1, 1] < 0:
+            B = B[::-1]
+    else:
+        B = A.T
+        if M[0, 1] < 0:
+            B = B[::-1]
+        if M[1, 0] < 0:
+            B = B[:, ::-1]
+    return B
+
+
+def _index_dtype(shape):
+    return np.int32 if shape[0] * shape[1] < 2**31 else np.int64
+
+
+def orbit_bytes(shape, dtype=float):
+    """Returns the peak bytes of the orbit bookkeeping of a grid: two index
+    grids while the orbits are searched, the representative mask and indices
+    (at most one per two points) while they are evaluated, and the masks and
+    copied values (at most half of the grid) while the rest is filled"""
+    points = shape[0] * shape[1]
+    search = 2 * np.dtype(_index_dtype(shape)).itemsize + 1
+    evaluate = 1 + 8 / 2
+    fill = 3 + 2 * np.dtype(dtype).itemsize / 2
+    return int(max(search, evaluate, fill) * points)
+
+
+def fits_symmetric(shape, dtype=float, memory=None):
+    """Returns whether the grids, orbit bookkeeping and some scratch fit in
+    memory"""
+    try:
+        plan_blocks(shape, dtype, memory, orbit_bytes(shape, dtype))
+    except MemoryError:
+        return False
+    return True
+
+
+def calculate_E_symmetric(
+    charges, xs, ys, group, progress=None, cancel=None, dtype=float, memory=None
+):
+    """Computes E_x and E_y on the fundamental domain of group and fills the
+    rest of the grid from it"""
+    shape = (len(ys), len(xs))
+    nx = len(xs)
+    # Counted as if all of it lived next to the grids
+    rows, block_bytes = plan_blocks(shape, dtype, memory, orbit_bytes(shape, dtype))
+    cx, cy, cq = charge_arrays(charges)
+    # Orbit representatives: the points with the lowest index of their orbit
+    index = np.arange(shape[0] * shape[1], dtype=_index_dtype(shape)).reshape(shape)
+    lowest = index.copy()
+    for M in group[1:]:
+        np.minimum(lowest, transform(index, M), out=lowest)
+    known = lowest == index
+    del index, lowest
+    first = np.flatnonzero(known)
+    E_x = np.zeros(shape, dtype=dtype)
+    E_y = np.zeros(shape, dtype=dtype)
+    step = rows * nx
+    for p0 in range(0, len(first), step):
+        if cancel is not None and cancel.is_set():
+            return None
+        points = first[p0 : p0 + step]
+        ex = np.zeros(len(points))
+        ey = np.zeros(len(points))
+        accumulate_E(xs[points % nx], ys[points // nx], cx, cy, cq, ex, ey, block_bytes)
+        E_x.reshape(-1)[points] = ex
+        E_y.reshape(-1)[points] = ey
+        if progress is not None:
+            progress(min(p0 + step, len(first)) / len(first))
+    del first
+    # E(r) = M^T E(M r) for every r whose image M r is a representative
+    for M in group[1:]:
+        fill = np.logical_and(transform(known, M), ~known)
+        source_x = transform(E_x, M)[fill]
+        source_y = transform(E_y, M)[fill]
+        E_x[fill] = M[0, 0] * source_x + M[1, 0] * source_y
+        E_y[fill] = M[0, 1] * source_x + M[1, 1] * source_y
+        known |= fill
+    return E_x, E_y
@@ -0,0 +1,180 @@
+"""Barnes-Hut style tree code for layouts with very many charges.
+
+Charges are binned into a complete quadtree stored level by level: level
+``l`` is a ``2**l x 2**l`` grid over the bounding square of the charges,
+and only non-empty cells are kept. Every cell carries its monopole, dipole
+and quadrupole moments about its center. Targets are processed in small
+tiles; for each tile the tree is walked one level at a time and a cell is
+used through its expansion once ``cell size / distance < theta`` holds for
+the whole tile, otherwise it is opened. Leaves that are never accepted are
+summed directly. The cost is roughly O((N + M) log N) for N charges and M
+grid points, ``theta`` trades accuracy for speed (0 gives direct summation).
+"""
+
+import numpy as np
+
+from electricfield.field import K_E, accumulate_E, charge_arrays
+
+THETA = 0.3
+LEAF_SIZE = 32
+MAX_DEPTH = 12
+TILE = 32
+
+
+class QuadTree:
+    """Multipole moments of the charges for every non-empty cell"""
+
+    def __init__(self, cx, cy, cq, leaf_size=LEAF_SIZE):
+        self.x0 = min(cx.min(), cy.min())
+        self.size = max(cx.max(), cy.max()) - self.x0
+        self.size = self.size * (1 + 1e-9) or 1e-12  # Keep max inside the grid
+        self.depth = int(
+            np.clip(np.ceil(np.log(len(cq) / leaf_size) / np.log(4)), 0, MAX_DEPTH)
+        )
+        self.levels = []
+        for level in range(self.depth + 1):
+            n = 2**level
+            ix = ((cx - self.x0) / self.size * n).astype(np.int64)
+            iy = ((cy - self.x0) / self.size * n).astype(np.int64)
+            keys, cell = np.unique(iy * n + ix, return_inverse=True)
+            h = self.size / n
+            centers_x = self.x0 + (keys % n + 0.5) * h
+            centers_y = self.x0 + (keys // n + 0.5) * h
+            sx = cx - centers_x[cell]
+            sy = cy - centers_y[cell]
+            moments = [
+                np.bincount(cell, weights=w, minlength=len(keys))
+                for w in (
+                    cq,
+                    cq * sx,
+                    cq * sy,
+                    cq * sx * sx,
+                    cq * sx * sy,
+                    cq * sy * sy,
+                )
+            ]
+            self.levels.append((keys, centers_x, centers_y, moments))
+        # Charges sorted by leaf so every leaf is a contiguous range
+        leaf_keys = self.levels[-1][0]
+        n = 2**self.depth
+        ix = ((cx - self.x0) / self.size * n).astype(np.int64)
+        iy = ((cy - self.x0) / self.size * n).astype(np.int64)
+        leaf = np.searchsorted(leaf_keys, iy * n + ix)
+        order = np.argsort(leaf, kind="stable")
+        self.charges = (cx[order], cy[order], cq[order])
+        self.starts = np.searchsorted(leaf[order], np.arange(len(leaf_keys) + 1))
+
+    def children(self, level, cells):
+        """Returns the indices at level + 1 of the non-empty children of cells"""
+        n = 2**level
+        keys = self.levels[level][0][cells]
+        ix = keys % n
+        iy = keys // n
+        child_keys = np.concatenate(
+            [(2 * iy + a) * (2 * n) + (2 * ix + b) for a in (0, 1) for b in (0, 1)]
+        )
+        next_keys = self.levels[level + 1][0]
+        found = np.searchsorted(next_keys, child_keys)
+        found = found[found < len(next_keys)]
+        return np.unique(found[np.isin(next_keys[found], child_keys)])
+
+    def interactions(self, box, theta):
+        """Returns the cells far enough from box for their expansion, by level,
+        and the leaves that must be summed directly"""
+        x0, x1, y0, y1 = box
+        far = []
+        cells = np.arange(len(self.levels[0][0]))
+        for level, (keys, centers_x, centers_y, moments) in enumerate(self.levels):
+            h = self.size / 2**level
+            dx = np.maximum(np.maximum(x0 - centers_x[cells], centers_x[cells] - x1), 0)
+            dy = np.maximum(np.maximum(y0 - centers_y[cells], centers_y[cells] - y1), 0)
+            accept = h < theta * np.hypot(dx, dy)
+            far.append(cells[accept])
+            cells = cells[~accept]
+            if level == self.depth or len(cells) == 0:
+                break
+            cells = self.children(level, cells)
+        near = cells if len(far) == self.depth + 1 else np.empty(0, dtype=int)
+        return far, near
+
+    def add_far(self, level, cells, px, py, ex, ey):
+        """Adds the multipole field of cells to ex and ey"""
+        keys, centers_x, centers_y, moments = self.levels[level]
+        q, px_, py_, mxx, mxy, myy = (m[cells, None] for m in moments)
+        dx = px[None, :] - centers_x[cells, None]
+        dy = py[None, :] - centers_y[cells, None]
+        r2 = dx * dx + dy * dy
+        inv3 = 1 / (r2 * np.sqrt(r2))
+        inv5 = inv3 / r2
+        pd = px_ * dx + py_ * dy
+        mdx = mxx * dx + mxy * dy
+        mdy = mxy * dx + myy * dy
+        dmd = dx * mdx + dy * mdy
+        radial = q * inv3 + 3 * pd * inv5 + (7.5 * dmd / r2 - 1.5 * (mxx + myy)) * inv5
+        fx = radial * dx - px_ * inv3 - 3 * mdx * inv5
+        fy = radial * dy - py_ * inv3 - 3 * mdy * inv5
+        ex += K_E * fx.sum(axis=0)
+        ey += K_E * fy.sum(axis=0)
+
+    def add_near(self, leaves, px, py, ex, ey):
+        """Adds the field of every charge in leaves to ex and ey"""
+        if len(leaves) == 0:
+            return
+        starts = self.starts[leaves]
+        stops = self.starts[leaves + 1]
+        index = np.concatenate([np.arange(a, b) for a, b in zip(starts, stops)])
+        cx, cy, cq = (c[index] for c in self.charges)
+        accumulate_E(px, py, cx, cy, cq, ex, ey)
+
+
+def calculate_E(charges, xs, ys, progress=None, cancel=None, theta=THETA, tile=TILE):
+    """Approximates E_x and E_y on the grid spanned by xs and ys"""
+    E_x = np.zeros((len(ys), len(xs)))
+    E_y = np.zeros((len(ys), len(xs)))
+    cx, cy, cq = charge_arrays(charges)
+    if len(cq) == 0:
+        return E_x, E_y
+    tree = QuadTree(cx, cy, cq)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for r0 in range(0, len(ys), tile):
+            if cancel is not None and cancel.is_set():
+                return None
+            r1 = min(r0 + tile, len(ys))
+            for c0 in range(0, len(xs), tile):
+                c1 = min(c0 + tile, len(xs))
+                px = np.tile(xs[c0:c1], r1 - r0)
+                py = np.repeat(ys[r0:r1], c1 - c0)
+                ex = np.zeros(len(px))
+                ey = np.zeros(len(px))
+                far, near = tree.interactions(
+                    (xs[c0], xs[c1 - 1], ys[r0], ys[r1 - 1]), theta
+                )
+                for level, cells in enumerate(far):
+                    if len(cells):
+                        tree.add_far(level, cells, px, py, ex, ey)
+                tree.add_near(near, px, py, ex, ey)
+                E_x[r0:r1, c0:c1] = ex.reshape(r1 - r0, c1 - c0)
+                E_y[r0:r1, c0:c1] = ey.reshape(r1 - r0, c1 - c0)
+            if progress is not None:
+                progress(r1 / len(ys))
+    return E_x, E_y
+
+
+def sample_error(charges, xs, ys, fields, samples=256, seed=0):
+    """Compares fields against direct summation at random grid points.
+
+    Returns the maximum and RMS relative error of the field vector.
+    """
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, len(ys), samples)
+    cols = rng.integers(0, len(xs), samples)
+    ex = np.zeros(samples)
+    ey = np.zeros(samples)
+    accumulate_E(xs[cols], ys[rows], *charge_arrays(charges), ex, ey)
+    diff = np.hypot(fields[0][rows, cols] - ex, fields[1][rows, cols] - ey)
+    scale = np.hypot(ex, ey)
+    finite = np.isfinite(diff) & (scale > 0)
+    relative = diff[finite] / scale[finite]
+    if len(relative) == 0:
+        return 0.0, 0.0
+    return float(relative.max()), float(np.sqrt(np.mean(relative**2)))
@@ -0,0 +1,241 @@
+"""Field in a volume above and below the plane of the charges.
+
+The charges lie in the plane z = 0. A volume is the grid of the run
+(``xs`` x ``ys``) repeated at every height of ``zs``, evaluated one
+z-slice at a time in blocks of rows and streamed into memory-mapped
+``Ex.npy``/``Ey.npy``/``Ez.npy`` files of shape ``(len(zs), len(ys),
+len(xs))``, so memory use does not depend on the number of slices and
+every slice is one contiguous chunk on disk. Viewers read single slices,
+or x-z and y-z cuts across all slices, without recomputing anything. The
+layout favours the slices: an x-y slice and an x-z cut read only their
+own rows, while a y-z cut takes one value per row and so touches every
+page of the volume. ``volume.json`` is written last and marks a complete
+volume.
+
+Only direct summation gives E_z, the other backends are in-plane methods,
+so volumes always use it. Slices are evaluated by ``workers`` threads
+(NumPy releases the GIL in the large array operations), with blocks sized
+by field.plan_blocks to stay within the ``memory`` budget.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from electricfield.cache import field_key
+from electricfield.field import (
+    BLOCK_BYTES,
+    CHARGE_CHUNK,
+    K_E,
+    charge_arrays,
+    plan_blocks,
+)
+
+COMPONENTS = ("Ex", "Ey", "Ez")
+# Plane -> (horizontal axis, vertical axis) of the views of a volume
+PLANES = {"x-y": ("x", "y"), "x-z": ("x", "z"), "y-z": ("y", "z")}
+
+
+def z_coordinates(settings):
+    """Returns the slice heights (m) from z_min to z_max"""
+    return np.linspace(
+        settings.get("z_min"), settings.get("z_max"), settings.get("z_points")
+    )
+
+
+def accumulate_E3(px, py, z, cx, cy, cq, ex, ey, ez, block_bytes=BLOCK_BYTES):
+    """Adds the field of charges (cx, cy, cq) in the plane z = 0 at points
+    (px, py) of height z to ex, ey and ez"""
+    kq = K_E * cq
+    chunk = min(len(cq), CHARGE_CHUNK) or 1
+    block = max(1, block_bytes // (3 * 8 * chunk))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for c0 in range(0, len(cq), CHARGE_CHUNK):
+            c1 = c0 + CHARGE_CHUNK
+            cxc = cx[c0:c1, None]
+            cyc = cy[c0:c1, None]
+            kqc = kq[c0:c1]
+            for p0 in range(0, len(px), block):
+                p1 = p0 + block
+                dx = px[None, p0:p1] - cxc
+                dy = py[None, p0:p1] - cyc
+                r3 = dx * dx
+                r3 += dy * dy
+                r3 += z * z
+                r3 *= np.sqrt(r3)
+                np.divide(dx, r3, out=dx)
+                np.divide(dy, r3, out=dy)
+                np.reciprocal(r3, out=r3)
+                ex[p0:p1] += kqc @ dx
+                ey[p0:p1] += kqc @ dy
+                ez[p0:p1] += z * (kqc @ r3)
+
+
+class FieldVolume:
+    """E_x, E_y and E_z of a stack of z-slices stored in ``directory``"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "volume.json")) as file:
+            meta = json.load(file)
+        self.key = meta["key"]
+        self.xs = np.array(meta["xs"])
+        self.ys = np.array(meta["ys"])
+        self.zs = np.array(meta["zs"])
+        self.grids = tuple(
+            np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+            for name in COMPONENTS
+        )
+
+    @staticmethod
+    def complete(directory):
+        return os.path.exists(os.path.join(directory, "volume.json"))
+
+    def axis(self, name):
+        return {"x": self.xs, "y": self.ys, "z": self.zs}[name]
+
+    def normal(self, plane):
+        """Returns the coordinates along the axis normal to plane"""
+        return self.axis(({"x", "y", "z"} - set(PLANES[plane])).pop())
+
+    def cut(self, plane, index):
+        """Returns the two in-plane components of plane at index along its
+        normal axis (in memory) and their extent (m)"""
+        horizontal, vertical = PLANES[plane]
+        if plane == "x-y":
+            cut = (index,)
+        elif plane == "x-z":
+            cut = (slice(None), index)
+        else:
+            cut = (slice(None), slice(None), index)
+        components = [
+            np.array(self.grids[COMPONENTS.index(f"E{name}")][cut])
+            for name in (horizontal, vertical)
+        ]
+        h = self.axis(horizontal)
+        v = self.axis(vertical)
+        return tuple(components), [float(h[0]), float(h[-1]), float(v[0]), float(v[-1])]
+
+
+def volume_key(charges, xs, ys, zs, dtype=float):
+    """Returns the key identifying the volume of charges on a grid"""
+    return field_key(
+        charges,
+        xs[-1],
+        len(xs),
+        0,
+        "volume",
+        (float(ys[0]), float(ys[-1]), len(ys)),
+        tuple(map(float, zs)),
+        np.dtype(dtype).str,
+    )
+
+
+def compute_volume(
+    charges,
+    xs,
+    ys,
+    zs,
+    directory,
+    progress=None,
+    cancel=None,
+    dtype=float,
+    key=None,
+    workers=1,
+    memory=None,
+):
+    """Computes E_x, E_y and E_z into a FieldVolume in directory, one
+    z-slice at a time per worker thread.
+
+    A complete volume with the same key in directory is reused. Otherwise
+    the volume is written to a new folder next to directory and moved in
+    place once complete, replacing an older volume there (whose readers
+    must be closed by then). Returns the volume or None when cancelled.
+    """
+    key = key or volume_key(charges, xs, ys, zs, dtype)
+    if FieldVolume.complete(directory) and FieldVolume(directory).key == key:
+        return FieldVolume(directory)
+    parent = os.path.dirname(os.path.abspath(directory))
+    os.makedirs(parent, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix=".partial-", dir=parent)
+    try:
+        complete = _write_volume(
+            charges, xs, ys, zs, staging, key, progress, cancel, dtype, workers, memory
+        )
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if not complete:
+        shutil.rmtree(staging, ignore_errors=True)
+        return None
+    if os.path.exists(directory):
+        shutil.rmtree(directory)
+    os.replace(staging, directory)
+    return FieldVolume(directory)
+
+
+def _write_volume(
+    charges, xs, ys, zs, directory, key, progress, cancel, dtype, workers, memory
+):
+    """Writes the volume files into the empty directory, returns False when
+    cancelled"""
+    path = os.path.join(directory, "volume.json")
+    cx, cy, cq = charge_arrays(charges)
+    shape = (len(zs), len(ys), len(xs))
+    workers = max(1, min(workers or 1, len(zs)))
+    # The blocks of every worker share the scratch of one slice
+    rows, block_bytes = plan_blocks(shape[1:], dtype, memory)
+    rows = max(1, rows // workers)
+    block_bytes = max(1, block_bytes // workers)
+    grids = [
+        open_memmap(os.path.join(directory, f"{name}.npy"), "w+", dtype, shape)
+        for name in COMPONENTS
+    ]
+    done = [0]
+    lock = threading.Lock()
+
+    def evaluate_slice(k):
+        z = float(zs[k])
+        for r0 in range(0, len(ys), rows):
+            if cancel is not None and cancel.is_set():
+                return
+            r1 = min(r0 + rows, len(ys))
+            px = np.tile(xs, r1 - r0)
+            py = np.repeat(ys[r0:r1], len(xs))
+            ex, ey, ez = (np.zeros(len(px)) for _ in COMPONENTS)
+            accumulate_E3(px, py, z, cx, cy, cq, ex, ey, ez, block_bytes)
+            for grid, values in zip(grids, (ex, ey, ez)):
+                grid[k, r0:r1] = values.reshape(r1 - r0, len(xs))
+            with lock:
+                # Rows finished over all slices
+                done[0] += r1 - r0
+                fraction = done[0] / (len(ys) * len(zs))
+            if progress is not None:
+                progress(fraction)
+
+    with ThreadPoolExecutor(workers) as pool:
+        # Raises the first error of a worker
+        list(pool.map(evaluate_slice, range(len(zs))))
+    for grid in grids:
+        grid.flush()
+    # Releases the memmaps before the folder is moved or removed
+    grids.clear()
+    if cancel is not None and cancel.is_set():
+        return False
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "key": key,
+                "xs": list(map(float, xs)),
+                "ys": list(map(float, ys)),
+                "zs": list(map(float, zs)),
+            },
+            file,
+        )
+    return True
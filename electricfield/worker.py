@@ -0,0 +1,60 @@
+"""Background execution of long running jobs for the Tk event loop.
+
+Tk is not thread safe, so a worker never touches widgets: it pushes
+``(kind, value)`` messages on a queue which the GUI drains from a
+``window.after`` callback. ``kind`` is one of ``"progress"``, ``"done"``,
+``"cancelled"`` or ``"error"``.
+"""
+
+import queue
+import threading
+
+
+class Worker:
+    """Runs ``job(*args, progress=..., cancel=...)`` on a daemon thread"""
+
+    def __init__(self, job, *args, **kwargs):
+        self.job = job
+        self.args = args
+        self.kwargs = kwargs
+        self.cancelled = threading.Event()
+        self.messages = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def running(self):
+        return self.thread.is_alive()
+
+    def poll(self):
+        """Returns every message queued since the last call"""
+        messages = []
+        while True:
+            try:
+                messages.append(self.messages.get_nowait())
+            except queue.Empty:
+                return messages
+
+    def _progress(self, fraction):
+        self.messages.put(("progress", fraction))
+
+    def _run(self):
+        try:
+            result = self.job(
+                *self.args,
+                progress=self._progress,
+                cancel=self.cancelled,
+                **self.kwargs,
+            )
+        except Exception as error:
+            self.messages.put(("error", error))
+            return
+        if self.cancelled.is_set():
+            self.messages.put(("cancelled", None))
+        else:
+            self.messages.put(("done", result))
@@ -0,0 +1,111 @@
+"""On-demand evaluation of the visible part of the field at screen resolution.
+
+The domain ``[-lim, lim]`` is split into ``2**level`` tiles a side at zoom
+``level``, each tile holding ``TILE`` points a side. A view only evaluates
+the tiles it overlaps, at the level whose point spacing matches its
+pixels, so zooming in shows real detail at a cost that does not depend on
+the zoom. Tiles are kept in a FieldCache keyed by charge set, level and
+tile index.
+"""
+
+import math
+
+import numpy as np
+
+from electricfield.cache import FieldCache
+from electricfield.field import calculate_E
+
+TILE = 256
+MAX_LEVEL = 20
+# Bytes of tiles kept in memory, 256 float64 tiles of 256x256
+TILE_CACHE_BYTES = 256 << 20
+
+
+class TiledField:
+    """Field of one charge set, identified by key, evaluated tile by tile"""
+
+    def __init__(
+        self, charges, key, lim, calculate=calculate_E, cache=None, tile=TILE, **options
+    ):
+        self.charges = charges
+        self.key = key
+        self.lim = lim
+        self.calculate = calculate
+        self.cache = cache if cache is not None else FieldCache(TILE_CACHE_BYTES)
+        self.tile = tile
+        self.options = options
+
+    def level_for(self, width, pixels):
+        """Returns the coarsest level with at least one point per pixel for
+        a view width (m) wide drawn on pixels pixels"""
+        tiles = 2 * self.lim * pixels / (self.tile * width)
+        return min(MAX_LEVEL, max(0, math.ceil(math.log2(max(tiles, 1)))))
+
+    def span(self, level, low, high):
+        """Returns the first and past-the-end tile indices covering
+        [low, high] on one axis"""
+        side = 2 * self.lim / 2**level
+        first = math.floor((low + self.lim) / side)
+        last = math.ceil((high + self.lim) / side)
+        return max(0, first), min(2**level, last)
+
+    def coordinates(self, level, index):
+        """Returns the point coordinates of tile index along one axis"""
+        side = 2 * self.lim / 2**level
+        step = side / self.tile
+        start = -self.lim + index * side + step / 2
+        return start + step * np.arange(self.tile)
+
+    def tile_fields(self, level, ix, iy, cancel=None):
+        """Returns (E_x, E_y) of one tile, computed on a cache miss"""
+        key = f"{self.key}_{level}_{ix}_{iy}"
+        fields = self.cache.get(key)
+        if fields is None:
+            fields = self.calculate(
+                self.charges,
+                self.coordinates(level, ix),
+                self.coordinates(level, iy),
+                cancel=cancel,
+                **self.options,
+            )
+            if fields is None:
+                return None
+            self.cache.put(key, fields)
+        return fields
+
+    def render(self, xlim, ylim, pixels, progress=None, cancel=None):
+        """Evaluates the view xlim x ylim (m) drawn pixels wide.
+
+        Returns the mosaic of the overlapped tiles and its extent, or None
+        when cancelled or the view lies outside the domain.
+        """
+        level = self.level_for(
+            max(xlim[1] - xlim[0], ylim[1] - ylim[0]), max(pixels, 1)
+        )
+        x0, x1 = self.span(level, *sorted(xlim))
+        y0, y1 = self.span(level, *sorted(ylim))
+        if x0 >= x1 or y0 >= y1:
+            return None
+        n = self.tile
+        E_x = np.empty(((y1 - y0) * n, (x1 - x0) * n))
+        E_y = np.empty_like(E_x)
+        done = 0
+        for iy in range(y0, y1):
+            for ix in range(x0, x1):
+                fields = self.tile_fields(level, ix, iy, cancel)
+                if fields is None:
+                    return None
+                rows = slice((iy - y0) * n, (iy - y0 + 1) * n)
+                cols = slice((ix - x0) * n, (ix - x0 + 1) * n)
+                E_x[rows, cols], E_y[rows, cols] = fields
+                done += 1
+                if progress is not None:
+                    progress(done / ((x1 - x0) * (y1 - y0)))
+        side = 2 * self.lim / 2**level
+        extent = [
+            -self.lim + x0 * side,
+            -self.lim + x1 * side,
+            -self.lim + y0 * side,
+            -self.lim + y1 * side,
+        ]
+        return (E_x, E_y), extent